@@ -11,3 +11,67 @@ NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
 
 # OpenAI (si besoin)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+
+# Inference backend for the encoder / reranker
+#   torch      : default PyTorch weights
+#   onnx       : ONNX Runtime, fp32
+#   onnx-int8  : ONNX Runtime with dynamically quantized int8 weights (CPU nodes)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+ONNX_QUANTIZED_FILE = os.getenv("ONNX_QUANTIZED_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+
+# On-disk embedding store (content-hash keyed, survives pod restarts)
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", ".embedding_store")
+
+# In-memory LRU for query / skill-string embeddings (entries)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+
+# Cross-encoder score cache (entries)
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "20000"))
+
+# Dynamic micro-batching of concurrent encode / predict calls
+MICRO_BATCHING = os.getenv("MICRO_BATCHING", "true").lower() in ("1", "true", "yes")
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+
+# Candidate retrieval: graph (Cypher scan) | vector (ANN first stage) | hybrid (BM25 + dense, RRF)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "graph")
+VECTOR_CANDIDATES = int(os.getenv("VECTOR_CANDIDATES", "100"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Retrieval backend: memory (numpy over the catalog snapshot) | neo4j (Cypher + Neo4j 5 vector index)
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "memory")
+NEO4J_VECTOR_INDEX = os.getenv("NEO4J_VECTOR_INDEX", "certification_embedding")
+
+# Adaptive cross-encoder reranking
+RERANK_MAX_CANDIDATES = int(os.getenv("RERANK_MAX_CANDIDATES", "15"))
+# Combined-score gap the reranker cannot overturn (final = 0.7 * combined + 0.3 * rerank[0-100])
+RERANK_MARGIN = float(os.getenv("RERANK_MARGIN", "43"))
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "200"))
+RERANK_PAIR_COST_MS = float(os.getenv("RERANK_PAIR_COST_MS", "5"))  # initial estimate, refined online
+
+# Delta refresh of the catalog cache every N seconds (0 = only on demand)
+CATALOG_REFRESH_SECONDS = float(os.getenv("CATALOG_REFRESH_SECONDS", "0"))
+# Delta refreshes re-read this window behind the updated_at watermark (writes committing late)
+CATALOG_REFRESH_LAG_SECONDS = float(os.getenv("CATALOG_REFRESH_LAG_SECONDS", "300"))
+
+# LLM skill-extraction cache: in-memory LRU (entries) + SQLite file with TTL ("" = memory only)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache/llm_cache.sqlite3")
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# Offline skill extraction (mode "embedding"): n-gram candidates matched against the catalog skills
+# The 0.7 threshold is not calibrated yet (tests/test_embedding_extraction.py needs the real encoder),
+# so the recommender keeps keyword extraction; run that test before relying on this mode
+EMBEDDING_SKILL_THRESHOLD = float(os.getenv("EMBEDDING_SKILL_THRESHOLD", "0.7"))
+EMBEDDING_SKILL_MAX_NGRAM = int(os.getenv("EMBEDDING_SKILL_MAX_NGRAM", "3"))
+EMBEDDING_SKILL_MAX_CANDIDATES = int(os.getenv("EMBEDDING_SKILL_MAX_CANDIDATES", "512"))
+
+# Long texts: LLM skill extraction over overlapping chunks, in parallel
+LLM_CHUNK_CHARS = int(os.getenv("LLM_CHUNK_CHARS", "3000"))
+LLM_CHUNK_OVERLAP = int(os.getenv("LLM_CHUNK_OVERLAP", "300"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # process-wide
+LLM_MAX_CHUNKS = int(os.getenv("LLM_MAX_CHUNKS", "0"))  # 0 = no ceiling; chunks past it get keyword extraction
+
+# Warmup: failed tasks are retried with exponential backoff (seconds)
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "2"))
+WARMUP_RETRY_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "60"))
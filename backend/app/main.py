@@ -1,11 +1,17 @@
 import os
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
+import time
+_import_start = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 # === IMPORTS DES ROUTERS ===
+# Routers must stay cheap to import: services load torch and the models
+# lazily (app.services.model_registry), never at module import time.
 from app.auth import router as auth_router
 from app.routers.chat import router as chat_router
 from app.routers.pdf_upload import router as pdf_router   # PDF EN PREMIER !
@@ -13,31 +19,30 @@ from app.routers.chat_rag import router as chat_rag_router
 from app.routers.profile import router as profile_router
 from app.routers.recommend import router as recommend_router
 from app.routers.certifications import router as certifications_router
+from app.services.warmup import start_warmup, get_warmup_status
+from app.config import CATALOG_REFRESH_SECONDS
+
+# Import-time budget: anything above this means a heavy import leaked back in
+IMPORT_BUDGET_SECONDS = 1.0
+_import_seconds = time.perf_counter() - _import_start
+if _import_seconds > IMPORT_BUDGET_SECONDS:
+    print(f"[startup] Warning: app.main imported in {_import_seconds:.2f}s (budget {IMPORT_BUDGET_SECONDS:.1f}s)")
+else:
+    print(f"[startup] app.main imported in {_import_seconds:.2f}s")
 
 
 # === STARTUP EVENT ===
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load models and cache at startup for faster queries."""
-    print("[startup] Loading models and certification cache...")
-
-    try:
-        # Pre-load certification embeddings cache
-        from app.services.graph_reasoning import load_certification_cache
-        load_certification_cache()
-        print("[startup] Certification cache loaded successfully")
-    except Exception as e:
-        print(f"[startup] Warning: Could not load cache: {e}")
-
-    try:
-        # Pre-load skills cache
-        from app.services.skill_extractor import load_canonical_skills
-        load_canonical_skills()
-        print("[startup] Skills cache loaded successfully")
-    except Exception as e:
-        print(f"[startup] Warning: Could not load skills cache: {e}")
-
-    print("[startup] Ready to serve requests!")
+    """Start warming models and caches in the background, serve immediately."""
+    print("[startup] Warming models and certification cache in background...")
+    start_warmup()
+
+    if CATALOG_REFRESH_SECONDS > 0:
+        from app.services.catalog import start_catalog_refresher
+        start_catalog_refresher(CATALOG_REFRESH_SECONDS)
+
+    print("[startup] Accepting requests (see /ready for model warmup)")
     yield
     print("[shutdown] Cleaning up...")
 
@@ -71,3 +76,34 @@ app.include_router(certifications_router, prefix="/certifications")
 @app.get("/")
 def home():
     return {"status": "Backend running"}
+
+
+@app.get("/ready")
+def ready():
+    """
+    Readiness probe: 200 once models and caches are warm, 503 before.
+    `/` stays a pure liveness check.
+    """
+    status = get_warmup_status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
+@app.get("/stats")
+def stats():
+    """Model memory, catalog snapshot, micro-batcher and cache counters (see README, GET /stats)."""
+    from app.services.model_registry import get_model_stats
+    from app.services.embedding_cache import get_embedding_cache_stats
+    from app.services.graph_reasoning import get_rerank_cache_stats
+    from app.services.llm_cache import get_llm_cache_stats
+    from app.services.micro_batcher import get_batcher_stats
+    from app.services.catalog import current_catalog
+    return {
+        "models": get_model_stats(),
+        "catalog": current_catalog().stats(),
+        "batchers": get_batcher_stats(),
+        "caches": {
+            "embeddings": get_embedding_cache_stats(),
+            "rerank_scores": get_rerank_cache_stats(),
+            "llm_skills": get_llm_cache_stats()
+        }
+    }
@@ -1,8 +1,8 @@
 # app/routers/certifications.py
 from fastapi import APIRouter
 from app.database import execute_query
-from app.services.rag_service import refresh_cache, search_relevant_certifications
-from app.services.skill_extractor import refresh_skills_cache
+from app.services.rag_service import search_relevant_certifications
+from app.services.catalog import refresh_catalog
 
 router = APIRouter(tags=["Certification"])
 
@@ -31,16 +31,18 @@ def get_all_certifications():
 
 
 @router.post("/refresh-cache")
-def refresh_certification_cache():
-    """Refresh all certification caches after Neo4j data changes."""
-    # Refresh RAG service cache
-    certs, _ = refresh_cache()
-    # Refresh skill extractor cache
-    refresh_skills_cache()
+def refresh_certification_cache(full: bool = False):
+    """
+    Refresh the shared catalog snapshot after Neo4j data changes
+    (graph reasoning, RAG and skill vocabulary together).
+    Incremental by default; ?full=true re-reads and re-indexes everything.
+    """
+    catalog = refresh_catalog(full=full)
 
     return {
         "status": "success",
-        "message": f"Cache refreshed with {len(certs)} certifications"
+        "message": f"Cache refreshed with {len(catalog)} certifications",
+        "catalog": catalog.stats()
     }
 
 
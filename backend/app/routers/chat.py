@@ -12,6 +12,7 @@ router = APIRouter(prefix="/chat-rag", tags=["chat-rag"])
 class ChatRequest(BaseModel):
     question: str
     user_id: str | None = None
+    langues: list[str] | None = None  # ex. ["Français"]
 
 
 @router.post("/")
@@ -46,7 +47,8 @@ QUESTION :
     # ========== 2) Sinon → on utilise RAG (Neo4j) ==========
     relevant = search_relevant_certifications(
         question=req.question,
-        user_id=req.user_id
+        user_id=req.user_id,
+        user_profile={"langues": req.langues} if req.langues else None
     )
 
     context_text = "\n\n".join([c["text"] for c in relevant])
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from fastapi import APIRouter
 from pydantic import BaseModel
 from app.services.rag_service import search_relevant_certifications
@@ -12,6 +14,8 @@ router = APIRouter(tags=["chat-rag"])
 class ChatRequest(BaseModel):
     question: str
     user_id: str | None = None
+    retrieval_mode: Literal["graph", "vector", "hybrid"] | None = None  # défaut: RETRIEVAL_MODE (valeur inconnue -> 422)
+    langues: list[str] | None = None  # ex. ["Français"] (défaut: langue détectée dans la conversation)
 
 
 class ResetPreferencesRequest(BaseModel):
@@ -51,7 +55,7 @@ def clear_conversation_memory(user_id: str = None):
 def detect_user_preferences(text: str) -> dict:
     """
     Detect explicit user preferences from chat message.
-    Returns dict with 'level', 'domain', 'budget' if detected.
+    Returns dict with 'level', 'domain', 'budget', 'langues' if detected.
     """
     text_lower = text.lower()
     prefs = {}
@@ -98,6 +102,15 @@ def detect_user_preferences(text: str) -> dict:
             prefs["domain"] = domain
             break
 
+    # Detect training language (values of Certification.langues)
+    language_patterns = [
+        (r"\b(?:en|in)\s+(?:français|francais|french)\b|\bfrancophone\b", "Français"),
+        (r"\b(?:en|in)\s+(?:anglais|english)\b|\banglophone\b", "Anglais"),
+    ]
+    languages = [language for pattern, language in language_patterns if re.search(pattern, text_lower)]
+    if languages:
+        prefs["langues"] = languages
+
     # Detect budget
     budget_match = re.search(r'(\d+(?:\.\d+)?)\s*(?:€|eur|euros?)', text_lower)
     if budget_match:
@@ -207,6 +220,7 @@ def chat_rag(req: ChatRequest):
         "niveau": current_prefs.get("level"),
         "budget": current_prefs.get("budget"),
         "domains": [current_prefs.get("domain")] if current_prefs.get("domain") else None,
+        "langues": req.langues or current_prefs.get("langues"),
         "competences": []
     }
 
@@ -227,7 +241,8 @@ def chat_rag(req: ChatRequest):
             question=user_text,
             user_id=uid,
             top_k=10,
-            user_profile=user_profile
+            user_profile=user_profile,
+            retrieval_mode=req.retrieval_mode
         )
 
         # Update pdf_skills with any preference overrides
@@ -266,7 +281,8 @@ def chat_rag(req: ChatRequest):
         question=user_text,
         user_id=uid,
         top_k=10,
-        user_profile=user_profile if any(user_profile.values()) else None
+        user_profile=user_profile if any(user_profile.values()) else None,
+        retrieval_mode=req.retrieval_mode
     )
 
     recommendations = rag_result.get("recommendations", [])
@@ -310,7 +326,7 @@ def chat_rag(req: ChatRequest):
 @router.post("/reset-preferences")
 def reset_preferences(req: ResetPreferencesRequest = None):
     """
-    Reset user preferences (level, domain, budget) without clearing PDF or conversation.
+    Reset user preferences (level, domain, budget, languages) without clearing PDF or conversation.
     Useful when user wants to start fresh with different criteria.
     """
     global user_preferences
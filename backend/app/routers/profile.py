@@ -11,6 +11,7 @@ class Profile(BaseModel):
     budget: int
     temps_par_semaine: int
     competences: list[str]
+    langues: list[str] = []  # langues de formation acceptées, ex. ["Français"] (vide = toutes)
 
 @router.post("/")
 def save_user_profile(profile: Profile):
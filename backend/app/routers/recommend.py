@@ -1,12 +1,15 @@
+from typing import Literal
+
 from fastapi import APIRouter
 from app.services.recommender import get_recommendations_from_db
 
 router = APIRouter(prefix="/recommend", tags=["recommend"])
 
 @router.get("/{user_id}")
-def recommend_for_user(user_id: str):
+def recommend_for_user(user_id: str, retrieval_mode: Literal["graph", "vector", "hybrid"] | None = None):
     """
     Lit le profil dans Neo4j et renvoie les certifications recommandées.
+    retrieval_mode (optionnel): graph | vector | hybrid.
     """
-    recommandations = get_recommendations_from_db(user_id)
+    recommandations = get_recommendations_from_db(user_id, retrieval_mode=retrieval_mode)
     return {"recommandations": recommandations}
@@ -0,0 +1,132 @@
+# ================================
+# BM25 INDEX
+# In-memory lexical retrieval over titre / objectif / competences
+# ================================
+#
+# Okapi BM25 with posting lists stored as numpy arrays: a query only touches
+# the postings of its own terms. Complements the dense VectorIndex (exact
+# terms, acronyms, exam codes) - both rankings are fused with RRF in
+# graph_reasoning (retrieval_mode="hybrid").
+
+import re
+import time
+import unicodedata
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = {
+    # Français
+    "le", "la", "les", "un", "une", "des", "de", "du", "d", "l", "et", "ou", "en", "au", "aux",
+    "pour", "par", "sur", "avec", "dans", "que", "qui", "je", "tu", "il", "nous", "vous", "mon",
+    "ma", "mes", "est", "suis", "ai", "a", "se", "sa", "son", "ses", "ce", "cette", "ces", "pas",
+    # English
+    "the", "an", "and", "or", "of", "to", "in", "on", "for", "with", "is", "are", "i", "my", "be",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, accents folded, stopwords removed ("Données Azure" -> ["donnees", "azure"])."""
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return [tok for tok in _TOKEN_RE.findall(text) if tok not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of (id, text) documents."""
+
+    def __init__(self, texts: list[str], ids: list[str], k1: float = 1.5, b: float = 0.75):
+        self.ids = list(ids)
+        self.k1 = k1
+        self.b = b
+
+        docs = [tokenize(text) for text in texts]
+        self.doc_len = np.array([len(doc) for doc in docs], dtype=np.float32)
+        self.avg_len = float(self.doc_len.mean()) if len(docs) else 0.0
+
+        # term -> (rows, term frequencies)
+        postings = {}
+        for row, doc in enumerate(docs):
+            counts = {}
+            for tok in doc:
+                counts[tok] = counts.get(tok, 0) + 1
+            for tok, tf in counts.items():
+                postings.setdefault(tok, ([], []))
+                postings[tok][0].append(row)
+                postings[tok][1].append(tf)
+
+        n = len(docs)
+        self.postings = {}
+        self.idf = {}
+        for tok, (rows, tfs) in postings.items():
+            self.postings[tok] = (np.array(rows, dtype=np.int64), np.array(tfs, dtype=np.float32))
+            df = len(rows)
+            self.idf[tok] = float(np.log(1 + (n - df + 0.5) / (df + 0.5)))
+
+        # Length normalisation, computed once
+        self._norm = self.k1 * (1 - self.b + self.b * self.doc_len / (self.avg_len or 1.0))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for `query` (0 for documents without query terms)."""
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for tok in set(tokenize(query)):
+            posting = self.postings.get(tok)
+            if posting is None:
+                continue
+            rows, tfs = posting
+            scores[rows] += self.idf[tok] * tfs * (self.k1 + 1) / (tfs + self._norm[rows])
+        return scores
+
+    def search(self, query: str, k: int) -> tuple[list[str], np.ndarray]:
+        """Ids and scores of the k best-scoring documents (score > 0), best first."""
+        scores = self.scores(query)
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) == 0 or k <= 0:
+            return [], np.zeros(0, dtype=np.float32)
+
+        k = min(k, len(hits))
+        top = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [self.ids[i] for i in top], scores[top]
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60, limit: int = None) -> list[tuple[str, float]]:
+    """
+    Fuse ranked id lists: score(id) = sum(1 / (k + rank)), rank starting at 1.
+    Returns (id, score) pairs, best first; ties keep first-seen order.
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    return ranked[:limit] if limit is not None else ranked
+
+
+# ============================================================
+# CLI RUNNER - latency of the retrieval modes on the live catalog
+# ============================================================
+
+if __name__ == "__main__":
+    import sys
+
+    from app.services.graph_reasoning import compare_retrieval_modes
+
+    queries = sys.argv[1:] or [
+        "Je veux apprendre AWS et le cloud computing",
+        "data engineer spark databricks avec 3 ans d'expérience",
+        "certification machine learning TensorFlow pour débutant",
+        "analyse de données Power BI et SQL",
+        "sécurité des architectures Azure",
+    ]
+
+    start = time.perf_counter()
+    report = compare_retrieval_modes(queries)
+    print(f"Compared {len(queries)} queries in {time.perf_counter() - start:.2f}s")
+    for mode, stats in report.items():
+        print(f"  {mode:7s} {stats}")
@@ -0,0 +1,357 @@
+# ================================
+# CATALOG SNAPSHOT
+# One immutable, versioned view of the certification catalog,
+# shared by graph_reasoning, rag_service and skill_extractor
+# ================================
+#
+# The catalog is read and embedded once. Every (re)load builds a new
+# CatalogSnapshot and publishes it by rebinding _snapshot (atomic in Python),
+# so a reader that took a snapshot keeps one consistent catalog - never an
+# empty, half-patched or mixed stale/fresh one - and never waits for a refresh.
+
+import threading
+import time
+
+import numpy as np
+
+from app.config import CATALOG_REFRESH_LAG_SECONDS
+from app.database import execute_query
+from app.services.embedding_store import compact_store, encode_with_store
+from app.services.vector_index import VectorIndex
+from app.services.skill_index import SkillIndex, cert_skill_list
+from app.services.scoring_engine import ScoringEngine
+from app.services.bm25_index import BM25Index
+
+_CATALOG_QUERY = """
+    MATCH (c:Certification)
+    WHERE c.competences IS NOT NULL {where}
+    RETURN
+        c.id AS id,
+        c.titre AS titre,
+        c.domaine AS domaine,
+        c.niveau AS niveau,
+        c.objectif AS objectif,
+        c.competences AS competences,
+        c.duree AS duree,
+        c.prix AS prix,
+        c.url AS url,
+        c.langues AS langues,
+        c.temps_par_semaine AS temps_par_semaine,
+        c.updated_at.epochMillis AS updated_ms
+    """
+
+
+def build_certification_text(cert: dict) -> str:
+    """Searchable text used for embeddings, BM25 and cross-encoder input."""
+    competences = cert.get("competences") or []
+    if isinstance(competences, str):
+        competences = competences.split(", ")
+    return f"{cert.get('titre', '')} - {cert.get('objectif', '')} - {', '.join(competences)}"
+
+
+def catalog_skills(certifications: list[dict]) -> list[str]:
+    """Canonical skill vocabulary: distinct trimmed competences, sorted."""
+    return sorted({skill for cert in certifications for skill in cert_skill_list(cert.get("competences")) if skill})
+
+
+class CatalogSnapshot:
+    """
+    Certifications, texts, embeddings, skill vocabulary and indexes of one
+    catalog version. Treat as read-only once published.
+    """
+
+    def __init__(
+        self,
+        version: int = 0,
+        certifications: list[dict] = None,
+        texts: list[str] = None,
+        embeddings: np.ndarray = None,
+        revisions: dict = None,
+        watermark: int = None,
+        skills: list[str] = None,
+        skill_embeddings: np.ndarray = None,
+        vector_index: VectorIndex = None,
+        loaded: bool = True
+    ):
+        self.version = version
+        self.certifications = certifications or []
+        self.texts = texts or []
+        self.embeddings = embeddings
+        self.ids = [cert.get("id") for cert in self.certifications]
+        self.index = {cert_id: i for i, cert_id in enumerate(self.ids)}  # id -> row
+        self.revisions = revisions or {}  # id -> version of its last change (per-certification caches)
+        self.watermark = watermark        # max updated_at (epoch ms) seen, for delta refreshes
+        self.skills = skills or []
+        self.skill_embeddings = skill_embeddings
+        self.loaded = loaded
+
+        # Indexes (ANN, skill postings + filter masks, level/domain features, BM25)
+        self.vector_index = vector_index
+        self.skill_index = SkillIndex(self.certifications) if loaded else None
+        self.filters = self.skill_index.filters if loaded else None
+        self.scoring = ScoringEngine(self.certifications) if loaded else None
+        self.bm25 = BM25Index(self.texts, self.ids) if loaded else None
+
+    def __len__(self):
+        return len(self.certifications)
+
+    def __bool__(self):
+        # A snapshot is always a snapshot: an empty or unloaded one must not
+        # make `catalog or get_catalog()` reload (and raise) behind a fallback
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "certifications": len(self.certifications),
+            "skills": len(self.skills),
+            "watermark": self.watermark,
+            "loaded": self.loaded
+        }
+
+
+_snapshot = CatalogSnapshot(loaded=False)
+_lock = threading.Lock()
+
+# Called with the new snapshot after every refresh_catalog(), in the refreshing
+# thread and outside _lock: keeps derived stores (Neo4j vector index) in sync
+_refresh_listeners = []
+
+
+def current_catalog() -> CatalogSnapshot:
+    """The published snapshot, without loading (may be the empty, unloaded one)."""
+    return _snapshot
+
+
+def get_catalog() -> CatalogSnapshot:
+    """The published snapshot, loading the catalog on first use."""
+    snapshot = _snapshot
+    if snapshot.loaded:
+        return snapshot
+
+    with _lock:
+        if not _snapshot.loaded:
+            _load_catalog()
+    return _snapshot
+
+
+def _fetch_certifications(where: str = "", params: dict = None) -> tuple[list[dict], int | None]:
+    """Catalog rows (without updated_ms) and the newest updated_at among them."""
+    certifications = []
+    watermark = None
+    for r in execute_query(_CATALOG_QUERY.format(where=where), params or {}):
+        cert = dict(r)
+        updated = cert.pop("updated_ms", None)
+        if updated is not None:
+            watermark = updated if watermark is None else max(watermark, updated)
+        certifications.append(cert)
+    return certifications, watermark
+
+
+def _embed_skills(skills: list[str], previous: CatalogSnapshot) -> np.ndarray | None:
+    """Skill vectors, reusing the previous snapshot's rows; only unknown skills hit the store."""
+    if not skills:
+        return None
+    if previous.skill_embeddings is None:
+        return encode_with_store(skills)
+
+    known = {skill: i for i, skill in enumerate(previous.skills)}
+    missing = [skill for skill in skills if skill not in known]
+    fresh = dict(zip(missing, encode_with_store(missing))) if missing else {}
+
+    embeddings = np.zeros((len(skills), previous.skill_embeddings.shape[1]), dtype=np.float32)
+    for i, skill in enumerate(skills):
+        embeddings[i] = previous.skill_embeddings[known[skill]] if skill in known else fresh[skill]
+    return embeddings
+
+
+def _publish(certifications, texts, embeddings, watermark, changed_ids=None):
+    """
+    Build a snapshot for a catalog and publish it (caller holds _lock).
+    changed_ids=None means a full load (every certification gets a new revision).
+    """
+    global _snapshot
+    previous = _snapshot
+    version = previous.version + 1
+    ids = [cert.get("id") for cert in certifications]
+
+    if changed_ids is None:
+        revisions = {cert_id: version for cert_id in ids}
+    else:
+        revisions = {cert_id: previous.revisions.get(cert_id, version) for cert_id in ids}
+        revisions.update({cert_id: version for cert_id in changed_ids})
+
+    # Delta: keep the trained IVF centroids, rows are only re-assigned
+    previous_index = previous.vector_index if changed_ids is not None else None
+    vector_index = None
+    if embeddings is not None:
+        vector_index = VectorIndex(
+            embeddings, ids,
+            centroids=previous_index.centroids if previous_index is not None else None
+        )
+
+    skills = catalog_skills(certifications)
+
+    _snapshot = CatalogSnapshot(
+        version=version,
+        certifications=certifications,
+        texts=texts,
+        embeddings=embeddings,
+        revisions=revisions,
+        watermark=watermark,
+        skills=skills,
+        skill_embeddings=_embed_skills(skills, previous),
+        vector_index=vector_index
+    )
+
+
+def _load_catalog():
+    """Query and embed the whole catalog (caller holds _lock)."""
+    print("[catalog] Loading catalog...")
+    start = time.time()
+
+    certifications, watermark = _fetch_certifications()
+    texts = [build_certification_text(cert) for cert in certifications]
+
+    # Only texts not already in the on-disk store are encoded
+    embeddings = encode_with_store(texts) if texts else None
+
+    _publish(certifications, texts, embeddings, watermark)
+
+    # Full load: drop store rows no longer used by certification or skill texts
+    compact_store(texts + list(_snapshot.skills))
+
+    elapsed = time.time() - start
+    print(f"[catalog] Catalog v{_snapshot.version} loaded: {len(certifications)} certifications, "
+          f"{len(_snapshot.skills)} skills in {elapsed:.2f}s")
+
+
+def _refresh_delta() -> dict:
+    """
+    Patch the snapshot with certifications changed since the watermark
+    (updated_at), new ids and deleted ids; only changed texts are re-embedded.
+    Caller holds _lock. Returns {"changed": n, "removed": n}.
+    """
+    start = time.time()
+    previous = _snapshot
+
+    current_ids = [r["id"] for r in execute_query(
+        "MATCH (c:Certification) WHERE c.competences IS NOT NULL RETURN c.id AS id"
+    )]
+    known = previous.index
+    new_ids = [cert_id for cert_id in current_ids if cert_id not in known]
+    removed = set(known) - set(current_ids)
+
+    # updated_at is taken when a write starts, which can be before the watermark
+    # even though it commits after we read: re-read a safety window behind it
+    since = max(0, previous.watermark - int(CATALOG_REFRESH_LAG_SECONDS * 1000)) if previous.watermark else 0
+    changed, watermark = _fetch_certifications(
+        "AND (c.updated_at >= datetime({epochMillis: $since}) OR c.id IN $new_ids)",
+        {"since": since, "new_ids": new_ids}
+    )
+    if previous.watermark is not None:
+        watermark = previous.watermark if watermark is None else max(watermark, previous.watermark)
+
+    # The safety window is re-read every time: drop rows that did not change
+    changed = [
+        cert for cert in changed
+        if cert.get("id") not in known or previous.certifications[known[cert.get("id")]] != cert
+    ]
+
+    if not changed and not removed:
+        print(f"[catalog] Delta refresh: no changes ({(time.time() - start) * 1000:.0f}ms)")
+        return {"changed": 0, "removed": 0}
+
+    changed_by_id = {cert.get("id"): cert for cert in changed}
+    changed_texts = {cert_id: build_certification_text(cert) for cert_id, cert in changed_by_id.items()}
+    changed_vectors = dict(zip(
+        changed_texts.keys(),
+        encode_with_store(list(changed_texts.values())) if changed_texts else []
+    ))
+
+    # Unchanged rows keep their position, changed rows are replaced, new ones appended
+    certifications, texts, old_rows = [], [], []
+    for cert_id, row in known.items():
+        if cert_id in removed:
+            continue
+        if cert_id in changed_by_id:
+            certifications.append(changed_by_id.pop(cert_id))
+            texts.append(changed_texts[cert_id])
+            old_rows.append(-1)
+        else:
+            certifications.append(previous.certifications[row])
+            texts.append(previous.texts[row])
+            old_rows.append(row)
+    for cert_id, cert in changed_by_id.items():
+        certifications.append(cert)
+        texts.append(changed_texts[cert_id])
+        old_rows.append(-1)
+
+    embeddings = None
+    if certifications:
+        dim = (previous.embeddings if previous.embeddings is not None
+               else next(iter(changed_vectors.values()))).shape[-1]
+        embeddings = np.zeros((len(certifications), dim), dtype=np.float32)
+        old_rows = np.array(old_rows, dtype=np.int64)
+        kept = old_rows >= 0
+        if kept.any():
+            embeddings[kept] = previous.embeddings[old_rows[kept]]
+        for i in np.flatnonzero(~kept):
+            embeddings[i] = changed_vectors[certifications[i].get("id")]
+
+    _publish(certifications, texts, embeddings, watermark, changed_texts.keys())
+
+    print(f"[catalog] Delta refresh to v{_snapshot.version}: {len(changed_texts)} changed, "
+          f"{len(removed)} removed in {(time.time() - start) * 1000:.0f}ms")
+    return {"changed": len(changed_texts), "removed": len(removed)}
+
+
+def add_refresh_listener(callback):
+    """Call `callback(snapshot)` after every refresh_catalog() (idempotent)."""
+    if callback not in _refresh_listeners:
+        _refresh_listeners.append(callback)
+
+
+def refresh_catalog(full: bool = False) -> CatalogSnapshot:
+    """
+    Refresh the snapshot after Neo4j data changes.
+    Incremental by default (certifications whose updated_at moved, new and deleted
+    ids); full=True re-reads everything. Requests keep using the previous snapshot
+    until the new one is published.
+    """
+    with _lock:
+        if full or not _snapshot.loaded or _snapshot.watermark is None:
+            _load_catalog()
+        else:
+            _refresh_delta()
+        snapshot = _snapshot
+
+    for callback in list(_refresh_listeners):
+        try:
+            callback(snapshot)
+        except Exception as e:
+            print(f"[catalog] Refresh listener failed: {e}")
+    return snapshot
+
+
+_refresher = {"thread": None}
+
+
+def start_catalog_refresher(interval_seconds: float):
+    """Poll Neo4j for catalog changes every `interval_seconds` (delta refresh, background thread)."""
+    if interval_seconds <= 0 or _refresher["thread"] is not None:
+        return
+
+    def run():
+        while True:
+            time.sleep(interval_seconds)
+            if not _snapshot.loaded:
+                continue
+            try:
+                refresh_catalog()
+            except Exception as e:
+                print(f"[catalog] Catalog refresh failed: {e}")
+
+    _refresher["thread"] = threading.Thread(target=run, name="catalog-refresher", daemon=True)
+    _refresher["thread"].start()
+    print(f"[catalog] Catalog refresher started (every {interval_seconds:.0f}s)")
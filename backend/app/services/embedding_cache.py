@@ -0,0 +1,58 @@
+# ================================
+# EMBEDDING CACHE
+# In-memory LRU for short, frequently repeated inputs
+# (user queries, extracted skill strings)
+# ================================
+
+import numpy as np
+
+from app.config import EMBEDDING_CACHE_SIZE
+from app.services.lru_cache import LRUCache
+from app.services.micro_batcher import batched_encode
+from app.services.model_registry import DEFAULT_ENCODER
+
+_cache = LRUCache(maxsize=EMBEDDING_CACHE_SIZE, name="embeddings")
+
+
+def normalize_text(text: str) -> str:
+    """Cache key form: lowercase, single spaces ("  AWS " == "aws")."""
+    return " ".join(text.lower().split())
+
+
+def encode_cached(texts: list[str], model_name: str = DEFAULT_ENCODER) -> np.ndarray:
+    """
+    Normalized float32 embeddings for `texts`, one row per text.
+    Cached texts are served from memory; the rest are encoded in one batch.
+    """
+    keys = [normalize_text(t) for t in texts]
+
+    vectors = [None] * len(texts)
+    pending = {}
+    for i, key in enumerate(keys):
+        vector = _cache.get((model_name, key))
+        if vector is None:
+            pending.setdefault(key, []).append(i)
+        else:
+            vectors[i] = vector
+
+    if pending:
+        # Shares a forward pass with concurrent callers (micro-batching)
+        encoded = batched_encode(list(pending.keys()), model_name)
+        for (key, positions), vector in zip(pending.items(), encoded):
+            vector.flags.writeable = False  # shared between requests
+            _cache.put((model_name, key), vector)
+            for i in positions:
+                vectors[i] = vector
+
+    if not vectors:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.stack(vectors)
+
+
+def encode_one(text: str, model_name: str = DEFAULT_ENCODER) -> np.ndarray:
+    """Single-text shortcut for encode_cached."""
+    return encode_cached([text], model_name)[0]
+
+
+def get_embedding_cache_stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,253 @@
+# ================================
+# EMBEDDING STORE
+# Persistent, content-hash-keyed embeddings on disk
+# ================================
+#
+# One append-only file per (model, backend): <slug>.emb
+#   header   b"EMBSTOR1" + uint32 dim
+#   records  20-byte sha1 of the text + dim float32 (normalized embedding)
+# A hash and its vector live in the same record, so rows and keys can never
+# drift apart. The file is memory-mapped on read.
+#
+# Several workers / pods may share the directory: appends take an fcntl lock
+# on <slug>.lock, re-read the records other processes added since our last
+# look (reload-and-merge), then append only the rows still missing.
+# compact_store() rewrites the file without stale rows (per-process temp
+# file + atomic rename, under the same lock).
+#
+# Loaders call encode_with_store(texts): known texts are read from the
+# file, only new or changed texts go through the model.
+
+import hashlib
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from app.config import EMBEDDING_STORE_DIR, INFERENCE_BACKEND
+from app.services.model_registry import DEFAULT_ENCODER, get_encoder
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev setups only
+    fcntl = None
+
+MAGIC = b"EMBSTOR1"
+HEADER_BYTES = len(MAGIC) + 4
+HASH_BYTES = 20
+
+_stores = {}
+_lock = threading.Lock()
+
+
+def text_hash(text: str) -> str:
+    """Stable content key for a text."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _slug(model_name: str) -> str:
+    # Quantized backends produce slightly different vectors: keep them apart
+    return re.sub(r"[^a-zA-Z0-9_.-]+", "_", f"{model_name}__{INFERENCE_BACKEND}")
+
+
+def _paths(model_name: str) -> tuple[str, str]:
+    base = os.path.join(EMBEDDING_STORE_DIR, _slug(model_name))
+    return base + ".emb", base + ".lock"
+
+
+def _record_dtype(dim: int) -> np.dtype:
+    # Raw bytes, not "S20": numpy strips trailing NUL bytes from S fields
+    return np.dtype([("hash", "u1", (HASH_BYTES,)), ("vector", "<f4", (dim,))])
+
+
+class _FileLock:
+    """Exclusive lock shared by every process using the store directory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+
+
+def _read_dim(path: str) -> int | None:
+    with open(path, "rb") as f:
+        header = f.read(HEADER_BYTES)
+    if len(header) < HEADER_BYTES or header[:len(MAGIC)] != MAGIC:
+        return None
+    return int(np.frombuffer(header[len(MAGIC):], dtype="<u4")[0])
+
+
+def _reload(model_name: str, store: dict):
+    """
+    Map the records added to the file since our last look (caller holds _lock).
+    A replaced file (compaction by another process) is re-read from scratch;
+    a trailing partial record (crash mid-append) is ignored.
+    """
+    path, _ = _paths(model_name)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        store.update({"records": None, "rows": {}, "inode": None, "size": 0, "count": 0})
+        return
+
+    if stat.st_ino != store.get("inode"):
+        store.update({"records": None, "rows": {}, "inode": stat.st_ino, "size": 0, "count": 0})
+    if stat.st_size == store["size"]:
+        return
+
+    try:
+        dim = _read_dim(path)
+        if dim is None:
+            print(f"[embedding_store] Warning: {path} has no valid header, ignoring")
+            return
+        dtype = _record_dtype(dim)
+        count = (stat.st_size - HEADER_BYTES) // dtype.itemsize
+        records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_BYTES, shape=(count,)) if count else None
+    except Exception as e:
+        print(f"[embedding_store] Warning: could not read store for {model_name}: {e}")
+        return
+
+    rows = store["rows"]
+    start = store["count"]
+    if records is not None:
+        for i, h in enumerate(np.asarray(records["hash"][start:]), start):
+            rows.setdefault(h.tobytes().hex(), i)  # first record of a hash wins
+    store.update({"records": records, "dim": dim, "size": stat.st_size, "count": count})
+
+
+def _append_records(model_name: str, store: dict, hashes: list[str], vectors: np.ndarray):
+    """Append rows in place (caller holds _lock and the file lock, after a _reload)."""
+    path, _ = _paths(model_name)
+    dim = int(vectors.shape[1])
+    if store["records"] is not None and store.get("dim") != dim:
+        raise ValueError(f"dimension {dim} does not match store dimension {store['dim']}")
+
+    records = np.zeros(len(hashes), dtype=_record_dtype(dim))
+    records["hash"] = np.frombuffer(b"".join(bytes.fromhex(h) for h in hashes), dtype="u1").reshape(-1, HASH_BYTES)
+    records["vector"] = vectors
+
+    with open(path, "ab") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            f.write(MAGIC + np.array([dim], dtype="<u4").tobytes())
+        elif (size - HEADER_BYTES) % records.dtype.itemsize:
+            # Partial record left by a crash: drop it before appending
+            f.truncate(size - (size - HEADER_BYTES) % records.dtype.itemsize)
+        f.write(records.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    _reload(model_name, store)
+
+
+def _open_store(model_name: str) -> dict:
+    """The store for a model, refreshed with the rows other processes appended (caller holds _lock)."""
+    store = _stores.get(model_name)
+    if store is None:
+        store = _stores[model_name] = {"records": None, "rows": {}, "inode": None, "size": 0, "count": 0, "dim": None}
+        try:
+            with _FileLock(_paths(model_name)[1]):
+                _reload(model_name, store)
+        except Exception as e:
+            print(f"[embedding_store] Warning: could not open store for {model_name}: {e}")
+    else:
+        _reload(model_name, store)
+    return store
+
+
+def compact_store(keep_texts: list[str], model_name: str = DEFAULT_ENCODER) -> int:
+    """
+    Rewrite the store with only the rows of `keep_texts` (one per hash).
+    Returns the number of rows removed. Other processes pick up the new
+    file on their next lookup; rows they still need are re-encoded.
+    """
+    keep = {text_hash(t) for t in keep_texts}
+    path, lock_path = _paths(model_name)
+
+    with _lock:
+        store = _open_store(model_name)
+        try:
+            with _FileLock(lock_path):
+                _reload(model_name, store)
+                if store["records"] is None:
+                    return 0
+                rows = sorted(i for h, i in store["rows"].items() if h in keep)
+                removed = len(store["records"]) - len(rows)
+                if removed == 0:
+                    return 0
+
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(MAGIC + np.array([store["dim"]], dtype="<u4").tobytes())
+                    f.write(np.ascontiguousarray(store["records"][rows]).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+                _reload(model_name, store)
+        except Exception as e:
+            print(f"[embedding_store] Warning: could not compact store: {e}")
+            return 0
+
+    print(f"[embedding_store] Compacted {model_name}: {removed} stale rows removed, {len(rows)} kept")
+    return removed
+
+
+def encode_with_store(texts: list[str], model_name: str = DEFAULT_ENCODER) -> np.ndarray:
+    """
+    Return normalized float32 embeddings for `texts` (one row per text).
+    Texts already in the store are read from disk; only the others are encoded.
+    The model runs outside _lock: _lock only covers the lookup and the append,
+    so one thread encoding a new catalog never blocks lookups of known texts.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    start = time.time()
+    hashes = [text_hash(t) for t in texts]
+
+    with _lock:
+        store = _open_store(model_name)
+        known = {h: store["rows"][h] for h in set(hashes) if h in store["rows"]}
+        # Copy the known rows now: a compaction may replace the file once _lock is released
+        vectors = dict(zip(known, np.asarray(store["records"]["vector"][list(known.values())]))) if known else {}
+        missing = {h: t for h, t in zip(hashes, texts) if h not in known}
+
+    if missing:
+        encoded = get_encoder(model_name).encode(
+            list(missing.values()),
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        ).astype(np.float32)
+        fresh = dict(zip(missing.keys(), encoded))
+        vectors.update(fresh)
+
+        with _lock:
+            try:
+                with _FileLock(_paths(model_name)[1]):
+                    # Reload-and-merge: another process or thread may have added some meanwhile
+                    _reload(model_name, store)
+                    new = [h for h in fresh if h not in store["rows"]]
+                    if new:
+                        _append_records(model_name, store, new, np.stack([fresh[h] for h in new]))
+            except Exception as e:
+                # Read-only filesystem etc.: serve the fresh vectors from memory
+                print(f"[embedding_store] Warning: could not persist store: {e}")
+
+    embeddings = np.stack([vectors[h] for h in hashes]).astype(np.float32)
+
+    print(f"[embedding_store] {len(texts)} texts: {len(set(hashes)) - len(missing)} from store, "
+          f"{len(missing)} encoded in {time.time() - start:.2f}s")
+    return embeddings
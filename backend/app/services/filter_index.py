@@ -0,0 +1,152 @@
+# ================================
+# FILTER INDEX
+# Precomputed boolean masks over the catalog for the request filters
+# ================================
+#
+# One mask per distinct domaine, niveau and langue value, plus cumulative
+# masks at fixed price buckets, built once per catalog snapshot. A request's
+# filters then become a few mask lookups and one AND - no per-row string
+# comparison - and a combination nothing passes is known before any scoring.
+# Semantics are those of the Cypher WHERE clauses (_CERT_FILTERS).
+
+import numpy as np
+
+# Cumulative "prix <= bucket" masks; a budget between two buckets only adds
+# the rows priced in (bucket, budget] (one slice of the sorted prices)
+PRICE_BUCKETS = (0, 50, 100, 150, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000)
+
+
+def cert_languages(langues) -> list[str]:
+    """Lowercase languages of a certification (list or single string)."""
+    if langues is None:
+        return []
+    if isinstance(langues, (list, tuple)):
+        return [str(l).strip().lower() for l in langues]
+    return [str(langues).strip().lower()]
+
+
+def _value_masks(values: list) -> dict[str, np.ndarray]:
+    masks = {}
+    for row, value in enumerate(values):
+        if value is None:
+            continue
+        mask = masks.get(value)
+        if mask is None:
+            mask = masks[value] = np.zeros(len(values), dtype=bool)
+        mask[row] = True
+    return masks
+
+
+class FilterIndex:
+    """Filter masks for one list of certifications (row order is the list order)."""
+
+    def __init__(self, certifications: list[dict]):
+        n = len(certifications)
+        self.size = n
+        self.index = {c.get("id"): row for row, c in enumerate(certifications)}
+
+        domaines = [c.get("domaine").lower() if isinstance(c.get("domaine"), str) else None for c in certifications]
+        niveaux = [c.get("niveau").lower() if isinstance(c.get("niveau"), str) else None for c in certifications]
+        self.domaine_masks = _value_masks(domaines)
+        self.niveau_masks = _value_masks(niveaux)
+
+        self.langue_masks = {}
+        for row, cert in enumerate(certifications):
+            for langue in cert_languages(cert.get("langues")):
+                self.langue_masks.setdefault(langue, np.zeros(n, dtype=bool))[row] = True
+
+        # Prices: NaN when missing (a missing price never passes a budget)
+        self.prices = np.array(
+            [c.get("prix") if isinstance(c.get("prix"), (int, float)) else np.nan for c in certifications],
+            dtype=np.float64
+        )
+        priced = np.flatnonzero(~np.isnan(self.prices))
+        self._price_order = priced[np.argsort(self.prices[priced], kind="stable")]
+        self._sorted_prices = self.prices[self._price_order]
+        with np.errstate(invalid="ignore"):
+            self.bucket_masks = {bucket: self.prices <= bucket for bucket in PRICE_BUCKETS}
+
+        self._domain_targets = {}  # target -> OR of the domaine masks containing it
+        self._empty = np.zeros(n, dtype=bool)
+
+    # ------------------------------------------------------------
+    # Single filters
+    # ------------------------------------------------------------
+    def domain_mask(self, domains: list[str]) -> np.ndarray:
+        """domaine CONTAINS any target (case-insensitive)."""
+        mask = np.zeros(self.size, dtype=bool)
+        for target in domains:
+            target = target.lower()
+            target_mask = self._domain_targets.get(target)
+            if target_mask is None:
+                target_mask = np.zeros(self.size, dtype=bool)
+                for value, value_mask in self.domaine_masks.items():
+                    if target in value:
+                        target_mask |= value_mask
+                self._domain_targets[target] = target_mask
+            mask |= target_mask
+        return mask
+
+    def level_mask(self, level: str) -> np.ndarray:
+        """niveau equals level (case-insensitive)."""
+        return self.niveau_masks.get(level.lower(), self._empty)
+
+    def budget_mask(self, budget: float) -> np.ndarray:
+        """prix <= budget."""
+        mask = self.bucket_masks.get(budget)
+        if mask is not None:
+            return mask
+
+        below = [bucket for bucket in PRICE_BUCKETS if bucket <= budget]
+        if below:
+            mask = self.bucket_masks[below[-1]].copy()
+            start = np.searchsorted(self._sorted_prices, below[-1], side="right")
+        else:
+            mask = np.zeros(self.size, dtype=bool)
+            start = 0
+        end = np.searchsorted(self._sorted_prices, budget, side="right")
+        mask[self._price_order[start:end]] = True
+        return mask
+
+    def language_mask(self, languages) -> np.ndarray:
+        """Any requested language among the certification langues (case-insensitive)."""
+        mask = np.zeros(self.size, dtype=bool)
+        for langue in cert_languages(languages):
+            langue_mask = self.langue_masks.get(langue)
+            if langue_mask is not None:
+                mask |= langue_mask
+        return mask
+
+    def ids_mask(self, ids) -> np.ndarray:
+        rows = [self.index[cert_id] for cert_id in ids if cert_id in self.index]
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        return mask
+
+    # ------------------------------------------------------------
+    # Combination
+    # ------------------------------------------------------------
+    def mask(
+        self,
+        domains: list[str] = None,
+        level: str = None,
+        budget: float = None,
+        languages: list[str] = None,
+        candidate_ids: list[str] = None,
+        exclude_ids: list[str] = None
+    ) -> np.ndarray:
+        """Rows passing every given filter (a new array, safe to modify)."""
+        mask = np.ones(self.size, dtype=bool)
+        if level is not None:
+            mask &= self.level_mask(level)
+        if budget is not None:
+            mask &= self.budget_mask(budget)
+        if domains:
+            mask &= self.domain_mask(domains)
+        if languages:
+            mask &= self.language_mask(languages)
+        if candidate_ids is not None:
+            mask &= self.ids_mask(candidate_ids)
+        if exclude_ids:
+            mask &= ~self.ids_mask(exclude_ids)
+        return mask
@@ -3,16 +3,27 @@
 # Weighted skill matching & ranking using Neo4j
 # ================================
 
-from app.database import execute_query
 from app.services.skill_extractor import extract_skill_vector
-from sentence_transformers import SentenceTransformer, CrossEncoder, util
+from app.services.micro_batcher import batched_predict
+from app.services.embedding_cache import encode_cached, encode_one, normalize_text
+from app.services.lru_cache import LRUCache
+from app.config import (
+    RERANK_CACHE_SIZE, RETRIEVAL_MODE, VECTOR_CANDIDATES, RRF_K,
+    RERANK_MAX_CANDIDATES, RERANK_MARGIN, RERANK_BUDGET_MS, RERANK_PAIR_COST_MS
+)
+from app.services.catalog import CatalogSnapshot, get_catalog, current_catalog, build_certification_text
+from app.services.scoring_engine import ScoringEngine
+from app.services.bm25_index import reciprocal_rank_fusion
+from app.services.retrieval_backend import (
+    RetrievalBackend, get_retrieval_backend
+)
+import numpy as np
 import time
 
-# Embedding model for semantic similarity
-model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
-
-# Reranker model for better precision (lightweight)
-reranker = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2", max_length=512)
+# Models are fetched from the shared registry on first use:
+# - encoder: bi-encoder for semantic similarity
+# - reranker: lightweight cross-encoder for better precision
+# Calls go through embedding_cache / micro_batcher, never the models directly.
 
 
 # ================================
@@ -46,90 +57,46 @@ def normalize_competences(competences):
 
 
 # ================================
-# Certification Embeddings Cache
-# Pre-compute embeddings at startup for faster queries
+# Catalog snapshot (shared with rag_service / skill_extractor, see catalog.py)
 # ================================
-_cert_cache = {
-    "certifications": [],
-    "texts": [],
-    "embeddings": None,
-    "loaded": False
-}
+# Raw cross-encoder logits keyed by (normalized query, certification id, certification revision)
+_rerank_cache = LRUCache(maxsize=RERANK_CACHE_SIZE, name="rerank_scores")
 
 
-def load_certification_cache():
-    """
-    Pre-load and embed all certifications at startup.
-    This significantly speeds up semantic re-ranking.
-    """
-    global _cert_cache
+def get_cached_embedding(cert_id: str):
+    """Get cached embedding for a certification by ID."""
+    catalog = get_catalog()
 
-    if _cert_cache["loaded"]:
-        return _cert_cache
+    row = catalog.index.get(cert_id)
+    if row is None or catalog.embeddings is None:
+        return None
+    return catalog.embeddings[row]
 
-    print("[graph_reasoning] Loading certification cache...")
-    start = time.time()
 
-    query = """
-    MATCH (c:Certification)
-    WHERE c.competences IS NOT NULL
-    RETURN
-        c.id AS id,
-        c.titre AS titre,
-        c.domaine AS domaine,
-        c.objectif AS objectif,
-        c.competences AS competences
+def get_cached_embeddings(cert_ids: list[str], catalog: CatalogSnapshot = None) -> tuple[np.ndarray | None, list[int]]:
     """
+    Gather cached embeddings for many certifications in one indexing operation.
 
-    results = execute_query(query)
-
-    certifications = []
-    texts = []
-
-    for r in results:
-        cert = dict(r)
-        certifications.append(cert)
-
-        # Build searchable text for embedding
-        competences = cert.get("competences", [])
-        if isinstance(competences, str):
-            competences = competences.split(", ")
-
-        text = f"{cert.get('titre', '')} - {cert.get('objectif', '')} - {', '.join(competences)}"
-        texts.append(text)
-
-    if texts:
-        embeddings = model.encode(texts, convert_to_tensor=True, show_progress_bar=False)
-    else:
-        embeddings = None
-
-    _cert_cache["certifications"] = certifications
-    _cert_cache["texts"] = texts
-    _cert_cache["embeddings"] = embeddings
-    _cert_cache["loaded"] = True
-
-    elapsed = time.time() - start
-    print(f"[graph_reasoning] Cache loaded: {len(certifications)} certifications in {elapsed:.2f}s")
-
-    return _cert_cache
-
-
-def get_cached_embedding(cert_id: str):
-    """Get cached embedding for a certification by ID."""
-    cache = load_certification_cache()
+    Returns:
+        (matrix, missing) - matrix has one row per id (zeros where the id is not
+        cached), missing lists the positions in `cert_ids` without a cached vector.
+        matrix is None when the cache holds no embeddings at all.
+    """
+    if catalog is None:
+        catalog = get_catalog()
+    embeddings = catalog.embeddings
 
-    for i, cert in enumerate(cache["certifications"]):
-        if cert.get("id") == cert_id:
-            return cache["embeddings"][i] if cache["embeddings"] is not None else None
+    if embeddings is None:
+        return None, list(range(len(cert_ids)))
 
-    return None
+    index = catalog.index
+    rows = np.array([index.get(cert_id, -1) for cert_id in cert_ids], dtype=np.int64)
+    found = rows >= 0
 
+    matrix = np.zeros((len(cert_ids), embeddings.shape[1]), dtype=np.float32)
+    matrix[found] = embeddings[rows[found]]
 
-def refresh_certification_cache():
-    """Force refresh of certification cache (call after Neo4j data changes)."""
-    global _cert_cache
-    _cert_cache["loaded"] = False
-    return load_certification_cache()
+    return matrix, np.flatnonzero(~found).tolist()
 
 
 # ================================
@@ -140,12 +107,16 @@ def query_certifications_by_skills(
     domains: list[str] = None,
     level: str = None,
     budget: float = None,
-    limit: int = 100
+    limit: int = 100,
+    candidate_ids: list[str] = None,
+    catalog: CatalogSnapshot = None,
+    languages: list[str] = None,
+    exclude_ids: list[str] = None
 ) -> list[dict]:
     """
-    Query Neo4j for certifications matching the skill vector.
-    Uses Cypher to compute skill overlap scores.
-    Handles competences stored as comma-separated strings.
+    Find certifications matching the skill vector.
+    Served by the retrieval backend (RETRIEVAL_BACKEND: in-memory SkillIndex
+    or Cypher); the Neo4j backend is used while the catalog is not loaded.
 
     Args:
         skill_vector: {skill_name: weight} - weighted skills from user
@@ -153,149 +124,198 @@ def query_certifications_by_skills(
         level: Optional level filter (débutant, intermédiaire, avancé)
         budget: Optional max budget filter
         limit: Max results to return
+        candidate_ids: Optional first-stage candidates (restricts the scan)
+        catalog: Snapshot to read (default: the published one)
+        languages: Optional language filter (any of them in langues)
+        exclude_ids: Certifications to leave out (already held)
 
     Returns:
         List of certifications with relevance scores
     """
+    backend, catalog = _retrieval_backend(catalog)
+    return backend.skill_search(
+        skill_vector, domains, level, budget, limit, candidate_ids,
+        languages=languages, exclude_ids=exclude_ids, catalog=catalog
+    )
 
-    if not skill_vector:
-        # Fallback to basic query if no skills extracted
-        return query_certifications_basic(domains, level, budget, limit)
-
-    skill_names = list(skill_vector.keys())
-    skill_weights = skill_vector
-
-    # Cypher query - handles competences as either array or comma-separated string
-    # Uses text matching for skill overlap
-    query = """
-    WITH $skills AS user_skills, $weights AS weights
-
-    MATCH (c:Certification)
-    WHERE c.competences IS NOT NULL
-
-    // Apply optional filters
-    AND ($domains IS NULL OR size($domains) = 0 OR
-         ANY(d IN $domains WHERE toLower(c.domaine) CONTAINS toLower(d)))
-    AND ($level IS NULL OR toLower(c.niveau) = toLower($level))
-    AND ($budget IS NULL OR c.prix <= $budget)
-
-    // Handle both array and string formats for competences
-    WITH c, user_skills, weights,
-         CASE
-             WHEN c.competences IS :: LIST<ANY> THEN [s IN c.competences | trim(toString(s))]
-             ELSE [s IN split(toString(c.competences), ', ') | trim(s)]
-         END AS cert_skills
-
-    // Find matching skills (case-insensitive substring match)
-    WITH c, user_skills, weights, cert_skills,
-         [user_skill IN user_skills
-          WHERE ANY(cert_skill IN cert_skills
-                    WHERE toLower(cert_skill) CONTAINS toLower(user_skill)
-                       OR toLower(user_skill) CONTAINS toLower(cert_skill))] AS matching_skills
-
-    // Compute weighted score
-    WITH c, cert_skills, matching_skills,
-         size(matching_skills) AS match_count,
-         size(cert_skills) AS total_cert_skills,
-         REDUCE(score = 0.0, skill IN matching_skills |
-                score + COALESCE(weights[skill], 0.5)) AS weighted_score
-
-    // Compute normalized relevance score (0-100, capped)
-    WITH c, cert_skills, matching_skills, match_count, total_cert_skills, weighted_score,
-         CASE
-             WHEN size(matching_skills) = 0 THEN 0.0
-             ELSE toFloat(match_count) / toFloat(total_cert_skills) * 100
-         END AS raw_score
-
-    // Cap score at 100%
-    WITH c, cert_skills, matching_skills, match_count, total_cert_skills,
-         CASE WHEN raw_score > 100.0 THEN 100.0 ELSE raw_score END AS relevance_score
-
-    WHERE match_count > 0 OR $allow_no_match = true
-
-    RETURN
-        c.id AS id,
-        c.titre AS titre,
-        c.domaine AS domaine,
-        c.niveau AS niveau,
-        c.objectif AS objectif,
-        cert_skills AS competences,
-        c.duree AS duree,
-        c.prix AS prix,
-        c.url AS url,
-        c.langues AS langues,
-        c.temps_par_semaine AS temps_par_semaine,
-        matching_skills AS matched_skills,
-        match_count AS skill_matches,
-        total_cert_skills AS total_skills,
-        round(relevance_score * 100) / 100 AS relevance_score
-
-    ORDER BY relevance_score DESC, match_count DESC, c.prix ASC
-    LIMIT $limit
+
+def _retrieval_backend(catalog: CatalogSnapshot = None) -> tuple[RetrievalBackend, CatalogSnapshot]:
+    """Configured backend and snapshot; the Neo4j backend while the in-memory catalog is unavailable."""
+    if catalog is None:
+        try:
+            catalog = get_catalog()
+        except Exception as e:
+            print(f"[graph_reasoning] Catalog unavailable ({e})")
+            catalog = current_catalog()
+
+    backend = get_retrieval_backend()
+    if not backend.available(catalog):
+        print(f"[graph_reasoning] Retrieval backend '{backend.name}' unavailable, using Neo4j")
+        backend = get_retrieval_backend("neo4j")
+    return backend, catalog
+
+
+# ================================
+# Vector candidate generation
+# ================================
+def get_vector_candidates(
+    query_text: str,
+    k: int,
+    catalog: CatalogSnapshot = None,
+    domains: list[str] = None,
+    budget: float = None,
+    languages: list[str] = None,
+    exclude_ids: list[str] = None
+) -> list[str] | None:
+    """
+    First-stage retrieval: ids of the k certifications closest to the query
+    among those passing the filters (retrieval backend vector search).
+    Returns None when vector search is unavailable, so callers fall back to a full scan.
     """
+    backend, catalog = _retrieval_backend(catalog)
 
-    results = execute_query(query, {
-        "skills": skill_names,
-        "weights": skill_weights,
-        "domains": domains if domains else [],
-        "level": level,
-        "budget": budget,
-        "limit": limit,
-        "allow_no_match": len(skill_names) < 2  # Allow no-match results if few skills
-    })
+    start = time.time()
+    try:
+        ids, _ = backend.vector_search(
+            encode_one(query_text), k, domains, None, budget, languages, exclude_ids, catalog=catalog
+        )
+    except Exception as e:
+        print(f"[graph_reasoning] Vector search unavailable ({e}), using a full scan")
+        return None
+    if not ids:
+        return None
 
-    return [dict(r) for r in results]
+    print(f"[graph_reasoning] Vector candidates ({backend.name}): {len(ids)} in {(time.time() - start) * 1000:.1f}ms")
+    return ids
 
 
-def query_certifications_basic(
+def query_certifications_hybrid(
+    query_text: str,
+    skill_vector: dict[str, float],
+    domains: list[str] = None,
+    budget: float = None,
+    limit: int = 100,
+    catalog: CatalogSnapshot = None,
+    languages: list[str] = None,
+    exclude_ids: list[str] = None
+) -> list[dict] | None:
+    """
+    Hybrid retrieval: BM25 (titre/objectif/competences) and dense ANN rankings
+    fused with RRF, so a certification mentioning a query term only in its
+    objectif is still retrieved. Skill overlap is computed on the fused pool
+    (unmatched certifications kept), and relevance_score blends it with the
+    normalized RRF score. Every stage goes through the retrieval backend
+    (RETRIEVAL_BACKEND). Returns None when the snapshot is not loaded (no BM25).
+    """
+    backend, catalog = _retrieval_backend(catalog)
+    if catalog.bm25 is None:
+        return None
+
+    start = time.time()
+    depth = max(limit, VECTOR_CANDIDATES)
+    lexical_ids, _ = backend.lexical_search(query_text, depth, catalog=catalog)
+    dense_ids, _ = backend.vector_search(
+        encode_one(query_text), depth, domains, None, budget, languages, exclude_ids, catalog=catalog
+    )
+    fused = dict(reciprocal_rank_fusion([lexical_ids, dense_ids], k=RRF_K, limit=depth))
+    if not fused:
+        return []
+
+    certifications = backend.skill_search(
+        skill_vector, domains, None, budget,
+        limit=len(fused), candidate_ids=list(fused), allow_no_match=True,
+        languages=languages, exclude_ids=exclude_ids, catalog=catalog
+    )
+
+    best = max(fused.values())
+    for cert in certifications:
+        rrf = fused[cert["id"]]
+        cert["rrf_score"] = round(rrf, 5)
+        cert["relevance_score"] = round(0.5 * cert["relevance_score"] + 0.5 * rrf / best * 100, 2)
+
+    # Fused order first, then blended relevance (stable sort keeps RRF order on ties)
+    certifications.sort(key=lambda c: c["rrf_score"], reverse=True)
+    certifications.sort(key=lambda c: c["relevance_score"], reverse=True)
+
+    print(f"[graph_reasoning] Hybrid candidates ({backend.name}): {len(lexical_ids)} BM25 + {len(dense_ids)} dense "
+          f"-> {len(fused)} fused in {(time.time() - start) * 1000:.1f}ms")
+    return certifications[:limit]
+
+
+def retrieve_certifications(
+    user_text: str,
+    skill_vector: dict[str, float],
     domains: list[str] = None,
-    level: str = None,
     budget: float = None,
-    limit: int = 100
+    limit: int = 100,
+    retrieval_mode: str = None,
+    catalog: CatalogSnapshot = None,
+    languages: list[str] = None,
+    exclude_ids: list[str] = None
 ) -> list[dict]:
-    """Fallback query when no skills are provided. Uses TEACHES relationships."""
-
-    query = """
-    MATCH (c:Certification)
-    WHERE ($domains IS NULL OR size($domains) = 0 OR
-           ANY(d IN $domains WHERE toLower(c.domaine) CONTAINS toLower(d)))
-      AND ($level IS NULL OR toLower(c.niveau) = toLower($level))
-      AND ($budget IS NULL OR c.prix <= $budget)
-
-    // Get skills from TEACHES relationships
-    OPTIONAL MATCH (c)-[:TEACHES]->(s:Skill)
-
-    WITH c, collect(DISTINCT s.name) AS skills
-
-    RETURN
-        c.id AS id,
-        c.titre AS titre,
-        c.domaine AS domaine,
-        c.niveau AS niveau,
-        c.objectif AS objectif,
-        CASE WHEN size(skills) > 0 THEN skills ELSE c.competences END AS competences,
-        c.duree AS duree,
-        c.prix AS prix,
-        c.url AS url,
-        c.langues AS langues,
-        c.temps_par_semaine AS temps_par_semaine,
-        [] AS matched_skills,
-        0 AS skill_matches,
-        size(skills) AS total_skills,
-        0.0 AS relevance_score
-
-    ORDER BY c.prix ASC
-    LIMIT $limit
     """
+    Candidate stage of get_smart_recommendations for a retrieval mode (graph | vector | hybrid).
+    Every filter (domains, budget, languages, exclude_ids) is applied before scoring.
+    """
+    retrieval_mode = retrieval_mode or RETRIEVAL_MODE
+    if retrieval_mode not in ("graph", "vector", "hybrid"):
+        raise ValueError(f"Unknown retrieval mode '{retrieval_mode}' (expected graph, vector or hybrid)")
+    if catalog is None:
+        catalog = get_catalog()
+
+    if retrieval_mode == "hybrid":
+        certifications = query_certifications_hybrid(
+            user_text, skill_vector, domains, budget, limit, catalog, languages, exclude_ids
+        )
+        if certifications is not None:
+            return certifications
+        print("[graph_reasoning] Hybrid indexes unavailable, using graph retrieval")
+
+    # Optional first stage: restrict the scan to the nearest certifications
+    candidate_ids = None
+    if retrieval_mode == "vector":
+        candidate_ids = get_vector_candidates(
+            user_text, max(limit * 3, VECTOR_CANDIDATES), catalog, domains, budget, languages, exclude_ids
+        )
+
+    return query_certifications_by_skills(
+        skill_vector=skill_vector,
+        domains=domains,
+        level=None,  # Don't filter by level in query, we'll prioritize instead
+        budget=budget,
+        limit=limit,
+        candidate_ids=candidate_ids,
+        catalog=catalog,
+        languages=languages,
+        exclude_ids=exclude_ids
+    )
 
-    results = execute_query(query, {
-        "domains": domains if domains else [],
-        "level": level,
-        "budget": budget,
-        "limit": limit
-    })
 
-    return [dict(r) for r in results]
+def compare_retrieval_modes(queries: list[str], modes: tuple = ("graph", "vector", "hybrid"), limit: int = 30) -> dict:
+    """
+    Latency of the candidate stage per retrieval mode on the live catalog.
+    Skill vectors are extracted once (keyword mode) so only retrieval is timed.
+
+    Returns:
+        {"graph": {"avg_ms": 2.1, "p95_ms": 3.0, "avg_results": 30.0}, "hybrid": {...}, ...}
+    """
+    get_catalog()
+    inputs = [(q, extract_skill_vector(q, use_llm=False)["skill_vector"]) for q in queries]
+
+    report = {}
+    for mode in modes:
+        latencies, sizes = [], []
+        for query_text, skill_vector in inputs:
+            start = time.perf_counter()
+            results = retrieve_certifications(query_text, skill_vector, limit=limit, retrieval_mode=mode)
+            latencies.append((time.perf_counter() - start) * 1000)
+            sizes.append(len(results))
+        report[mode] = {
+            "avg_ms": round(float(np.mean(latencies)), 3) if latencies else 0.0,
+            "p95_ms": round(float(np.percentile(latencies, 95)), 3) if latencies else 0.0,
+            "avg_results": round(float(np.mean(sizes)), 1) if sizes else 0.0
+        }
+    return report
 
 
 # ================================
@@ -305,7 +325,11 @@ def rerank_with_semantics(
     certifications: list[dict],
     query_text: str,
     alpha: float = 0.7,  # Increased to give more weight to skill/level scores
-    use_reranker: bool = True
+    use_reranker: bool = True,
+    top_k: int = 10,
+    budget_ms: float = None,
+    trace: dict = None,
+    catalog: CatalogSnapshot = None
 ) -> list[dict]:
     """
     Re-rank certifications using semantic similarity and cross-encoder reranker.
@@ -316,6 +340,11 @@ def rerank_with_semantics(
         query_text: Original user query
         alpha: Weight for skill/level score (1-alpha for semantic). Default 0.7.
         use_reranker: Whether to use CrossEncoder for final reranking
+        top_k: Number of results the caller keeps (reranking never shrinks below it
+               unless the latency budget forces it)
+        budget_ms: Cross-encoder latency budget for this request (default RERANK_BUDGET_MS)
+        trace: Optional dict filled with the reranking decision (see plan_rerank)
+        catalog: Snapshot to read (default: the published one)
 
     Returns:
         Re-ranked certifications with combined scores
@@ -324,53 +353,68 @@ def rerank_with_semantics(
     if not certifications or not query_text:
         return certifications
 
-    # Ensure cache is loaded for fast embedding lookup
-    load_certification_cache()
+    # Encode user query (normalized: cosine similarity = dot product, LRU-cached)
+    query_embed = encode_one(query_text)
 
-    # Encode user query
-    query_embed = model.encode(query_text, convert_to_tensor=True)
+    # Certification texts (cross-encoder input)
+    cert_texts = [build_certification_text(c) for c in certifications]
 
-    # Build certification texts for embedding
-    cert_texts = []
-    for c in certifications:
-        competences = c.get('competences', [])
-        if isinstance(competences, str):
-            competences = competences.split(", ")
-        text = f"{c.get('titre', '')} - {c.get('objectif', '')} - {', '.join(competences)}"
-        cert_texts.append(text)
+    # Precomputed vectors for all candidates in one gather
+    if catalog is None:
+        catalog = get_catalog()
+    cert_embeddings, missing = get_cached_embeddings([c.get("id") for c in certifications], catalog)
+    if cert_embeddings is None:
+        cert_embeddings = np.zeros((len(certifications), query_embed.shape[0]), dtype=np.float32)
 
-    # Encode certifications (use cache if available, else compute)
-    cert_embeddings = model.encode(cert_texts, convert_to_tensor=True, show_progress_bar=False)
+    # Only certifications absent from the catalog cache are encoded
+    if missing:
+        cert_embeddings[missing] = encode_cached([cert_texts[i] for i in missing])
 
     # Compute semantic similarity (bi-encoder)
-    similarities = util.cos_sim(query_embed, cert_embeddings)[0]
+    similarities = cert_embeddings @ query_embed
 
     # Combine scores (Phase 1: bi-encoder)
     for i, cert in enumerate(certifications):
         skill_score = cert.get("relevance_score", 0)
-        semantic_score = similarities[i].item() * 100  # Scale to 0-100
+        semantic_score = float(similarities[i]) * 100  # Scale to 0-100
 
         # Combined score
         combined = (alpha * skill_score) + ((1 - alpha) * semantic_score)
         cert["semantic_score"] = round(semantic_score, 2)
         cert["combined_score"] = round(combined, 2)
 
-    # Sort by combined score (pre-reranking)
-    certifications.sort(key=lambda x: x.get("combined_score", 0), reverse=True)
+    # Sort by combined score (pre-reranking), keeping texts aligned with their certification
+    ranked = sorted(zip(certifications, cert_texts), key=lambda p: p[0].get("combined_score", 0), reverse=True)
+    certifications = [c for c, _ in ranked]
+    cert_texts = [t for _, t in ranked]
 
     # Phase 2: Cross-encoder reranking (more precise but slower)
-    if use_reranker and len(certifications) >= 2:
-        # Only rerank top candidates for efficiency
-        top_k = min(15, len(certifications))
-        top_certs = certifications[:top_k]
-        rest_certs = certifications[top_k:]
+    # Adaptive: skipped or shrunk when the margin is decisive, capped by the latency budget
+    # (only pairs missing from the score cache cost model time)
+    if use_reranker:
+        keys = _rerank_keys(query_text, certifications[:RERANK_MAX_CANDIDATES], catalog)
+        plan = plan_rerank(
+            [c.get("combined_score", 0) for c in certifications],
+            top_k,
+            RERANK_BUDGET_MS if budget_ms is None else budget_ms,
+            cached=[key is not None and key in _rerank_cache for key in keys]
+        )
+    else:
+        plan = {"action": "skipped", "reason": "disabled", "size": 0}
+    print(f"[graph_reasoning] Rerank plan: {plan['action']} ({plan['reason']}), size {plan['size']}")
+
+    if plan["size"] >= 2:
+        rerank_size = plan["size"]
+        top_certs = certifications[:rerank_size]
+        rest_certs = certifications[rerank_size:]
 
         # Prepare pairs for cross-encoder
-        pairs = [(query_text, cert_texts[i]) for i in range(top_k)]
+        pairs = [(query_text, cert_texts[i]) for i in range(rerank_size)]
+        start = time.perf_counter()
 
         try:
-            # Cross-encoder scores
-            rerank_scores = reranker.predict(pairs)
+            # Cross-encoder scores: cached logits first, model only for the rest
+            rerank_scores = _predict_rerank_scores(query_text, top_certs, pairs, catalog)
 
             # Normalize rerank scores to 0-100 range
             min_score = float(min(rerank_scores))
@@ -394,14 +438,137 @@ def rerank_with_semantics(
                 cert["combined_score"] = float(cert["final_score"])
 
             certifications = top_certs + rest_certs
+            plan["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
 
         except Exception as e:
             print(f"[graph_reasoning] Reranker failed: {e}")
+            plan["error"] = str(e)
             # Fallback to combined score ordering
 
+    if trace is not None:
+        trace.update(plan)
+
     return certifications
 
 
+# Moving average of the cross-encoder cost per uncached pair (ms)
+_rerank_cost = {"pair_ms": RERANK_PAIR_COST_MS}
+
+
+def plan_rerank(scores: list[float], top_k: int, budget_ms: float, cached: list[bool] = None) -> dict:
+    """
+    Decide how many of the (combined-score sorted) candidates to cross-encode.
+
+    - Items below a gap >= RERANK_MARGIN (at or after top_k) can never overtake the
+      ones above it: the reranker only sees the contested prefix.
+    - If every gap inside that prefix is decisive, the reranker cannot change the
+      order at all: skipped.
+    - The size is capped to what the latency budget affords at the estimated cost.
+      Pairs flagged in `cached` (aligned with scores) come from the score cache
+      and cost nothing.
+
+    Returns:
+        {"action": "full" | "shrunk" | "skipped", "reason": "...", "size": 8,
+         "candidates": 30, "max_size": 15, "margin": 47.2, "budget_ms": 200,
+         "estimated_ms": 25.0, "cached_pairs": 3, "pair_cost_ms": 5.0}
+    """
+    max_size = min(RERANK_MAX_CANDIDATES, len(scores))
+    pair_cost = _rerank_cost["pair_ms"]
+    plan = {
+        "candidates": len(scores),
+        "max_size": max_size,
+        "budget_ms": budget_ms,
+        "pair_cost_ms": round(pair_cost, 3),
+        "margin": None
+    }
+
+    if max_size < 2:
+        return {**plan, "action": "skipped", "reason": "too_few_candidates", "size": 0}
+
+    # Contested prefix: cut at the first decisive gap at or after top_k
+    size = max_size
+    for cut in range(max(1, min(top_k, max_size)), max_size):
+        if scores[cut - 1] - scores[cut] >= RERANK_MARGIN:
+            size = cut
+            plan["margin"] = round(scores[cut - 1] - scores[cut], 2)
+            break
+
+    gaps = [scores[i] - scores[i + 1] for i in range(size - 1)]
+    if size < 2 or all(gap >= RERANK_MARGIN for gap in gaps):
+        return {**plan, "action": "skipped", "reason": "decisive_margin", "size": 0}
+
+    reason = "decisive_margin" if size < max_size else "ambiguous"
+    # Longest prefix whose uncached pairs fit in the budget
+    cached = cached or []
+    affordable = uncached = 0
+    for i in range(size):
+        cost = 0 if i < len(cached) and cached[i] else 1
+        if (uncached + cost) * pair_cost > budget_ms:
+            break
+        uncached += cost
+        affordable = i + 1
+    if affordable < 2:
+        return {**plan, "action": "skipped", "reason": "latency_budget", "size": 0}
+    if affordable < size:
+        size = affordable
+        reason = "latency_budget"
+
+    return {
+        **plan,
+        "action": "full" if size == max_size else "shrunk",
+        "reason": reason,
+        "size": size,
+        "estimated_ms": round(uncached * pair_cost, 2),
+        "cached_pairs": size - uncached
+    }
+
+
+def _rerank_keys(query_text: str, certs: list[dict], catalog: CatalogSnapshot = None) -> list:
+    """Score cache keys: query, certification id and its revision (None for certifications without id)."""
+    query_key = normalize_text(query_text)
+    if catalog is None:
+        catalog = current_catalog()
+    revisions = catalog.revisions
+
+    # Revision of the certification (unchanged ones keep their scores across delta refreshes)
+    return [
+        (query_key, cert.get("id"), revisions.get(cert.get("id"), catalog.version)) if cert.get("id") else None
+        for cert in certs
+    ]
+
+
+def _predict_rerank_scores(
+    query_text: str,
+    certs: list[dict],
+    pairs: list[tuple],
+    catalog: CatalogSnapshot = None
+) -> list[float]:
+    """
+    Raw cross-encoder logits for (query, certification) pairs.
+    Pairs already scored for this query and certification revision come from the cache;
+    normalisation is left to the caller so it runs over the combined set.
+    """
+    keys = _rerank_keys(query_text, certs, catalog)
+    scores = [_rerank_cache.get(key) if key else None for key in keys]
+
+    todo = [i for i, score in enumerate(scores) if score is None]
+    if todo:
+        start = time.perf_counter()
+        predicted = batched_predict([pairs[i] for i in todo])
+        pair_ms = (time.perf_counter() - start) * 1000 / len(todo)
+        _rerank_cost["pair_ms"] = 0.8 * _rerank_cost["pair_ms"] + 0.2 * pair_ms
+        for i, score in zip(todo, predicted):
+            scores[i] = float(score)
+            if keys[i]:
+                _rerank_cache.put(keys[i], scores[i])
+
+    return scores
+
+
+def get_rerank_cache_stats() -> dict:
+    return _rerank_cache.stats()
+
+
 # ================================
 # Main Recommendation Function
 # ================================
@@ -409,16 +576,23 @@ def get_smart_recommendations(
     user_text: str,
     user_profile: dict = None,
     top_k: int = 10,
-    use_llm_extraction: bool = True
+    use_llm_extraction: bool | str = True,
+    retrieval_mode: str = None,
+    rerank_budget_ms: float = None
 ) -> dict:
     """
     Get intelligent certification recommendations.
 
     Args:
         user_text: User query or CV text
-        user_profile: Optional user profile with level, budget, domains, etc.
+        user_profile: Optional user profile with niveau, budget, domains, langues, etc.
         top_k: Number of recommendations to return
-        use_llm_extraction: Whether to use LLM for skill extraction
+        use_llm_extraction: Skill extraction engine: True / "llm", "embedding" (local,
+                            no network call), False / "keyword" or "hybrid"
+        retrieval_mode: "graph" (skill matching scan), "vector" (ANN candidates first)
+                        or "hybrid" (BM25 + dense fused with RRF). Defaults to RETRIEVAL_MODE.
+        rerank_budget_ms: Cross-encoder latency budget for this request
+                          (default RERANK_BUDGET_MS). The decision is in reasoning["rerank"].
 
     Returns:
         {
@@ -428,6 +602,13 @@ def get_smart_recommendations(
         }
     """
 
+    # One catalog snapshot for the whole request (never a mix of two versions)
+    try:
+        catalog = get_catalog()
+    except Exception as e:
+        print(f"[graph_reasoning] Catalog unavailable ({e}), using Neo4j queries only")
+        catalog = current_catalog()
+
     # 1. Extract skill vector from user input
     skill_analysis = extract_skill_vector(user_text, use_llm=use_llm_extraction)
 
@@ -439,6 +620,7 @@ def get_smart_recommendations(
     # PRIORITY: user_profile["niveau"] > skill_analysis["level_hint"] > experience-based
     level = None
     budget = None
+    languages = None
     domains = skill_analysis.get("domains", [])
 
     # Check user_profile for explicit preferences FIRST (highest priority)
@@ -448,6 +630,8 @@ def get_smart_recommendations(
             print(f"[graph_reasoning] Niveau from user preference: {level}")
         if user_profile.get("budget"):
             budget = user_profile.get("budget")
+        if user_profile.get("langues"):
+            languages = user_profile.get("langues")
         if user_profile.get("domains"):
             domains = user_profile.get("domains") + domains
             domains = list(set(domains))  # Remove duplicates
@@ -486,98 +670,32 @@ def get_smart_recommendations(
     if held_certs:
         print(f"[graph_reasoning] Certifications déjà obtenues: {held_certs}")
 
-    # 4. Query Neo4j with weighted skill matching
-    # Get extra results to account for filtering
-    certifications = query_certifications_by_skills(
-        skill_vector=skill_analysis["skill_vector"],
+    # 4-5. Retrieve candidates with weighted skill matching (graph | vector | hybrid)
+    # Budget, languages and held certifications are filter masks applied before
+    # scoring, so held certifications never take one of the candidate slots
+    certifications = retrieve_certifications(
+        user_text,
+        skill_analysis["skill_vector"],
         domains=domains if domains else None,
-        level=None,  # Don't filter by level in query, we'll prioritize instead
         budget=budget,
-        limit=top_k * 3  # Get more for filtering and re-ranking
+        limit=top_k * 3,  # Get more for re-ranking
+        retrieval_mode=retrieval_mode,
+        catalog=catalog,
+        languages=languages,
+        exclude_ids=held_certs or None
     )
 
-    # 5. Filter out certifications already held
-    if held_certs:
-        before_count = len(certifications)
-        certifications = [c for c in certifications if c.get("id") not in held_certs]
-        filtered_count = before_count - len(certifications)
-        if filtered_count > 0:
-            print(f"[graph_reasoning] Filtré {filtered_count} certification(s) déjà obtenue(s)")
-
-    # 6. Boost/penalize certifications based on LEVEL matching
-    # Use VERY aggressive scoring to ensure correct level appears first
+    # 6-7. Boost/penalize certifications based on LEVEL and DOMAIN matching
+    # Boost tables and precomputed per-certification features: see scoring_engine
     if level:
-        target_level = level.lower()
-        print(f"[graph_reasoning] Applying level boosting for: {target_level}")
-
-        for cert in certifications:
-            cert_level = (cert.get("niveau") or "").lower()
-            base_score = cert.get("relevance_score", 0)
-
-            # Exact level match = MAJOR boost
-            if target_level in cert_level or cert_level in target_level:
-                cert["relevance_score"] = base_score + 60  # Increased from 40
-                cert["level_match"] = "exact"
-
-            # For beginner profiles (débutant) - be VERY strict
-            elif target_level == "débutant":
-                if "intermédiaire" in cert_level:
-                    cert["relevance_score"] = base_score - 50  # Increased penalty
-                    cert["level_match"] = "too_high"
-                elif "avancé" in cert_level:
-                    cert["relevance_score"] = base_score - 80  # Very strong penalty
-                    cert["level_match"] = "way_too_high"
-
-            # For intermediate profiles (intermédiaire)
-            elif target_level == "intermédiaire":
-                if "débutant" in cert_level:
-                    cert["relevance_score"] = base_score - 15
-                    cert["level_match"] = "too_low"
-                elif "avancé" in cert_level:
-                    cert["relevance_score"] = base_score - 25
-                    cert["level_match"] = "too_high"
-
-            # For senior profiles (avancé)
-            elif target_level == "avancé":
-                if "intermédiaire" in cert_level:
-                    cert["relevance_score"] = base_score + 15  # Acceptable
-                    cert["level_match"] = "acceptable"
-                elif "débutant" in cert_level:
-                    cert["relevance_score"] = base_score - 50
-                    cert["level_match"] = "way_too_low"
-
-    # 7. Boost/penalize certifications based on DOMAIN matching
+        print(f"[graph_reasoning] Applying level boosting for: {level.lower()}")
     if domains:
         print(f"[graph_reasoning] Applying domain boosting for: {domains}")
-        for cert in certifications:
-            cert_domain = (cert.get("domaine") or "").lower()
-            cert_title = (cert.get("titre") or "").lower()
-
-            domain_matched = False
-            for target_domain in domains:
-                target_d = target_domain.lower()
-                # Check domain field and title for domain keywords
-                if target_d in cert_domain or target_d in cert_title:
-                    domain_matched = True
-                    break
-                # Special checks for Cloud
-                if target_d == "cloud" and any(kw in cert_title for kw in ["aws", "azure", "gcp", "google cloud"]):
-                    domain_matched = True
-                    break
-                # Special checks for AI
-                if target_d == "ai" and any(kw in cert_title for kw in ["machine learning", "deep learning", "nlp", "tensorflow", "pytorch"]):
-                    domain_matched = True
-                    break
-
-            if domain_matched:
-                cert["relevance_score"] = cert.get("relevance_score", 0) + 40
-                cert["domain_match"] = True
-            else:
-                cert["relevance_score"] = cert.get("relevance_score", 0) - 30
-                cert["domain_match"] = False
-
-    # Sort by relevance_score BEFORE semantic reranking
-    certifications.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
+
+    # Sort by relevance_score BEFORE semantic reranking (the reranker rescores the
+    # whole pool, so the full order is kept)
+    engine = catalog.scoring or ScoringEngine(certifications)
+    certifications = engine.rank(certifications, level, domains)
 
     # Log top 3 after level/domain boosting
     print(f"[graph_reasoning] Top 3 after boosting:")
@@ -585,8 +703,12 @@ def get_smart_recommendations(
         print(f"  {i+1}. {cert.get('titre')} | {cert.get('niveau')} | score: {cert.get('relevance_score')}")
 
     # 8. Re-rank with semantic similarity (but preserve level/domain ordering)
+    rerank_trace = {"action": "skipped", "reason": "no_candidates", "size": 0}
     if certifications:
-        certifications = rerank_with_semantics(certifications, user_text)
+        certifications = rerank_with_semantics(
+            certifications, user_text, top_k=top_k, budget_ms=rerank_budget_ms,
+            trace=rerank_trace, catalog=catalog
+        )
 
     # 9. Take top_k results
     recommendations = certifications[:top_k]
@@ -597,6 +719,7 @@ def get_smart_recommendations(
 
     # 11. Build reasoning context for LLM
     reasoning = build_reasoning_context(skill_analysis, recommendations)
+    reasoning["rerank"] = rerank_trace  # adaptive reranking decision (debug)
 
     return {
         "skill_analysis": skill_analysis,
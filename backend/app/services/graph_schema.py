@@ -17,6 +17,11 @@ def create_constraints():
         "CREATE CONSTRAINT domain_name_unique IF NOT EXISTS FOR (d:Domain) REQUIRE d.name IS UNIQUE",
         "CREATE CONSTRAINT skill_name_unique IF NOT EXISTS FOR (s:Skill) REQUIRE s.name IS UNIQUE",
         "CREATE INDEX profile_id_index IF NOT EXISTS FOR (p:Profile) ON (p.id)",
+        # Skill matching: equality/IN seeks and CONTAINS seeks on the lowercase name
+        "CREATE INDEX skill_name_lower_index IF NOT EXISTS FOR (s:Skill) ON (s.name_lower)",
+        "CREATE TEXT INDEX skill_name_lower_text IF NOT EXISTS FOR (s:Skill) ON (s.name_lower)",
+        # Delta refresh of the catalog cache: certifications changed since a watermark
+        "CREATE INDEX certification_updated_at_index IF NOT EXISTS FOR (c:Certification) ON (c.updated_at)",
     ]
     for q in queries:
         try:
@@ -64,53 +69,139 @@ def create_domain_nodes():
     return len(domains)
 
 
-def extract_skills_from_certifications():
-    """Extract all unique skills from certification competences and create Skill nodes."""
+def stamp_certification_versions():
+    """
+    Give every certification an updated_at (used by the incremental cache refresh).
+    Writers must also SET c.updated_at = datetime() whenever they modify one.
+    """
+    query = """
+    MATCH (c:Certification)
+    WHERE c.updated_at IS NULL
+    SET c.updated_at = datetime()
+    RETURN count(c) AS stamped
+    """
+    result = execute_query(query)
+    count = result[0]["stamped"] if result else 0
+    print(f"[graph_schema] Stamped updated_at on {count} certifications")
+    return count
+
+
+# Certifications whose normalized competences are missing or older than their
+# last edit (writers SET c.updated_at, e.g. kg/seed_certifications.cypher)
+STALE_COMPETENCES = """
+    (c.competences IS NOT NULL
+     AND (c.competences_list IS NULL OR c.competences_normalized_at IS NULL
+          OR c.competences_normalized_at < c.updated_at))
+    OR (c.competences IS NULL AND c.competences_list IS NOT NULL)
+"""
+
+
+def normalize_certification_competences(cert_ids: list[str] = None):
+    """
+    Materialize the competences, so queries never re-parse them:
+    c.competences_list (trimmed, original case) and c.competences_count,
+    stamped with c.competences_normalized_at. Handles both array and
+    comma-separated storage. cert_ids=None normalizes every certification.
+    """
     query = """
     MATCH (c:Certification)
-    WHERE c.competences IS NOT NULL
+    WHERE c.competences IS NOT NULL AND ($ids IS NULL OR c.id IN $ids)
     WITH c,
          CASE
              WHEN c.competences IS :: LIST<ANY> THEN c.competences
              ELSE split(toString(c.competences), ', ')
          END AS skills_list
-    UNWIND skills_list AS skill_name
-    WITH trim(toString(skill_name)) AS clean_skill
-    WHERE clean_skill <> '' AND size(clean_skill) > 1
+    WITH c, [s IN skills_list WHERE trim(toString(s)) <> '' | trim(toString(s))] AS clean_list
+    SET c.competences_list = clean_list,
+        c.competences_count = size(clean_list),
+        c.competences_normalized_at = datetime()
+    RETURN count(c) AS normalized
+    """
+    result = execute_query(query, {"ids": cert_ids})
+    count = result[0]["normalized"] if result else 0
+
+    # Competences removed since the last run: drop the normalized copy too
+    execute_query("""
+    MATCH (c:Certification)
+    WHERE c.competences IS NULL AND c.competences_list IS NOT NULL AND ($ids IS NULL OR c.id IN $ids)
+    REMOVE c.competences_list, c.competences_count, c.competences_normalized_at
+    """, {"ids": cert_ids})
+
+    print(f"[graph_schema] Normalized competences of {count} certifications")
+    return count
+
+
+def extract_skills_from_certifications(cert_ids: list[str] = None):
+    """Create one Skill node per distinct competence, with its indexed lowercase name."""
+    query = """
+    MATCH (c:Certification)
+    WHERE c.competences_list IS NOT NULL AND ($ids IS NULL OR c.id IN $ids)
+    UNWIND c.competences_list AS clean_skill
     MERGE (s:Skill {name: clean_skill})
     ON CREATE SET s.created_at = datetime()
+    SET s.name_lower = toLower(clean_skill)
     RETURN count(DISTINCT s) AS skills_created
     """
-    result = execute_query(query)
+    result = execute_query(query, {"ids": cert_ids})
     count = result[0]["skills_created"] if result else 0
+
+    # Skills created elsewhere (profiles) need the lowercase name too
+    execute_query("""
+    MATCH (s:Skill)
+    WHERE s.name_lower IS NULL
+    SET s.name_lower = toLower(s.name)
+    """)
+
     print(f"[graph_schema] Created/updated {count} skill nodes")
     return count
 
 
-def link_certifications_to_skills():
-    """Create TEACHES relationships between Certifications and Skills."""
+def link_certifications_to_skills(cert_ids: list[str] = None):
+    """
+    Create TEACHES relationships between Certifications and Skills, and
+    delete those of skills no longer in a certification's competences.
+    """
+    removed = execute_query("""
+    MATCH (c:Certification)-[r:TEACHES]->(s:Skill)
+    WHERE ($ids IS NULL OR c.id IN $ids)
+      AND (c.competences_list IS NULL OR NOT s.name IN c.competences_list)
+    DELETE r
+    RETURN count(r) AS removed
+    """, {"ids": cert_ids})
+
     query = """
     MATCH (c:Certification)
-    WHERE c.competences IS NOT NULL
-    WITH c,
-         CASE
-             WHEN c.competences IS :: LIST<ANY> THEN c.competences
-             ELSE split(toString(c.competences), ', ')
-         END AS skills_list
-    UNWIND skills_list AS skill_name
-    WITH c, trim(toString(skill_name)) AS clean_skill
-    WHERE clean_skill <> '' AND size(clean_skill) > 1
+    WHERE c.competences_list IS NOT NULL AND ($ids IS NULL OR c.id IN $ids)
+    UNWIND c.competences_list AS clean_skill
     MATCH (s:Skill {name: clean_skill})
     MERGE (c)-[r:TEACHES]->(s)
     ON CREATE SET r.created_at = datetime()
     RETURN count(r) AS relationships_created
     """
-    result = execute_query(query)
+    result = execute_query(query, {"ids": cert_ids})
     count = result[0]["relationships_created"] if result else 0
-    print(f"[graph_schema] Created {count} TEACHES relationships")
+    print(f"[graph_schema] Created {count} TEACHES relationships, "
+          f"removed {removed[0]['removed'] if removed else 0} stale ones")
     return count
 
 
+def normalize_stale_certifications() -> int:
+    """
+    Re-normalize and re-link the certifications created or edited since their
+    last normalization (STALE_COMPETENCES). Runs after every catalog refresh,
+    once initialize_schema has normalized the graph. Returns how many.
+    """
+    cert_ids = [r["id"] for r in execute_query(
+        "MATCH (c:Certification) WHERE " + STALE_COMPETENCES + " RETURN c.id AS id"
+    )]
+    if not cert_ids:
+        return 0
+    normalize_certification_competences(cert_ids)
+    extract_skills_from_certifications(cert_ids)
+    link_certifications_to_skills(cert_ids)
+    return len(cert_ids)
+
+
 def link_certifications_to_domains():
     """Create BELONGS_TO relationships between Certifications and Domains."""
     # Cloud domain
@@ -228,11 +319,17 @@ def initialize_schema():
 
     create_constraints()
     create_domain_nodes()
+    stamp_certification_versions()
+    normalize_certification_competences()
     extract_skills_from_certifications()
     link_certifications_to_skills()
     link_certifications_to_domains()
     link_skills_to_domains()
 
+    # Retrieval switches to the normalized queries on its next request
+    from app.services.retrieval_backend import reset_normalized_schema_check
+    reset_normalized_schema_check()
+
     print("\n" + "="*60)
     print("SCHEMA INITIALIZATION COMPLETE")
     print("="*60 + "\n")
@@ -249,6 +346,7 @@ def link_profile_to_skill(profile_id: str, skill_name: str, confidence: float =
     query = """
     MATCH (p:Profile {id: $profile_id})
     MERGE (s:Skill {name: $skill_name})
+    ON CREATE SET s.name_lower = toLower($skill_name)
     MERGE (p)-[r:HAS_SKILL]->(s)
     SET r.confidence = $confidence,
         r.source = $source,
@@ -0,0 +1,143 @@
+# ================================
+# INFERENCE PARITY CHECK
+# Compares a quantized/ONNX backend against the torch reference
+# ================================
+
+import time
+
+import numpy as np
+
+from app.services.model_registry import active_backend, get_encoder, get_reranker
+
+# Max allowed drift before a backend is rejected
+COSINE_TOLERANCE = 0.02        # absolute difference on cosine similarity
+RERANK_TOLERANCE = 0.5         # absolute difference on raw cross-encoder logits
+TOP_K = 5                      # ranking prefix that must stay identical
+
+SAMPLE_QUERIES = [
+    "Je veux débuter en Cloud AWS",
+    "certification data engineer avancé avec Spark et Databricks",
+    "machine learning TensorFlow pour débutant",
+    "Azure administrator intermédiaire moins de 200 euros",
+    "Power BI analyste données",
+]
+
+
+def _sample_documents() -> list[str]:
+    """Certification texts from the catalog cache (falls back to queries)."""
+    try:
+        from app.services.catalog import get_catalog
+        texts = get_catalog().texts
+        if texts:
+            return texts
+    except Exception as e:
+        print(f"[inference_parity] Catalog unavailable ({e}), using sample queries as documents")
+    return list(SAMPLE_QUERIES)
+
+
+def _cosine_matrix(encoder, queries, documents):
+    q = encoder.encode(queries, normalize_embeddings=True, show_progress_bar=False)
+    d = encoder.encode(documents, normalize_embeddings=True, show_progress_bar=False)
+    return np.asarray(q) @ np.asarray(d).T
+
+
+def _top_k(scores, k):
+    return list(np.argsort(-scores)[:k])
+
+
+def check_parity(backend: str, queries: list[str] = None, documents: list[str] = None) -> dict:
+    """
+    Score the same (query, document) pairs with torch and `backend`.
+
+    Returns:
+        {
+            "backend": "onnx-int8",
+            "encoder": {"max_abs_diff": 0.008, "top_k_agreement": 1.0, "seconds": {...}},
+            "reranker": {"max_abs_diff": 0.21, "top_k_agreement": 1.0, "seconds": {...}},
+            "active_backends": {"encoder": "onnx-int8", "reranker": "onnx-int8"},
+            "passed": True
+        }
+
+    Fails when the registry fell back to torch for `backend` (onnxruntime
+    missing, sentence-transformers too old...): that run compares torch with torch.
+    """
+    queries = queries or SAMPLE_QUERIES
+    documents = documents or _sample_documents()
+
+    report = {"backend": backend}
+
+    # Bi-encoder: cosine similarities
+    timings = {}
+    matrices = {}
+    for name in ("torch", backend):
+        encoder = get_encoder(backend=name)
+        start = time.perf_counter()
+        matrices[name] = _cosine_matrix(encoder, queries, documents)
+        timings[name] = round(time.perf_counter() - start, 3)
+
+    k = min(TOP_K, len(documents))
+    agreement = np.mean([
+        _top_k(matrices["torch"][i], k) == _top_k(matrices[backend][i], k)
+        for i in range(len(queries))
+    ])
+    report["encoder"] = {
+        "max_abs_diff": round(float(np.max(np.abs(matrices["torch"] - matrices[backend]))), 4),
+        "top_k_agreement": round(float(agreement), 3),
+        "seconds": timings
+    }
+
+    # Cross-encoder: raw logits on every (query, document) pair
+    pairs = [(q, d) for q in queries for d in documents]
+    timings = {}
+    scores = {}
+    for name in ("torch", backend):
+        reranker = get_reranker(backend=name)
+        start = time.perf_counter()
+        scores[name] = np.asarray(reranker.predict(pairs, show_progress_bar=False)).reshape(len(queries), len(documents))
+        timings[name] = round(time.perf_counter() - start, 3)
+
+    agreement = np.mean([
+        _top_k(scores["torch"][i], k) == _top_k(scores[backend][i], k)
+        for i in range(len(queries))
+    ])
+    report["reranker"] = {
+        "max_abs_diff": round(float(np.max(np.abs(scores["torch"] - scores[backend]))), 4),
+        "top_k_agreement": round(float(agreement), 3),
+        "seconds": timings
+    }
+
+    report["active_backends"] = {
+        "encoder": active_backend("encoder", backend=backend),
+        "reranker": active_backend("reranker", backend=backend)
+    }
+    for part, loaded in report["active_backends"].items():
+        if loaded != backend:
+            print(f"[inference_parity] {part} requested on {backend} but running on {loaded}")
+
+    report["passed"] = (
+        all(loaded == backend for loaded in report["active_backends"].values())
+        and report["encoder"]["max_abs_diff"] <= COSINE_TOLERANCE
+        and report["reranker"]["max_abs_diff"] <= RERANK_TOLERANCE
+        and report["encoder"]["top_k_agreement"] == 1.0
+        and report["reranker"]["top_k_agreement"] == 1.0
+    )
+    return report
+
+
+# ============================================================
+# CLI RUNNER
+# ============================================================
+
+if __name__ == "__main__":
+    import sys
+
+    backend = sys.argv[1] if len(sys.argv) > 1 else "onnx-int8"
+    result = check_parity(backend)
+
+    for part in ("encoder", "reranker"):
+        r = result[part]
+        print(f"{part}: max diff {r['max_abs_diff']} | top-{TOP_K} agreement {r['top_k_agreement']} | "
+              f"torch {r['seconds']['torch']}s vs {backend} {r['seconds'][backend]}s "
+              f"(running on {result['active_backends'][part]})")
+    print("PASSED" if result["passed"] else "FAILED")
+    sys.exit(0 if result["passed"] else 1)
@@ -0,0 +1,221 @@
+# ================================
+# KEYWORD ENGINE
+# Every keyword list and pattern of the detectors, matched in one scan
+# ================================
+#
+# Literal keywords are compiled into a single trie-shaped regex tried as a
+# lookahead at each position: one pass gives the longest keyword starting
+# there, and every shorter keyword that is a prefix of it also starts there,
+# so all (overlapping) occurrences come out of that one pass. Regex patterns
+# (\s+, digits, ".*") are anchored on the literal heads they start with
+# ("senior", "chef", a digit...): the heads ride along in the trie and each
+# pattern is only tried where one of its heads was hit.
+# Detectors then read counts, positions and word-boundary flags from the hits
+# instead of rescanning the text per keyword (word-boundary flags are only
+# computed for the keywords a detector asks about).
+
+import re
+from typing import NamedTuple
+
+
+class Hit(NamedTuple):
+    start: int
+    end: int
+    term: str
+    bounded: bool  # \b on both sides (same test as r"\b" + term + r"\b")
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _boundary(text: str, i: int) -> bool:
+    """Regex \\b at position i."""
+    left = i > 0 and _is_word(text[i - 1])
+    right = i < len(text) and _is_word(text[i])
+    return left != right
+
+
+def _trie_regex(words: list[str]) -> str:
+    """Alternation of `words` factored as a trie; greedy, so the longest word wins."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        end = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+_META = set(".^$*+?{}[]()|\\")
+
+
+def _literal_prefix(branch: str) -> str:
+    """Literal characters `branch` has to start with ("" when it does not start with one)."""
+    prefix = []
+    for i, ch in enumerate(branch):
+        if ch in _META:
+            if ch in "*?{" and prefix:
+                prefix.pop()  # the last literal is optional / repeated
+            break
+        prefix.append(ch)
+    return "".join(prefix)
+
+
+def _heads(pattern: str) -> list[str]:
+    """Literal heads one of which every match of `pattern` starts with ([] = none found)."""
+    body = re.sub(r"^(?:\\b|\(\?<!\\d\))+", "", pattern)
+    if body.startswith(("\\d", "(\\d")):
+        return list("0123456789")
+    group = re.match(r"\(\?:([^()]*)\)", body)
+    if group is not None:
+        if body[group.end():group.end() + 1] in ("*", "?", "{"):
+            return []
+        branches = group.group(1).split("|")
+    else:
+        branches = [body]
+
+    heads = []
+    for branch in branches:
+        if branch.startswith("\\d"):
+            heads.extend("0123456789")
+            continue
+        head = _literal_prefix(branch)
+        if not head:
+            return []
+        heads.append(head)
+    return list(dict.fromkeys(heads))
+
+
+class KeywordHits:
+    """Result of one KeywordEngine.scan: hits per keyword and per pattern."""
+
+    def __init__(self, text: str, terms: dict[str, list[int]], patterns: dict[str, list[tuple]]):
+        self.text = text
+        self.terms = terms        # keyword -> start positions, ascending
+        self.patterns = patterns  # pattern -> [(start, end, groups)], by start
+
+    def _hit(self, term: str, start: int) -> Hit:
+        end = start + len(term)
+        return Hit(start, end, term, _boundary(self.text, start) and _boundary(self.text, end))
+
+    # ------------------------------------------------------------
+    # Keywords
+    # ------------------------------------------------------------
+    def hits(self, term: str) -> list[Hit]:
+        return [self._hit(term, start) for start in self.terms.get(term, ())]
+
+    def has(self, term: str, bounded: bool = False) -> bool:
+        """`term in text` (bounded=True: re.search(r"\\b" + term + r"\\b"))."""
+        starts = self.terms.get(term)
+        if not starts:
+            return False
+        if not bounded:
+            return True
+        text, size = self.text, len(term)
+        return any(_boundary(text, start) and _boundary(text, start + size) for start in starts)
+
+    def count(self, term: str) -> int:
+        """text.count(term): non-overlapping occurrences, left to right."""
+        count, next_free, size = 0, 0, len(term)
+        for start in self.terms.get(term, ()):
+            if start >= next_free:
+                count += 1
+                next_free = start + size
+        return count
+
+    def first(self, term: str) -> Hit | None:
+        """Leftmost occurrence (text.find)."""
+        starts = self.terms.get(term)
+        return self._hit(term, starts[0]) if starts else None
+
+    def first_of(self, terms: list[str]) -> str | None:
+        """First term of `terms` (list order) present in the text."""
+        return next((term for term in terms if term in self.terms), None)
+
+    # ------------------------------------------------------------
+    # Patterns
+    # ------------------------------------------------------------
+    def matches(self, pattern: str) -> list[tuple]:
+        """(start, end, groups) of every start position where `pattern` matches."""
+        return self.patterns.get(pattern, [])
+
+    def search(self, pattern: str) -> tuple | None:
+        """Leftmost match (re.search)."""
+        matches = self.patterns.get(pattern)
+        return matches[0] if matches else None
+
+
+class KeywordEngine:
+    """Compiled keywords + patterns; scan() walks a text once."""
+
+    def __init__(self, keywords, patterns=()):
+        self.pattern_list = list(dict.fromkeys(patterns))
+        self._patterns = [(pattern, re.compile(pattern)) for pattern in self.pattern_list]
+
+        # Patterns are anchored on the literal heads they must start with: the
+        # heads join the keyword trie, and a pattern is only tried where one of
+        # its heads was hit. A pattern without usable heads gets its own
+        # lookahead scan.
+        self._anchored = {}  # head -> indices of the patterns starting with it
+        self._unanchored = []  # (index, lookahead regex)
+        for index, pattern in enumerate(self.pattern_list):
+            heads = _heads(pattern)
+            if heads:
+                for head in heads:
+                    self._anchored.setdefault(head, []).append(index)
+            else:
+                self._unanchored.append((index, re.compile("(?=" + pattern + ")")))
+
+        self.keywords = sorted({kw for kw in keywords if kw} | set(self._anchored))
+
+        # Every keyword that is a prefix of another one also starts where it starts
+        keyword_set = set(self.keywords)
+        self._prefixes = {
+            kw: [kw[:i] for i in range(1, len(kw) + 1) if kw[:i] in keyword_set]
+            for kw in self.keywords
+        }
+        self._keyword_re = re.compile("(?=(" + _trie_regex(self.keywords) + "))") if self.keywords else None
+
+    def scan(self, text: str) -> KeywordHits:
+        """Hits of every keyword and pattern in `text` (matched as given: lowercase it first)."""
+        terms = {}
+        candidates = []  # (start, pattern index), by start
+        if self._keyword_re is not None:
+            prefixes, anchored = self._prefixes, self._anchored
+            for m in self._keyword_re.finditer(text):
+                start = m.start()
+                for kw in prefixes[m.group(1)]:
+                    starts = terms.get(kw)
+                    if starts is None:
+                        terms[kw] = [start]
+                    else:
+                        starts.append(start)
+                    indices = anchored.get(kw)
+                    if indices:
+                        candidates.extend((start, index) for index in indices)
+
+        for index, lookahead in self._unanchored:
+            candidates.extend((m.start(), index) for m in lookahead.finditer(text))
+        if self._unanchored:
+            candidates.sort()
+
+        patterns = {}
+        for start, index in dict.fromkeys(candidates):
+            pattern, compiled = self._patterns[index]
+            match = compiled.match(text, start)
+            if match is not None:
+                patterns.setdefault(pattern, []).append((start, match.end(), match.groups()))
+
+        return KeywordHits(text, terms, patterns)
@@ -0,0 +1,191 @@
+# ================================
+# LLM CACHE
+# Two-tier cache for LLM results: in-memory LRU + SQLite on disk (with TTL)
+# ================================
+#
+# Keys are (model, prompt version, normalized text): the same CV uploaded
+# twice, or the same short question asked again, skips the network call.
+# Bump the prompt version whenever a prompt or its parsing changes so old
+# answers stop matching. Values are stored as JSON.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.config import LLM_CACHE_PATH, LLM_CACHE_SIZE, LLM_CACHE_TTL_SECONDS
+from app.services.embedding_cache import normalize_text
+from app.services.lru_cache import LRUCache
+
+_MISSING = object()
+
+
+def cache_key(model: str, prompt_version: str, text: str) -> str:
+    """Stable key: sha1 of model, prompt version and normalized text."""
+    raw = "\0".join((model, prompt_version, normalize_text(text)))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Memory LRU in front of an SQLite table. Disk entries older than `ttl`
+    seconds are treated as misses (and deleted); an empty `path` keeps the
+    cache memory-only.
+    """
+
+    def __init__(self, path: str, maxsize: int, ttl: float, name: str = "llm"):
+        self.path = path
+        self.ttl = ttl
+        self.name = name
+        self._memory = LRUCache(maxsize=maxsize, name=name)
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_failed = False
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.expired = 0
+        self.writes = 0
+
+    # ------------------------------------------------------------
+    # SQLite tier
+    # ------------------------------------------------------------
+    def _connection(self):
+        """Open (once) the SQLite file; None when disabled or unavailable (caller holds _lock)."""
+        if self._db is not None or self._db_failed or not self.path:
+            return self._db
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, model TEXT, prompt_version TEXT, value TEXT, created REAL)"
+            )
+            db.commit()
+            self._db = db
+        except Exception as e:
+            # Read-only filesystem etc.: keep serving from memory
+            print(f"[llm_cache] Warning: could not open {self.path}: {e}")
+            self._db_failed = True
+        return self._db
+
+    def _disk_get(self, key: str):
+        with self._lock:
+            db = self._connection()
+            if db is None:
+                return _MISSING
+            try:
+                row = db.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.disk_misses += 1
+                    return _MISSING
+                value, created = row
+                if self.ttl > 0 and time.time() - created > self.ttl:
+                    db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    db.commit()
+                    self.expired += 1
+                    self.disk_misses += 1
+                    return _MISSING
+                self.disk_hits += 1
+                return json.loads(value)
+            except Exception as e:
+                print(f"[llm_cache] Warning: read failed: {e}")
+                return _MISSING
+
+    def _disk_put(self, key: str, model: str, prompt_version: str, value):
+        with self._lock:
+            db = self._connection()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, model, prompt_version, value, created) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, model, prompt_version, json.dumps(value), time.time())
+                )
+                db.commit()
+                self.writes += 1
+            except Exception as e:
+                print(f"[llm_cache] Warning: write failed: {e}")
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+    def get(self, model: str, prompt_version: str, text: str, default=None):
+        key = cache_key(model, prompt_version, text)
+        value = self._memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = self._disk_get(key)
+        if value is _MISSING:
+            return default
+        self._memory.put(key, value)  # promote
+        return value
+
+    def put(self, model: str, prompt_version: str, text: str, value):
+        """Store a JSON-serializable result (only cache successful calls)."""
+        key = cache_key(model, prompt_version, text)
+        self._memory.put(key, value)
+        self._disk_put(key, model, prompt_version, value)
+
+    def purge_expired(self) -> int:
+        """Delete expired disk entries; returns how many were removed."""
+        if self.ttl <= 0:
+            return 0
+        with self._lock:
+            db = self._connection()
+            if db is None:
+                return 0
+            cursor = db.execute("DELETE FROM llm_cache WHERE created < ?", (time.time() - self.ttl,))
+            db.commit()
+            self.expired += cursor.rowcount
+            return cursor.rowcount
+
+    def clear(self):
+        self._memory.clear()
+        with self._lock:
+            db = self._connection()
+            if db is not None:
+                db.execute("DELETE FROM llm_cache")
+                db.commit()
+
+    def stats(self) -> dict:
+        memory = self._memory.stats()
+        lookups = memory["hits"] + memory["misses"]
+        hits = memory["hits"] + self.disk_hits
+        return {
+            "name": self.name,
+            "memory": memory,
+            "disk": {
+                "path": self.path or None,
+                "hits": self.disk_hits,
+                "misses": self.disk_misses,
+                "expired": self.expired,
+                "writes": self.writes,
+                "ttl_seconds": self.ttl
+            },
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+        }
+
+
+# Shared instance for LLM skill extraction (skill_extractor.py)
+_skill_cache = None
+_skill_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    global _skill_cache
+    if _skill_cache is None:
+        with _skill_cache_lock:
+            if _skill_cache is None:
+                _skill_cache = LLMCache(LLM_CACHE_PATH, LLM_CACHE_SIZE, LLM_CACHE_TTL_SECONDS, name="llm_skills")
+    return _skill_cache
+
+
+def get_llm_cache_stats() -> dict:
+    return get_llm_cache().stats()
@@ -0,0 +1,170 @@
+# ================================
+# MICRO-BATCHER
+# Coalesces concurrent encode/predict calls into one forward pass
+# ================================
+#
+# Request threads call submit(items) and block. A single worker thread
+# takes the first waiting request, collects whatever else arrives within
+# max_wait_ms (up to max_batch_size items), runs the model once and hands
+# each caller back its own slice. The worker only waits while other callers
+# are in flight, so a lone request at low QPS runs immediately.
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from app.config import MICRO_BATCHING, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+from app.services.model_registry import DEFAULT_ENCODER, DEFAULT_RERANKER, get_encoder, get_reranker
+
+
+class MicroBatcher:
+    """Dynamic batching in front of one model function `fn(list) -> array`."""
+
+    def __init__(self, fn, name: str, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.fn = fn
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._inflight = 0
+        self._inflight_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True)
+        self._worker.start()
+
+        self.batches = 0
+        self.items = 0
+        self.max_queue_depth = 0
+
+    def submit(self, items: list):
+        """Run `fn` on `items` as part of a shared batch; blocks until done."""
+        if not items:
+            return self.fn(items)
+        future = Future()
+        with self._inflight_lock:
+            self._inflight += 1
+        try:
+            self._queue.put((list(items), future))
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+            return future.result()
+        finally:
+            with self._inflight_lock:
+                self._inflight -= 1
+
+    def _collect(self) -> list:
+        """First waiting request plus whatever joins it before the deadline."""
+        requests = [self._queue.get()]
+        size = len(requests[0][0])
+        deadline = time.perf_counter() + self.max_wait
+
+        while size < self.max_batch_size:
+            try:
+                # Nobody else in flight: a lone caller runs now
+                if self._inflight <= len(requests):
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            requests.append(request)
+            size += len(request[0])
+
+        return requests
+
+    def _run(self):
+        while True:
+            requests = self._collect()
+            items = [item for batch, _ in requests for item in batch]
+
+            try:
+                results = self.fn(items)
+            except Exception as e:
+                for _, future in requests:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(items)
+
+            offset = 0
+            for batch, future in requests:
+                future.set_result(results[offset:offset + len(batch)])
+                offset += len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "queue_depth": self._queue.qsize(),
+            "in_flight": self._inflight,
+            "max_queue_depth": self.max_queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000
+        }
+
+
+# ================================
+# Shared batchers for the registry models
+# ================================
+_batchers = {}
+_lock = threading.Lock()
+
+
+def _get_batcher(key: str, factory) -> MicroBatcher:
+    batcher = _batchers.get(key)
+    if batcher is None:
+        with _lock:
+            batcher = _batchers.get(key)
+            if batcher is None:
+                batcher = factory()
+                _batchers[key] = batcher
+    return batcher
+
+
+def batched_encode(texts: list[str], model_name: str = None) -> np.ndarray:
+    """Normalized float32 embeddings, batched with concurrent callers when enabled."""
+    model_name = model_name or DEFAULT_ENCODER
+
+    def encode(items):
+        return get_encoder(model_name).encode(
+            items,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        ).astype(np.float32)
+
+    if not MICRO_BATCHING:
+        return encode(texts)
+
+    batcher = _get_batcher(
+        f"encode:{model_name}",
+        lambda: MicroBatcher(encode, f"encode:{model_name}", BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS)
+    )
+    return batcher.submit(texts)
+
+
+def batched_predict(pairs: list[tuple], model_name: str = None) -> np.ndarray:
+    """Cross-encoder logits, batched with concurrent callers when enabled."""
+    model_name = model_name or DEFAULT_RERANKER
+
+    def predict(items):
+        return np.asarray(get_reranker(model_name).predict(items, show_progress_bar=False))
+
+    if not MICRO_BATCHING:
+        return predict(pairs)
+
+    batcher = _get_batcher(
+        f"predict:{model_name}",
+        lambda: MicroBatcher(predict, f"predict:{model_name}", BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS)
+    )
+    return batcher.submit(pairs)
+
+
+def get_batcher_stats() -> list[dict]:
+    return [batcher.stats() for batcher in list(_batchers.values())]
@@ -0,0 +1,174 @@
+# ================================
+# MODEL REGISTRY
+# One shared instance per model name for the whole process
+# ================================
+
+import threading
+import time
+
+from app.config import INFERENCE_BACKEND, ONNX_QUANTIZED_FILE
+
+# sentence_transformers (and torch) are imported inside the loaders so that
+# importing this module - and every service using it - stays cheap.
+
+# Default models used by the recommendation pipeline
+DEFAULT_ENCODER = "sentence-transformers/all-mpnet-base-v2"
+DEFAULT_RERANKER = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+SUPPORTED_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Registries are keyed by (model name, backend)
+_encoders = {}
+_rerankers = {}
+_load_times = {}
+_active_backends = {}  # backend actually in use (after any torch fallback)
+_lock = threading.Lock()
+_name_locks = {}
+
+
+def _get_name_lock(key: tuple) -> threading.Lock:
+    """One lock per model so different models can load in parallel."""
+    with _lock:
+        if key not in _name_locks:
+            _name_locks[key] = threading.Lock()
+        return _name_locks[key]
+
+
+def _resolve_backend(backend: str = None) -> str:
+    backend = backend or INFERENCE_BACKEND
+    if backend not in SUPPORTED_BACKENDS:
+        print(f"[model_registry] Warning: unknown backend '{backend}', using torch")
+        return "torch"
+    return backend
+
+
+def _backend_kwargs(backend: str) -> dict:
+    """Constructor kwargs for sentence_transformers' ONNX Runtime backend."""
+    if backend == "onnx":
+        return {"backend": "onnx"}
+    if backend == "onnx-int8":
+        return {"backend": "onnx", "model_kwargs": {"file_name": ONNX_QUANTIZED_FILE}}
+    return {}
+
+
+def _model_memory_bytes(model, kind: str) -> int:
+    """Size of the weights and buffers held by a loaded model."""
+    # CrossEncoder wraps the underlying HF module in `.model`
+    module = model.model if kind == "reranker" else model
+
+    try:
+        tensors = list(module.parameters()) + list(module.buffers())
+    except AttributeError:
+        # ONNX Runtime sessions hold their weights outside torch
+        return 0
+
+    total = 0
+    for tensor in tensors:
+        total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def _load(factory, name: str, backend: str, **kwargs):
+    """
+    Instantiate a model on the requested backend.
+    Falls back to torch when ONNX Runtime / the quantized file is unavailable,
+    so a misconfigured node still serves requests.
+    """
+    if backend == "torch":
+        return factory(name, **kwargs), "torch"
+    try:
+        return factory(name, **kwargs, **_backend_kwargs(backend)), backend
+    except Exception as e:
+        print(f"[model_registry] Warning: {backend} backend unavailable for {name} ({e}), using torch")
+        return factory(name, **kwargs), "torch"
+
+
+def get_encoder(name: str = DEFAULT_ENCODER, backend: str = None):
+    """
+    Return the shared bi-encoder for `name`, loading it on first use.
+    Every service must go through this function instead of instantiating
+    SentenceTransformer itself, so the weights live only once per process.
+    `backend` defaults to INFERENCE_BACKEND (torch | onnx | onnx-int8).
+    """
+    key = (name, _resolve_backend(backend))
+    model = _encoders.get(key)
+    if model is not None:
+        return model
+
+    with _get_name_lock(key):
+        model = _encoders.get(key)
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+
+            start = time.time()
+            model, loaded_backend = _load(SentenceTransformer, name, key[1])
+            _encoders[key] = model
+            _load_times[key] = time.time() - start
+            _active_backends[key] = loaded_backend
+            size_mb = _model_memory_bytes(model, "encoder") / (1024 * 1024)
+            print(f"[model_registry] Encoder loaded: {name} [{loaded_backend}] ({size_mb:.0f} MB) in {_load_times[key]:.2f}s")
+
+    return model
+
+
+def get_reranker(name: str = DEFAULT_RERANKER, max_length: int = 512, backend: str = None):
+    """Return the shared cross-encoder for `name`, loading it on first use."""
+    key = (name, _resolve_backend(backend))
+    model = _rerankers.get(key)
+    if model is not None:
+        return model
+
+    with _get_name_lock(key):
+        model = _rerankers.get(key)
+        if model is None:
+            from sentence_transformers import CrossEncoder
+
+            start = time.time()
+            model, loaded_backend = _load(CrossEncoder, name, key[1], max_length=max_length)
+            _rerankers[key] = model
+            _load_times[key] = time.time() - start
+            _active_backends[key] = loaded_backend
+            size_mb = _model_memory_bytes(model, "reranker") / (1024 * 1024)
+            print(f"[model_registry] Reranker loaded: {name} [{loaded_backend}] ({size_mb:.0f} MB) in {_load_times[key]:.2f}s")
+
+    return model
+
+
+def is_loaded(kind: str, name: str = None, backend: str = None) -> bool:
+    """Whether the encoder / reranker `name` is already in the registry (no loading)."""
+    registry = _encoders if kind == "encoder" else _rerankers
+    name = name or (DEFAULT_ENCODER if kind == "encoder" else DEFAULT_RERANKER)
+    return (name, _resolve_backend(backend)) in registry
+
+
+def active_backend(kind: str, name: str = None, backend: str = None) -> str | None:
+    """Backend a loaded model actually runs on (differs from the requested one after a torch fallback)."""
+    name = name or (DEFAULT_ENCODER if kind == "encoder" else DEFAULT_RERANKER)
+    return _active_backends.get((name, _resolve_backend(backend)))
+
+
+def get_model_stats() -> dict:
+    """
+    Report every loaded model with its memory footprint.
+
+    Returns:
+        {
+            "models": [{"name": ..., "kind": "encoder", "backend": "torch", "memory_mb": 417.7, "load_seconds": 3.2}, ...],
+            "total_memory_mb": 508.9
+        }
+    """
+    models = []
+    for kind, registry in (("encoder", _encoders), ("reranker", _rerankers)):
+        for (name, backend), model in list(registry.items()):
+            models.append({
+                "name": name,
+                "kind": kind,
+                "backend": _active_backends.get((name, backend), backend),
+                "memory_mb": round(_model_memory_bytes(model, kind) / (1024 * 1024), 1),
+                "load_seconds": round(_load_times.get((name, backend), 0.0), 2)
+            })
+
+    return {
+        "models": models,
+        "total_memory_mb": round(sum(m["memory_mb"] for m in models), 1)
+    }
@@ -4,84 +4,28 @@
 # ================================
 
 import re
-from sentence_transformers import SentenceTransformer, util
 from app.database import execute_query
 from app.services.graph_reasoning import get_smart_recommendations
 from app.services.skill_extractor import extract_skill_vector
+from app.services.catalog import get_catalog, refresh_catalog
 
-# ================================
-# Charger le modèle sémantique
-# ================================
-model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
 
 # ================================
-# Cache pour embeddings (lazy loading)
+# Catalog (shared snapshot, see catalog.py)
 # ================================
-_certifications_cache = None
-_embeddings_cache = None
-
-
 def load_certifications_from_neo4j():
-    """Load certifications from Neo4j with caching."""
-    global _certifications_cache, _embeddings_cache
+    """Certifications and their embeddings from the shared catalog snapshot."""
+    catalog = get_catalog()
+    return catalog.certifications, catalog.embeddings
 
-    if _certifications_cache is not None:
-        return _certifications_cache, _embeddings_cache
 
-    query = """
-    MATCH (c:Certification)
-    RETURN
-        c.id AS id,
-        c.titre AS titre,
-        c.domaine AS domaine,
-        c.niveau AS niveau,
-        c.objectif AS objectif,
-        c.competences AS competences,
-        c.duree AS duree,
-        c.prix AS prix,
-        c.url AS url,
-        c.langues AS langues,
-        c.temps_par_semaine AS temps_par_semaine
+def refresh_cache(full: bool = False):
+    """
+    Refresh the shared catalog (graph reasoning, RAG and skill vocabulary at once).
+    Incremental unless full=True; readers keep the previous snapshot meanwhile.
     """
-    rows = execute_query(query)
-
-    certifications = []
-    for r in rows:
-        text = f"{r['titre']} - {r['objectif']} - {', '.join(r['competences'] or [])}"
-        certifications.append({
-            "id": r["id"],
-            "text": text,
-            "titre": r["titre"],
-            "domaine": r["domaine"],
-            "niveau": r["niveau"],
-            "objectif": r["objectif"],
-            "competences": r["competences"] or [],
-            "duree": r["duree"],
-            "prix": r["prix"],
-            "url": r["url"],
-            "langues": r["langues"],
-            "temps_par_semaine": r["temps_par_semaine"]
-        })
-
-    embeddings = None
-    if certifications:
-        embeddings = model.encode(
-            [c["text"] for c in certifications],
-            convert_to_tensor=True
-        )
-
-    _certifications_cache = certifications
-    _embeddings_cache = embeddings
-
-    return certifications, embeddings
-
-
-def refresh_cache():
-    """Force refresh of certification cache."""
-    global _certifications_cache, _embeddings_cache
-    _certifications_cache = None
-    _embeddings_cache = None
-    return load_certifications_from_neo4j()
+    catalog = refresh_catalog(full=full)
+    return catalog.certifications, catalog.embeddings
 
 
 # ================================
@@ -102,10 +46,12 @@ def search_relevant_certifications(
     question: str,
     user_id: str = None,
     top_k: int = 10,
-    user_profile: dict = None
+    user_profile: dict = None,
+    retrieval_mode: str = None
 ) -> dict:
     """
     Enhanced RAG search using skill-based graph reasoning.
+    retrieval_mode: graph | vector | hybrid (None = RETRIEVAL_MODE).
 
     Returns:
         {
@@ -130,7 +76,8 @@ def search_relevant_certifications(
         user_text=question,
         user_profile=profile,
         top_k=top_k,
-        use_llm_extraction=True
+        use_llm_extraction=True,
+        retrieval_mode=retrieval_mode
     )
 
     # Build context text for backward compatibility
@@ -2,7 +2,7 @@ from app.database import execute_query
 from app.services.graph_reasoning import get_smart_recommendations
 
 
-def get_recommendations_from_db(user_id: str) -> list[dict]:
+def get_recommendations_from_db(user_id: str, retrieval_mode: str = None) -> list[dict]:
     """
     Get personalized recommendations based on user profile stored in Neo4j.
 
@@ -25,7 +25,8 @@ def get_recommendations_from_db(user_id: str) -> list[dict]:
         "niveau": profile_node.get("niveau"),
         "objectif": profile_node.get("objectif"),
         "budget": profile_node.get("budget"),
-        "competences": profile_node.get("competences", [])
+        "competences": profile_node.get("competences", []),
+        "langues": profile_node.get("langues") or []
     }
 
     # 3. Use graph reasoning for smart recommendations
@@ -40,7 +41,8 @@ def get_recommendations_from_db(user_id: str) -> list[dict]:
         user_text=query_text,
         user_profile=user_profile,
         top_k=6,
-        use_llm_extraction=False  # Skills already in profile
+        use_llm_extraction=False,  # Skills already in profile
+        retrieval_mode=retrieval_mode
     )
 
     # 4. Format recommendations
@@ -0,0 +1,662 @@
+# ================================
+# RETRIEVAL BACKENDS
+# Candidate retrieval (filter + score + top-k) behind one interface
+# ================================
+#
+# graph_reasoning only asks a backend for candidates; how they are filtered,
+# scored and cut is the backend's business:
+#   memory : numpy over the catalog snapshot (SkillIndex postings, exact or
+#            IVF cosine search) - no database round trip
+#   neo4j  : Cypher skill matching and the Neo4j 5 vector index
+#            (db.index.vector.queryNodes), embeddings synced from the snapshot
+#            by prepare() - at warmup and after each catalog refresh, never
+#            inside a request
+# Lexical (BM25) ranking is the one exception: every backend ranks with the
+# snapshot's BM25Index (a Neo4j full-text index scores with Lucene's analyzer,
+# so the two backends would disagree). Selected with RETRIEVAL_BACKEND. Both must give the same answers on the same
+# catalog: app.services.retrieval_conformance checks it and times them.
+
+import threading
+import time
+
+import numpy as np
+
+from app.database import execute_query
+from app.config import RETRIEVAL_BACKEND, NEO4J_VECTOR_INDEX
+from app.services.catalog import CatalogSnapshot, add_refresh_listener, current_catalog, get_catalog
+from app.services.graph_schema import STALE_COMPETENCES, normalize_stale_certifications
+from app.services.scoring_engine import top_k_indices
+
+# Filtered vector search in Neo4j post-filters the index hits: fetch this many times k
+FILTER_OVERFETCH = 10
+
+
+class RetrievalBackend:
+    """
+    Candidate retrieval over the certification catalog.
+
+    Filters have the Cypher semantics of the recommendation queries:
+    domains -> domaine CONTAINS any (case-insensitive), level -> niveau equals
+    (case-insensitive), budget -> prix <= budget (missing price never passes),
+    languages -> any of them in langues (case-insensitive), exclude_ids -> not
+    one of these ids (certifications already held).
+    """
+
+    name = "base"
+
+    def available(self, catalog: CatalogSnapshot) -> bool:
+        """True when the backend can serve requests for `catalog`."""
+        return True
+
+    def prepare(self, catalog: CatalogSnapshot):
+        """Build what the backend needs to serve `catalog` (warmup / catalog refresh, not requests)."""
+
+    def prepared(self, catalog: CatalogSnapshot) -> bool:
+        """True once prepare() has run for `catalog`."""
+        return catalog is not None and catalog.loaded
+
+    def filter_ids(
+        self,
+        domains: list[str] = None,
+        level: str = None,
+        budget: float = None,
+        candidate_ids: list[str] = None,
+        languages: list[str] = None,
+        exclude_ids: list[str] = None,
+        catalog: CatalogSnapshot = None
+    ) -> list[str]:
+        """Ids of the certifications passing the filters (any order)."""
+        raise NotImplementedError
+
+    def vector_search(
+        self,
+        query_vector: np.ndarray,
+        k: int,
+        domains: list[str] = None,
+        level: str = None,
+        budget: float = None,
+        languages: list[str] = None,
+        exclude_ids: list[str] = None,
+        catalog: CatalogSnapshot = None
+    ) -> tuple[list[str], np.ndarray]:
+        """Ids and cosine scores of the k nearest certifications passing the filters, best first."""
+        raise NotImplementedError
+
+    def lexical_search(self, query_text: str, k: int, catalog: CatalogSnapshot = None) -> tuple[list[str], np.ndarray]:
+        """
+        Ids and BM25 scores of the k best lexical matches, best first (unfiltered:
+        callers filter in skill_search). Shared by every backend, see the module header.
+        """
+        catalog = catalog or get_catalog()
+        if catalog.bm25 is None or k <= 0:
+            return [], np.zeros(0, dtype=np.float32)
+        return catalog.bm25.search(query_text, k)
+
+    def skill_search(
+        self,
+        skill_vector: dict[str, float],
+        domains: list[str] = None,
+        level: str = None,
+        budget: float = None,
+        limit: int = 100,
+        candidate_ids: list[str] = None,
+        allow_no_match: bool = None,
+        languages: list[str] = None,
+        exclude_ids: list[str] = None,
+        catalog: CatalogSnapshot = None
+    ) -> list[dict]:
+        """
+        Certifications scored by skill overlap, ordered by relevance_score DESC,
+        skill_matches DESC, prix ASC (rows of query_certifications_by_skills).
+        `allow_no_match` keeps unmatched certifications (default: fewer than 2 skills).
+        """
+        raise NotImplementedError
+
+
+# ================================
+# In-memory backend (numpy over the catalog snapshot)
+# ================================
+class InMemoryBackend(RetrievalBackend):
+    """Serves every query from the snapshot's SkillIndex, embeddings and VectorIndex."""
+
+    name = "memory"
+
+    def available(self, catalog: CatalogSnapshot) -> bool:
+        return catalog is not None and catalog.loaded and catalog.skill_index is not None
+
+    def filter_ids(self, domains=None, level=None, budget=None, candidate_ids=None,
+                   languages=None, exclude_ids=None, catalog=None):
+        catalog = catalog or get_catalog()
+        mask = catalog.filters.mask(domains, level, budget, languages, candidate_ids, exclude_ids)
+        return [catalog.ids[i] for i in np.flatnonzero(mask)]
+
+    def vector_search(self, query_vector, k, domains=None, level=None, budget=None,
+                      languages=None, exclude_ids=None, catalog=None):
+        catalog = catalog or get_catalog()
+        if catalog.embeddings is None or k <= 0:
+            return [], np.zeros(0, dtype=np.float32)
+
+        # Unfiltered: the ANN index (IVF above its exact threshold)
+        filtered = bool(domains) or level is not None or budget is not None or bool(languages) or bool(exclude_ids)
+        if not filtered and catalog.vector_index is not None:
+            return catalog.vector_index.search(query_vector, k)
+
+        # Filtered: exact scan of the rows passing the filter masks
+        rows = np.flatnonzero(catalog.filters.mask(domains, level, budget, languages, None, exclude_ids))
+        scores = catalog.embeddings[rows] @ query_vector
+        top = top_k_indices(scores, k)
+        return [catalog.ids[rows[i]] for i in top], scores[top]
+
+    def skill_search(self, skill_vector, domains=None, level=None, budget=None, limit=100,
+                     candidate_ids=None, allow_no_match=None, languages=None, exclude_ids=None, catalog=None):
+        catalog = catalog or get_catalog()
+        return catalog.skill_index.query(
+            skill_vector, domains, level, budget, limit, candidate_ids, allow_no_match, languages, exclude_ids
+        )
+
+
+# ================================
+# Cypher queries (Neo4j backend)
+# ================================
+# Optional filters shared by the certification queries
+_CERT_FILTERS = """
+    ($candidate_ids IS NULL OR c.id IN $candidate_ids)
+    AND (size($exclude_ids) = 0 OR NOT c.id IN $exclude_ids)
+    AND ($domains IS NULL OR size($domains) = 0 OR
+         ANY(d IN $domains WHERE toLower(c.domaine) CONTAINS toLower(d)))
+    AND ($level IS NULL OR toLower(c.niveau) = toLower($level))
+    AND ($budget IS NULL OR c.prix <= $budget)
+    AND (size($languages) = 0 OR
+         ANY(l IN $languages WHERE ANY(cl IN CASE WHEN c.langues IS :: LIST<ANY> THEN c.langues ELSE [c.langues] END
+                                       WHERE toLower(toString(cl)) = toLower(l))))
+"""
+
+
+def _filter_params(domains=None, level=None, budget=None, candidate_ids=None,
+                   languages=None, exclude_ids=None) -> dict:
+    """Parameters of _CERT_FILTERS."""
+    if isinstance(languages, str):
+        languages = [languages]
+    return {
+        "domains": domains if domains else [],
+        "level": level,
+        "budget": budget,
+        "candidate_ids": candidate_ids,
+        "languages": languages if languages else [],
+        "exclude_ids": list(exclude_ids) if exclude_ids else []
+    }
+
+# Normalized-schema check: per catalog version, re-checked every
+# NORMALIZED_SCHEMA_RECHECK_SECONDS (graph_schema may run after startup)
+NORMALIZED_SCHEMA_RECHECK_SECONDS = 60
+_normalized_schema = {"ready": None, "version": None, "checked_at": 0.0}
+
+
+def has_normalized_competences() -> bool:
+    """
+    True while graph_schema has normalized the competences of EVERY
+    certification (competences_list / competences_count, TEACHES) since its
+    last edit: one certification created or edited afterwards (STALE_COMPETENCES)
+    sends skill matching back to the raw competences until it is re-normalized.
+    Skill.name_lower alone is not enough: profile skills get it on creation.
+    """
+    version = current_catalog().version
+    stale = time.time() - _normalized_schema["checked_at"] > NORMALIZED_SCHEMA_RECHECK_SECONDS
+    if _normalized_schema["ready"] is None or _normalized_schema["version"] != version or stale:
+        try:
+            result = execute_query(
+                "MATCH (c:Certification) "
+                "RETURN count(c.competences_list) > 0 "
+                "AND count(CASE WHEN " + STALE_COMPETENCES + " THEN 1 END) = 0 AS ready"
+            )
+        except Exception as e:
+            print(f"[retrieval_backend] Normalized schema check failed: {e}")
+            return False
+        ready = bool(result and result[0]["ready"])
+        _normalized_schema.update({"ready": ready, "version": version, "checked_at": time.time()})
+    return _normalized_schema["ready"]
+
+
+def reset_normalized_schema_check():
+    """Forget the cached check (call after graph_schema.initialize_schema)."""
+    _normalized_schema.update({"ready": None, "checked_at": 0.0})
+
+
+def renormalize_changed_certifications(snapshot: CatalogSnapshot = None) -> int:
+    """
+    Catalog refresh listener: re-normalize the certifications created or
+    edited since initialize_schema, so the normalized queries stay usable.
+    Does nothing on a graph that was never normalized.
+    """
+    if not execute_query("MATCH (c:Certification) WHERE c.competences_list IS NOT NULL RETURN c.id AS id LIMIT 1"):
+        return 0
+    count = normalize_stale_certifications()
+    if count:
+        print(f"[retrieval_backend] Re-normalized competences of {count} changed certifications")
+        reset_normalized_schema_check()
+    return count
+
+
+add_refresh_listener(renormalize_changed_certifications)
+
+
+def _skill_substrings(skill: str) -> list[str]:
+    """Every substring of a lowercase skill (the 'user skill CONTAINS cert skill' side)."""
+    s = skill.lower()
+    return list({s[i:j] for i in range(len(s)) for j in range(i + 1, len(s) + 1)})
+
+
+def _query_certifications_by_skill_index(
+    skill_vector: dict[str, float],
+    domains: list[str] = None,
+    level: str = None,
+    budget: float = None,
+    limit: int = 100,
+    candidate_ids: list[str] = None,
+    allow_no_match: bool = False,
+    languages: list[str] = None,
+    exclude_ids: list[str] = None
+) -> list[dict]:
+    """
+    Skill matching on the normalized schema.
+    Each user skill is resolved to Skill nodes through the name_lower indexes
+    (text index for CONTAINS, range index for the IN list of its substrings),
+    then expanded over TEACHES: only matching certifications are touched.
+    """
+    skill_names = list(skill_vector.keys())
+    params = {
+        "skills": skill_names,
+        "substrings": {skill: _skill_substrings(skill) for skill in skill_names},
+        "limit": limit,
+        **_filter_params(domains, level, budget, candidate_ids, languages, exclude_ids)
+    }
+
+    query = """
+    UNWIND $skills AS user_skill
+    CALL {
+        WITH user_skill
+        MATCH (s:Skill) WHERE s.name_lower CONTAINS toLower(user_skill)
+        RETURN s
+        UNION
+        WITH user_skill
+        MATCH (s:Skill) WHERE s.name_lower IN $substrings[user_skill]
+        RETURN s
+    }
+    MATCH (s)<-[:TEACHES]-(c:Certification)
+    WHERE """ + _CERT_FILTERS + """
+
+    WITH c, collect(DISTINCT user_skill) AS matching_skills
+    WITH c, matching_skills,
+         size(matching_skills) AS match_count,
+         c.competences_count AS total_cert_skills
+    WITH c, matching_skills, match_count, total_cert_skills,
+         toFloat(match_count) / toFloat(total_cert_skills) * 100 AS raw_score
+
+    RETURN
+        c.id AS id,
+        c.titre AS titre,
+        c.domaine AS domaine,
+        c.niveau AS niveau,
+        c.objectif AS objectif,
+        c.competences_list AS competences,
+        c.duree AS duree,
+        c.prix AS prix,
+        c.url AS url,
+        c.langues AS langues,
+        c.temps_par_semaine AS temps_par_semaine,
+        matching_skills AS matched_skills,
+        match_count AS skill_matches,
+        total_cert_skills AS total_skills,
+        round(CASE WHEN raw_score > 100.0 THEN 100.0 ELSE raw_score END * 100) / 100 AS relevance_score
+
+    ORDER BY relevance_score DESC, match_count DESC, c.prix ASC
+    LIMIT $limit
+    """
+    results = [dict(r) for r in execute_query(query, params)]
+
+    # allow_no_match: unmatched certifications fill the remaining slots (relevance 0, cheapest first)
+    if allow_no_match and len(results) < limit:
+        fill_query = """
+        MATCH (c:Certification)
+        WHERE c.competences_list IS NOT NULL
+          AND NOT c.id IN $exclude
+          AND """ + _CERT_FILTERS + """
+        RETURN
+            c.id AS id,
+            c.titre AS titre,
+            c.domaine AS domaine,
+            c.niveau AS niveau,
+            c.objectif AS objectif,
+            c.competences_list AS competences,
+            c.duree AS duree,
+            c.prix AS prix,
+            c.url AS url,
+            c.langues AS langues,
+            c.temps_par_semaine AS temps_par_semaine,
+            [] AS matched_skills,
+            0 AS skill_matches,
+            c.competences_count AS total_skills,
+            0.0 AS relevance_score
+        ORDER BY c.prix ASC
+        LIMIT $remaining
+        """
+        fill = execute_query(fill_query, {
+            **params,
+            "exclude": [r["id"] for r in results],
+            "remaining": limit - len(results)
+        })
+        results.extend(dict(r) for r in fill)
+
+    return results
+
+
+def query_certifications_basic(
+    domains: list[str] = None,
+    level: str = None,
+    budget: float = None,
+    limit: int = 100,
+    candidate_ids: list[str] = None,
+    languages: list[str] = None,
+    exclude_ids: list[str] = None
+) -> list[dict]:
+    """Fallback query when no skills are provided. Uses TEACHES relationships."""
+
+    query = """
+    MATCH (c:Certification)
+    WHERE """ + _CERT_FILTERS + """
+
+    // Get skills from TEACHES relationships
+    OPTIONAL MATCH (c)-[:TEACHES]->(s:Skill)
+
+    WITH c, collect(DISTINCT s.name) AS skills
+
+    RETURN
+        c.id AS id,
+        c.titre AS titre,
+        c.domaine AS domaine,
+        c.niveau AS niveau,
+        c.objectif AS objectif,
+        CASE WHEN size(skills) > 0 THEN skills ELSE c.competences END AS competences,
+        c.duree AS duree,
+        c.prix AS prix,
+        c.url AS url,
+        c.langues AS langues,
+        c.temps_par_semaine AS temps_par_semaine,
+        [] AS matched_skills,
+        0 AS skill_matches,
+        size(skills) AS total_skills,
+        0.0 AS relevance_score
+
+    ORDER BY c.prix ASC
+    LIMIT $limit
+    """
+
+    results = execute_query(query, {
+        "limit": limit,
+        **_filter_params(domains, level, budget, candidate_ids, languages, exclude_ids)
+    })
+
+    return [dict(r) for r in results]
+
+
+def _query_certifications_by_skill_overlap(
+    skill_vector: dict[str, float],
+    domains: list[str] = None,
+    level: str = None,
+    budget: float = None,
+    limit: int = 100,
+    candidate_ids: list[str] = None,
+    allow_no_match: bool = False,
+    languages: list[str] = None,
+    exclude_ids: list[str] = None
+) -> list[dict]:
+    """
+    Skill matching on the raw competences property (no normalized schema):
+    every user skill against every cert skill, bidirectional CONTAINS.
+    Handles competences stored as comma-separated strings.
+    """
+    skill_names = list(skill_vector.keys())
+    skill_weights = skill_vector
+
+    # Cypher query - handles competences as either array or comma-separated string
+    # Uses text matching for skill overlap
+    query = """
+    WITH $skills AS user_skills, $weights AS weights
+
+    MATCH (c:Certification)
+    WHERE c.competences IS NOT NULL
+
+    // Apply optional filters
+    AND """ + _CERT_FILTERS + """
+
+    // Handle both array and string formats for competences
+    WITH c, user_skills, weights,
+         CASE
+             WHEN c.competences IS :: LIST<ANY> THEN [s IN c.competences | trim(toString(s))]
+             ELSE [s IN split(toString(c.competences), ', ') | trim(s)]
+         END AS cert_skills
+
+    // Find matching skills (case-insensitive substring match)
+    WITH c, user_skills, weights, cert_skills,
+         [user_skill IN user_skills
+          WHERE ANY(cert_skill IN cert_skills
+                    WHERE toLower(cert_skill) CONTAINS toLower(user_skill)
+                       OR toLower(user_skill) CONTAINS toLower(cert_skill))] AS matching_skills
+
+    // Compute weighted score
+    WITH c, cert_skills, matching_skills,
+         size(matching_skills) AS match_count,
+         size(cert_skills) AS total_cert_skills,
+         REDUCE(score = 0.0, skill IN matching_skills |
+                score + COALESCE(weights[skill], 0.5)) AS weighted_score
+
+    // Compute normalized relevance score (0-100, capped)
+    WITH c, cert_skills, matching_skills, match_count, total_cert_skills, weighted_score,
+         CASE
+             WHEN size(matching_skills) = 0 THEN 0.0
+             ELSE toFloat(match_count) / toFloat(total_cert_skills) * 100
+         END AS raw_score
+
+    // Cap score at 100%
+    WITH c, cert_skills, matching_skills, match_count, total_cert_skills,
+         CASE WHEN raw_score > 100.0 THEN 100.0 ELSE raw_score END AS relevance_score
+
+    WHERE match_count > 0 OR $allow_no_match = true
+
+    RETURN
+        c.id AS id,
+        c.titre AS titre,
+        c.domaine AS domaine,
+        c.niveau AS niveau,
+        c.objectif AS objectif,
+        cert_skills AS competences,
+        c.duree AS duree,
+        c.prix AS prix,
+        c.url AS url,
+        c.langues AS langues,
+        c.temps_par_semaine AS temps_par_semaine,
+        matching_skills AS matched_skills,
+        match_count AS skill_matches,
+        total_cert_skills AS total_skills,
+        round(relevance_score * 100) / 100 AS relevance_score
+
+    ORDER BY relevance_score DESC, match_count DESC, c.prix ASC
+    LIMIT $limit
+    """
+
+    results = execute_query(query, {
+        "skills": skill_names,
+        "weights": skill_weights,
+        "limit": limit,
+        "allow_no_match": allow_no_match,
+        **_filter_params(domains, level, budget, candidate_ids, languages, exclude_ids)
+    })
+
+    return [dict(r) for r in results]
+
+
+# ================================
+# Neo4j backend (Cypher + vector index)
+# ================================
+class Neo4jVectorBackend(RetrievalBackend):
+    """
+    Skill matching in Cypher (normalized Skill/TEACHES schema when present) and
+    cosine search with the Neo4j 5 vector index on Certification.embedding.
+    Embeddings come from the catalog snapshot: prepare() writes the rows whose
+    revision is newer than the last sync (warmup, then every catalog refresh).
+    """
+
+    name = "neo4j"
+
+    def __init__(self, index_name: str = NEO4J_VECTOR_INDEX):
+        self.index_name = index_name
+        self._synced_version = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, catalog):
+        self.sync_embeddings(catalog)
+
+    def prepared(self, catalog):
+        if catalog is None or not catalog.loaded:
+            return False
+        return catalog.embeddings is None or self._synced_version == catalog.version
+
+    def sync_embeddings(self, catalog: CatalogSnapshot):
+        """Create the vector index if needed and write the embeddings changed since the last sync."""
+        if catalog is None or not catalog.loaded or catalog.embeddings is None:
+            return
+        if catalog.version == self._synced_version:
+            return
+
+        with self._lock:
+            if catalog.version == self._synced_version:
+                return
+            start = time.time()
+            synced = self._synced_version
+
+            if synced == 0:
+                # Dimensions come from the encoder: not known before the first snapshot
+                execute_query(f"""
+                CREATE VECTOR INDEX {self.index_name} IF NOT EXISTS
+                FOR (c:Certification) ON c.embedding
+                OPTIONS {{indexConfig: {{
+                    `vector.dimensions`: {int(catalog.embeddings.shape[1])},
+                    `vector.similarity_function`: 'cosine'
+                }}}}
+                """)
+
+            rows = [
+                {"id": cert_id, "embedding": catalog.embeddings[row].tolist()}
+                for cert_id, row in catalog.index.items()
+                if catalog.revisions.get(cert_id, catalog.version) > synced
+            ]
+            for i in range(0, len(rows), 500):
+                execute_query("""
+                UNWIND $rows AS row
+                MATCH (c:Certification {id: row.id})
+                SET c.embedding = row.embedding
+                """, {"rows": rows[i:i + 500]})
+
+            if synced == 0:
+                execute_query("CALL db.awaitIndexes(300)")
+
+            self._synced_version = catalog.version
+            print(f"[retrieval_backend] Synced {len(rows)} embeddings to {self.index_name} "
+                  f"(catalog v{catalog.version}) in {time.time() - start:.2f}s")
+
+    def filter_ids(self, domains=None, level=None, budget=None, candidate_ids=None,
+                   languages=None, exclude_ids=None, catalog=None):
+        results = execute_query("""
+        MATCH (c:Certification)
+        WHERE c.competences IS NOT NULL
+          AND """ + _CERT_FILTERS + """
+        RETURN c.id AS id
+        """, _filter_params(domains, level, budget, candidate_ids, languages, exclude_ids))
+        return [r["id"] for r in results]
+
+    def vector_search(self, query_vector, k, domains=None, level=None, budget=None,
+                      languages=None, exclude_ids=None, catalog=None):
+        if k <= 0:
+            return [], np.zeros(0, dtype=np.float32)
+        if self._synced_version == 0:
+            # Index created by prepare() (warmup): callers fall back to a full scan meanwhile
+            print(f"[retrieval_backend] Vector index {self.index_name} not synced yet, no vector candidates")
+            return [], np.zeros(0, dtype=np.float32)
+
+        filtered = bool(domains) or level is not None or budget is not None or bool(languages) or bool(exclude_ids)
+        results = execute_query("""
+        CALL db.index.vector.queryNodes($index, $fetch, $vector)
+        YIELD node AS c, score
+        WHERE c.competences IS NOT NULL
+          AND """ + _CERT_FILTERS + """
+        RETURN c.id AS id, score
+        ORDER BY score DESC
+        LIMIT $k
+        """, {
+            "index": self.index_name,
+            "fetch": k * FILTER_OVERFETCH if filtered else k,
+            "vector": np.asarray(query_vector, dtype=np.float32).tolist(),
+            "k": k,
+            **_filter_params(domains, level, budget, None, languages, exclude_ids)
+        })
+
+        # The index reports cosine as (1 + cos) / 2: back to plain cosine like the memory backend
+        ids = [r["id"] for r in results]
+        scores = np.array([2.0 * r["score"] - 1.0 for r in results], dtype=np.float32)
+        return ids, scores
+
+    def skill_search(self, skill_vector, domains=None, level=None, budget=None, limit=100,
+                     candidate_ids=None, allow_no_match=None, languages=None, exclude_ids=None, catalog=None):
+        if not skill_vector:
+            # Fallback to basic query if no skills extracted
+            return query_certifications_basic(domains, level, budget, limit, candidate_ids, languages, exclude_ids)
+        if allow_no_match is None:
+            allow_no_match = len(skill_vector) < 2
+
+        # Normalized schema (graph_schema.initialize_schema): index seeks Skill -> Certification
+        if has_normalized_competences():
+            return _query_certifications_by_skill_index(
+                skill_vector, domains, level, budget, limit, candidate_ids, allow_no_match, languages, exclude_ids
+            )
+        return _query_certifications_by_skill_overlap(
+            skill_vector, domains, level, budget, limit, candidate_ids, allow_no_match, languages, exclude_ids
+        )
+
+
+# ================================
+# Backend selection
+# ================================
+BACKENDS = {
+    "memory": InMemoryBackend,
+    "neo4j": Neo4jVectorBackend,
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_retrieval_backend(name: str = None) -> RetrievalBackend:
+    """Shared backend instance for `name` (default: RETRIEVAL_BACKEND)."""
+    name = name or RETRIEVAL_BACKEND
+    backend = _backends.get(name)
+    if backend is None:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown retrieval backend '{name}' (expected one of {sorted(BACKENDS)})")
+        with _backends_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                backend = _backends[name] = BACKENDS[name]()
+    return backend
+
+
+def start_retrieval_backend() -> RetrievalBackend:
+    """
+    Prepare the configured backend (RETRIEVAL_BACKEND) for the catalog and
+    keep it prepared after every catalog refresh. Called by warmup only: a
+    backend used as a fallback (e.g. Neo4j while the catalog loads) never
+    gets the listener, so a memory deployment never writes to Neo4j.
+    """
+    backend = get_retrieval_backend()
+    add_refresh_listener(backend.prepare)
+    backend.prepare(get_catalog())
+    return backend
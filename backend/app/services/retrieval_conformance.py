@@ -0,0 +1,361 @@
+# ================================
+# RETRIEVAL BACKEND CONFORMANCE & BENCHMARK
+# Same questions to a backend and to a brute-force reference
+# ================================
+#
+# Every retrieval backend must answer filter_ids / vector_search / skill_search
+# like a plain Python implementation of the Cypher semantics. Offline, the
+# suite runs the memory backend on synthetic catalogs of several sizes (no
+# Neo4j, no model; tests/test_retrieval_conformance.py runs it in CI); with
+# --backend neo4j it runs on the live catalog.
+# Latencies are reported per operation so a deployment can pick its backend.
+
+import time
+
+import numpy as np
+
+from app.services.catalog import CatalogSnapshot, build_certification_text
+from app.services.vector_index import VectorIndex
+from app.services.skill_index import cert_skill_list, _cypher_round
+from app.services.retrieval_backend import RetrievalBackend, get_retrieval_backend
+
+DOMAINS = ["Cloud", "Data", "AI", "Cybersécurité", "DevOps", "Management"]
+LEVELS = ["Débutant", "Intermédiaire", "Avancé"]
+SKILLS = [
+    "AWS", "AWS Lambda", "Azure", "Azure DevOps", "GCP", "Kubernetes", "Docker", "Terraform",
+    "Python", "SQL", "Spark", "Databricks", "Power BI", "Tableau", "Machine Learning",
+    "Deep Learning", "TensorFlow", "PyTorch", "NLP", "Sécurité réseau", "SIEM", "ITIL",
+    "Scrum", "Gestion de projet", "Linux", "Git", "CI/CD", "Data Engineering", "ETL", "R"
+]
+LANGUAGES = ["Français", "Anglais", "Espagnol"]
+
+RECALL_THRESHOLD = 0.9   # unfiltered vector search may be approximate (IVF, HNSW)
+SCORE_TOLERANCE = 1e-4
+
+
+# ================================
+# Synthetic catalog
+# ================================
+def synthetic_catalog(size: int, dim: int = 64, seed: int = 0) -> CatalogSnapshot:
+    """
+    Catalog snapshot with random certifications and clustered unit embeddings.
+    Covers the edge cases of the filters: missing prices, mixed-case levels,
+    competences as lists or ', '-joined strings, langues as lists or strings.
+    """
+    rng = np.random.default_rng(seed)
+    certifications = []
+    for i in range(size):
+        competences = list(rng.choice(SKILLS, size=rng.integers(1, 7), replace=False))
+        certifications.append({
+            "id": f"cert-{i}",
+            "titre": f"Certification {DOMAINS[i % len(DOMAINS)]} {i}",
+            "domaine": str(rng.choice(DOMAINS)),
+            "niveau": str(rng.choice(LEVELS + [level.lower() for level in LEVELS])),
+            "objectif": f"Maîtriser {competences[0]}",
+            "competences": competences if rng.random() < 0.7 else ", ".join(competences),
+            "duree": f"{int(rng.integers(5, 80))}h",
+            "prix": None if rng.random() < 0.1 else float(rng.integers(0, 40) * 25),
+            "url": f"https://example.org/cert-{i}",
+            "langues": (list(rng.choice(LANGUAGES, size=rng.integers(1, 3), replace=False))
+                        if rng.random() < 0.9 else str(rng.choice(LANGUAGES))),
+            "temps_par_semaine": None
+        })
+
+    # Clustered like real embeddings (same generator as the vector_index benchmark)
+    centers = rng.normal(size=(min(200, size), dim))
+    embeddings = centers[rng.integers(0, len(centers), size)] + 0.5 * rng.normal(size=(size, dim))
+    embeddings = (embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)).astype(np.float32)
+
+    ids = [cert["id"] for cert in certifications]
+    return CatalogSnapshot(
+        version=1,
+        certifications=certifications,
+        texts=[build_certification_text(cert) for cert in certifications],
+        embeddings=embeddings,
+        revisions={cert_id: 1 for cert_id in ids},
+        vector_index=VectorIndex(embeddings, ids)
+    )
+
+
+def _random_filters(rng, catalog: CatalogSnapshot) -> dict:
+    budget = None
+    if rng.random() < 0.5:
+        # Bucket boundaries, values between buckets, below every price
+        budget = float(rng.choice([0, 200, 1000, rng.integers(-10, 1200), rng.integers(1, 400) + 0.5]))
+    return {
+        "domains": None if rng.random() < 0.5 else [str(d)[:int(rng.integers(2, 6))] for d in
+                                                      rng.choice(DOMAINS, size=rng.integers(1, 3), replace=False)],
+        "level": None if rng.random() < 0.6 else str(rng.choice(LEVELS)),
+        "budget": budget,
+        "languages": None if rng.random() < 0.7 else [str(l).lower() for l in
+                                                        rng.choice(LANGUAGES, size=rng.integers(1, 3), replace=False)],
+        "exclude_ids": None if rng.random() < 0.7 else list(rng.choice(catalog.ids, size=min(10, len(catalog)), replace=False)),
+    }
+
+
+def _random_skill_vector(rng) -> dict[str, float]:
+    skills = {}
+    for _ in range(int(rng.integers(0, 5))):
+        skill = str(rng.choice(SKILLS))
+        roll = rng.random()
+        if roll < 0.2:
+            skill = skill[:max(1, len(skill) // 2)]      # partial skill ("Kube")
+        elif roll < 0.3:
+            skill = f"{skill} avancé"                    # longer than the cert skill
+        elif roll < 0.35:
+            skill = "COBOL"                              # no match
+        skills[skill] = float(round(rng.random(), 2))
+    return skills
+
+
+def _random_queries(catalog: CatalogSnapshot, n: int, rng) -> np.ndarray:
+    """Unit vectors near catalog rows, like real queries near their answers."""
+    rows = catalog.embeddings[rng.integers(0, len(catalog), n)]
+    queries = rows + 0.1 * rng.normal(size=rows.shape)
+    return (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+
+# ================================
+# Reference implementation (Cypher semantics, plain Python)
+# ================================
+def _passes(cert: dict, domains=None, level=None, budget=None, candidate_ids=None,
+            languages=None, exclude_ids=None) -> bool:
+    if candidate_ids is not None and cert.get("id") not in candidate_ids:
+        return False
+    if exclude_ids and cert.get("id") in exclude_ids:
+        return False
+    if languages:
+        langues = cert.get("langues")
+        langues = langues if isinstance(langues, list) else [langues] if langues is not None else []
+        if not any(str(l).lower() == wanted.lower() for l in langues for wanted in languages):
+            return False
+    if domains:
+        domaine = cert.get("domaine")
+        if not isinstance(domaine, str) or not any(d.lower() in domaine.lower() for d in domains):
+            return False
+    if level is not None:
+        niveau = cert.get("niveau")
+        if not isinstance(niveau, str) or niveau.lower() != level.lower():
+            return False
+    if budget is not None:
+        prix = cert.get("prix")
+        if not isinstance(prix, (int, float)) or prix > budget:
+            return False
+    return True
+
+
+def reference_filter(catalog, domains=None, level=None, budget=None, candidate_ids=None,
+                     languages=None, exclude_ids=None) -> list[str]:
+    return [c["id"] for c in catalog.certifications
+            if _passes(c, domains, level, budget, candidate_ids, languages, exclude_ids)]
+
+
+def reference_vector(catalog, query_vector, k, domains=None, level=None, budget=None,
+                     languages=None, exclude_ids=None):
+    ids = set(reference_filter(catalog, domains, level, budget, None, languages, exclude_ids))
+    scored = [(float(catalog.embeddings[row] @ query_vector), cert_id)
+              for cert_id, row in catalog.index.items() if cert_id in ids]
+    scored.sort(key=lambda item: -item[0])
+    return [cert_id for _, cert_id in scored[:k]], np.array([s for s, _ in scored[:k]], dtype=np.float32)
+
+
+def reference_skill(catalog, skill_vector, domains=None, level=None, budget=None, limit=100,
+                    candidate_ids=None, allow_no_match=None, languages=None, exclude_ids=None) -> list[dict]:
+    user_skills = list(skill_vector.keys())
+    if allow_no_match is None:
+        allow_no_match = len(user_skills) < 2
+
+    rows = []
+    for cert in catalog.certifications:
+        if not _passes(cert, domains, level, budget, candidate_ids, languages, exclude_ids):
+            continue
+        cert_skills = cert_skill_list(cert.get("competences"))
+        matched = [u for u in user_skills
+                   if any(v.lower() in u.lower() or u.lower() in v.lower() for v in cert_skills)]
+        if not matched and not allow_no_match:
+            continue
+        relevance = min(len(matched) / len(cert_skills) * 100, 100.0) if matched else 0.0
+        rows.append({
+            "id": cert["id"],
+            "prix": cert.get("prix"),
+            "matched_skills": matched,
+            "skill_matches": len(matched),
+            "relevance_score": _cypher_round(relevance)
+        })
+
+    rows.sort(key=lambda r: (-r["relevance_score"], -r["skill_matches"],
+                             r["prix"] if isinstance(r["prix"], (int, float)) else float("inf")))
+    return rows[:limit]
+
+
+def _ranking_key(row: dict) -> tuple:
+    prix = row.get("prix")
+    return (row["relevance_score"], row["skill_matches"], prix if isinstance(prix, (int, float)) else None)
+
+
+def _same_ranking(expected: list[dict], actual: list[dict]) -> bool:
+    """
+    Same sort keys in the same order, and the same ids within every tie group
+    (order inside a tie is unspecified in Cypher; the group cut by the limit
+    only needs to draw from the same candidates).
+    """
+    if [_ranking_key(r) for r in expected] != [_ranking_key(r) for r in actual]:
+        return False
+    groups_expected, groups_actual = {}, {}
+    for row in expected:
+        groups_expected.setdefault(_ranking_key(row), set()).add(row["id"])
+    for row in actual:
+        groups_actual.setdefault(_ranking_key(row), set()).add(row["id"])
+    last = _ranking_key(expected[-1]) if expected else None
+    return all(ids == groups_actual[key] for key, ids in groups_expected.items() if key != last)
+
+
+# ================================
+# Conformance
+# ================================
+def run_conformance(backend: RetrievalBackend, catalog: CatalogSnapshot, cases: int = 50, seed: int = 0) -> dict:
+    """
+    Compare `backend` with the reference on random filters, queries and skill vectors.
+
+    Returns:
+        {"backend": "memory", "size": 1000, "checks": {"filter": {"cases": 50, "failures": 0, "examples": []},
+         "vector_filtered": {...}, "vector_recall": {"cases": 50, "failures": 0, "recall": 0.98}, "skill": {...}},
+         "passed": True}
+    """
+    rng = np.random.default_rng(seed)
+    queries = _random_queries(catalog, cases, rng)
+    checks = {name: {"cases": 0, "failures": 0, "examples": []}
+              for name in ("filter", "vector_filtered", "vector_recall", "skill")}
+
+    def record(name, ok, example):
+        checks[name]["cases"] += 1
+        if not ok:
+            checks[name]["failures"] += 1
+            if len(checks[name]["examples"]) < 3:
+                checks[name]["examples"].append(example)
+
+    recalls = []
+    for i in range(cases):
+        filters = _random_filters(rng, catalog)
+        k = int(rng.integers(1, 30))
+
+        # filter + candidate ids
+        candidate_ids = None if rng.random() < 0.7 else list(rng.choice(catalog.ids, size=min(20, len(catalog)), replace=False))
+        expected = set(reference_filter(catalog, candidate_ids=candidate_ids, **filters))
+        actual = set(backend.filter_ids(candidate_ids=candidate_ids, catalog=catalog, **filters))
+        record("filter", expected == actual, {"filters": filters, "missing": len(expected - actual), "extra": len(actual - expected)})
+
+        # filtered vector search: exact top-k among the filtered rows
+        if any(value is not None for value in filters.values()):
+            expected_ids, expected_scores = reference_vector(catalog, queries[i], k, **filters)
+            actual_ids, actual_scores = backend.vector_search(queries[i], k, catalog=catalog, **filters)
+            allowed = set(reference_filter(catalog, **filters))
+            ok = (
+                len(actual_ids) == len(expected_ids)
+                and set(actual_ids) <= allowed
+                and np.allclose(actual_scores, expected_scores, atol=SCORE_TOLERANCE)
+            )
+            record("vector_filtered", ok, {"filters": filters, "k": k, "expected": expected_ids[:3], "actual": actual_ids[:3]})
+
+        # unfiltered vector search: approximate allowed, recall@k against exhaustive
+        expected_ids, _ = reference_vector(catalog, queries[i], k)
+        actual_ids, actual_scores = backend.vector_search(queries[i], k, catalog=catalog)
+        recall = len(set(actual_ids) & set(expected_ids)) / len(expected_ids) if expected_ids else 1.0
+        recalls.append(recall)
+        ordered = bool(np.all(np.diff(actual_scores) <= SCORE_TOLERANCE))
+        record("vector_recall", ordered and len(actual_ids) == len(expected_ids),
+               {"k": k, "returned": len(actual_ids), "ordered": ordered})
+
+        # skill search
+        skill_vector = _random_skill_vector(rng)
+        limit = int(rng.integers(1, 60))
+        allow_no_match = None if rng.random() < 0.8 else bool(rng.random() < 0.5)
+        if not skill_vector and allow_no_match is False:
+            allow_no_match = None
+        expected = reference_skill(catalog, skill_vector, limit=limit, allow_no_match=allow_no_match, **filters)
+        actual = backend.skill_search(skill_vector, limit=limit, allow_no_match=allow_no_match, catalog=catalog, **filters)
+        record("skill", _same_ranking(expected, actual),
+               {"skills": list(skill_vector), "filters": filters, "limit": limit,
+                "expected": [r["id"] for r in expected[:3]], "actual": [r["id"] for r in actual[:3]]})
+
+    checks["vector_recall"]["recall"] = round(float(np.mean(recalls)), 4) if recalls else 1.0
+    passed = (
+        all(check["failures"] == 0 for check in checks.values())
+        and checks["vector_recall"]["recall"] >= RECALL_THRESHOLD
+    )
+    return {"backend": backend.name, "size": len(catalog), "checks": checks, "passed": passed}
+
+
+# ================================
+# Benchmark
+# ================================
+def benchmark(backend: RetrievalBackend, catalog: CatalogSnapshot, queries: int = 100, k: int = 30, seed: int = 1) -> dict:
+    """
+    Latency per operation (ms) on random requests.
+
+    Returns:
+        {"backend": "memory", "size": 10000,
+         "vector": {"avg_ms": 0.4, "p95_ms": 0.7}, "vector_filtered": {...}, "skill": {...}}
+    """
+    rng = np.random.default_rng(seed)
+    vectors = _random_queries(catalog, queries, rng)
+    requests = [(vectors[i], _random_filters(rng, catalog), _random_skill_vector(rng)) for i in range(queries)]
+
+    operations = {
+        "vector": lambda q, f, s: backend.vector_search(q, k, catalog=catalog),
+        "vector_filtered": lambda q, f, s: backend.vector_search(q, k, catalog=catalog, **f),
+        "skill": lambda q, f, s: backend.skill_search(s, limit=k, catalog=catalog, **f),
+    }
+
+    report = {"backend": backend.name, "size": len(catalog)}
+    for name, operation in operations.items():
+        operation(*requests[0])  # warm caches (ANN, skill postings, Neo4j plans)
+        latencies = []
+        for request in requests:
+            start = time.perf_counter()
+            operation(*request)
+            latencies.append((time.perf_counter() - start) * 1000)
+        report[name] = {
+            "avg_ms": round(float(np.mean(latencies)), 3),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 3)
+        }
+    return report
+
+
+# ============================================================
+# CLI RUNNER - memory backend on synthetic catalogs (offline),
+# or any backend on the live catalog
+# ============================================================
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Retrieval backend conformance and benchmark")
+    parser.add_argument("--backend", default="memory", help="memory | neo4j")
+    parser.add_argument("--sizes", default="200,2000,20000", help="synthetic catalog sizes (memory backend)")
+    parser.add_argument("--live", action="store_true", help="use the live catalog instead of synthetic ones")
+    parser.add_argument("--cases", type=int, default=50)
+    args = parser.parse_args()
+
+    backend = get_retrieval_backend(args.backend)
+    if args.live or args.backend != "memory":
+        from app.services.catalog import get_catalog
+        catalogs = [get_catalog()]
+    else:
+        catalogs = [synthetic_catalog(int(size)) for size in args.sizes.split(",")]
+
+    all_passed = True
+    for catalog in catalogs:
+        backend.prepare(catalog)  # e.g. sync the Neo4j vector index, as warmup does
+        result = run_conformance(backend, catalog, cases=args.cases)
+        all_passed &= result["passed"]
+        print(f"[{backend.name}] {len(catalog)} certifications: {'PASSED' if result['passed'] else 'FAILED'}")
+        for name, check in result["checks"].items():
+            extra = f" | recall {check['recall']}" if "recall" in check else ""
+            print(f"  {name:16s} {check['cases'] - check['failures']}/{check['cases']}{extra}")
+            for example in check["examples"]:
+                print(f"    {example}")
+        print(f"  latency {benchmark(backend, catalog)}")
+
+    sys.exit(0 if all_passed else 1)
@@ -0,0 +1,192 @@
+# ================================
+# SCORING ENGINE
+# Level / domain boosts as array operations
+# ================================
+#
+# Features are precomputed once per catalog certification (level bitmasks,
+# domain bitmasks including title keywords). A request then only gathers rows
+# and applies the boost tables with numpy, instead of string scans per
+# certification. Rules and values are those of get_smart_recommendations.
+
+import numpy as np
+
+LEVELS = ("débutant", "intermédiaire", "avancé")
+
+# Target level matches the certification level (substring either way)
+EXACT_LEVEL_BOOST = (60, "exact")
+
+# Otherwise: first rule whose level name appears in the certification level
+LEVEL_RULES = {
+    "débutant": [("intermédiaire", -50, "too_high"), ("avancé", -80, "way_too_high")],
+    "intermédiaire": [("débutant", -15, "too_low"), ("avancé", -25, "too_high")],
+    "avancé": [("intermédiaire", 15, "acceptable"), ("débutant", -50, "way_too_low")],
+}
+
+# Extra title keywords that count as a domain match
+DOMAIN_TITLE_KEYWORDS = {
+    "cloud": ["aws", "azure", "gcp", "google cloud"],
+    "ai": ["machine learning", "deep learning", "nlp", "tensorflow", "pytorch"],
+}
+DOMAIN_KEYS = ("cloud", "data", "ai")  # precomputed bits, other targets are computed lazily
+
+DOMAIN_MATCH_BOOST = 40
+DOMAIN_MISS_PENALTY = -30
+
+
+def _level_bits(cert_level: str) -> tuple[int, int]:
+    """(bit i: LEVELS[i] in cert_level, bit i: cert_level in LEVELS[i])."""
+    contains = within = 0
+    for i, name in enumerate(LEVELS):
+        if name in cert_level:
+            contains |= 1 << i
+        if cert_level in name:
+            within |= 1 << i
+    return contains, within
+
+
+def _domain_match(target: str, cert_domain: str, cert_title: str) -> bool:
+    if target in cert_domain or target in cert_title:
+        return True
+    return any(kw in cert_title for kw in DOMAIN_TITLE_KEYWORDS.get(target, ()))
+
+
+def _domain_bits(cert_domain: str, cert_title: str) -> int:
+    bits = 0
+    for i, key in enumerate(DOMAIN_KEYS):
+        if _domain_match(key, cert_domain, cert_title):
+            bits |= 1 << i
+    return bits
+
+
+def top_k_indices(scores: np.ndarray, k: int = None) -> np.ndarray:
+    """
+    Indices of the k best scores, best first, ties in original order
+    (same result as a stable descending sort cut at k).
+    """
+    n = len(scores)
+    if k is None or k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    threshold = np.partition(-scores, k - 1)[k - 1]
+    above = np.flatnonzero(-scores < threshold)
+    ties = np.flatnonzero(-scores == threshold)[:k - len(above)]
+    selected = np.concatenate([above, ties])
+    return selected[np.argsort(-scores[selected], kind="stable")]
+
+
+class ScoringEngine:
+    """Per-certification feature columns for the catalog, addressed by id."""
+
+    def __init__(self, certifications: list[dict]):
+        self.index = {}
+        levels, domains, titles = [], [], []
+        for row, cert in enumerate(certifications):
+            self.index[cert.get("id")] = row
+            levels.append((cert.get("niveau") or "").lower())
+            domains.append((cert.get("domaine") or "").lower())
+            titles.append((cert.get("titre") or "").lower())
+
+        self.levels = levels
+        self.domaines = domains
+        self.titles = titles
+
+        level_bits = [_level_bits(level) for level in levels]
+        self.level_contains = np.array([c for c, _ in level_bits], dtype=np.uint8)
+        self.level_within = np.array([w for _, w in level_bits], dtype=np.uint8)
+        self.domain_bits = np.array(
+            [_domain_bits(d, t) for d, t in zip(domains, titles)], dtype=np.uint8
+        )
+        self._domain_masks = {}  # lazily computed masks for other domain targets
+
+    # ------------------------------------------------------------
+    # Feature gathering
+    # ------------------------------------------------------------
+    def _rows(self, certifications: list[dict]) -> tuple[np.ndarray, "ScoringEngine"]:
+        """Catalog rows for `certifications`; unknown ones get their own engine."""
+        rows = [self.index.get(c.get("id")) for c in certifications]
+        if any(row is None for row in rows):
+            return np.arange(len(certifications)), ScoringEngine(certifications)
+        return np.array(rows, dtype=np.int64), self
+
+    def _domain_mask(self, target: str) -> np.ndarray:
+        if target in DOMAIN_KEYS:
+            bit = 1 << DOMAIN_KEYS.index(target)
+            return (self.domain_bits & bit) != 0
+        mask = self._domain_masks.get(target)
+        if mask is None:
+            mask = np.array(
+                [_domain_match(target, d, t) for d, t in zip(self.domaines, self.titles)], dtype=bool
+            )
+            self._domain_masks[target] = mask
+        return mask
+
+    def _level_exact(self, target: str) -> np.ndarray:
+        if target in LEVELS:
+            bit = 1 << LEVELS.index(target)
+            return ((self.level_contains | self.level_within) & bit) != 0
+        return np.array([target in level or level in target for level in self.levels], dtype=bool)
+
+    def _level_contains(self, name: str) -> np.ndarray:
+        return (self.level_contains & (1 << LEVELS.index(name))) != 0
+
+    # ------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------
+    def score(self, certifications: list[dict], level: str = None, domains: list[str] = None) -> np.ndarray:
+        """
+        Apply level and domain boosts to relevance_score (in place, like the
+        original loops: level_match / domain_match are set on each dict).
+        Returns the boosted scores as an array aligned with `certifications`.
+        """
+        n = len(certifications)
+        scores = np.array([c.get("relevance_score", 0) for c in certifications], dtype=np.float64)
+        if n == 0:
+            return scores
+
+        rows, engine = self._rows(certifications)
+        delta = np.zeros(n, dtype=np.float64)
+        level_labels = np.full(n, None, dtype=object)
+
+        if level:
+            target = level.lower()
+            conditions = [engine._level_exact(target)[rows]]
+            boosts = [EXACT_LEVEL_BOOST[0]]
+            labels = [EXACT_LEVEL_BOOST[1]]
+            for name, boost, label in LEVEL_RULES.get(target, []):
+                conditions.append(engine._level_contains(name)[rows])
+                boosts.append(boost)
+                labels.append(label)
+            delta += np.select(conditions, boosts, default=0)
+            level_labels = np.select(conditions, labels, default=None)
+
+        domain_matched = None
+        if domains:
+            matched = np.zeros(n, dtype=bool)
+            for target in domains:
+                matched |= engine._domain_mask(target.lower())[rows]
+            delta += np.where(matched, DOMAIN_MATCH_BOOST, DOMAIN_MISS_PENALTY)
+            domain_matched = matched
+
+        scores += delta
+        for i, cert in enumerate(certifications):
+            if level_labels[i] is not None:
+                cert["level_match"] = level_labels[i]
+            if level_labels[i] is not None or domain_matched is not None:
+                cert["relevance_score"] = float(scores[i])
+            if domain_matched is not None:
+                cert["domain_match"] = bool(domain_matched[i])
+
+        return scores
+
+    def rank(
+        self,
+        certifications: list[dict],
+        level: str = None,
+        domains: list[str] = None,
+        k: int = None
+    ) -> list[dict]:
+        """Boost, then order by relevance_score (stable); `k` keeps only the k best."""
+        scores = self.score(certifications, level, domains)
+        return [certifications[i] for i in top_k_indices(scores, k)]
@@ -4,13 +4,25 @@
 # ================================
 
 import re
-from sentence_transformers import SentenceTransformer, util
-from app.database import execute_query
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from app.services.catalog import add_refresh_listener, current_catalog, get_catalog, refresh_catalog
+from app.config import (
+    EMBEDDING_SKILL_MAX_CANDIDATES, EMBEDDING_SKILL_MAX_NGRAM, EMBEDDING_SKILL_THRESHOLD,
+    LLM_CHUNK_CHARS, LLM_CHUNK_OVERLAP, LLM_MAX_CHUNKS, LLM_MAX_CONCURRENCY
+)
+from app.services.bm25_index import STOPWORDS
+from app.services.embedding_cache import encode_cached
+from app.services.keyword_engine import KeywordEngine, KeywordHits
+from app.services.llm_cache import get_llm_cache
 from groq import Groq
 import os
 
-# Shared embedding model
-model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
+# Shared embedding model: fetched lazily through the registry
+# (catalog snapshot for the vocabulary, embedding_cache for user input)
 
 # Groq client for LLM-based extraction
 _groq_client = None
@@ -23,76 +35,83 @@ def get_groq_client():
 
 
 # ================================
-# Load canonical skills from Neo4j
+# Canonical skills (shared catalog snapshot, see catalog.py)
 # ================================
-_skills_cache = None
-_skills_embeddings = None
-
 def load_canonical_skills():
     """
-    Extract all unique skills from certifications in Neo4j.
-    Handles competences stored as either arrays or comma-separated strings.
-    These form the canonical skill vocabulary.
-    """
-    global _skills_cache, _skills_embeddings
-
-    if _skills_cache is not None:
-        return _skills_cache, _skills_embeddings
-
-    # Query handles both array and string formats
-    query = """
-    MATCH (c:Certification)
-    WHERE c.competences IS NOT NULL
-    WITH c.competences AS comp
-    // Handle both list and string formats
-    WITH CASE
-        WHEN comp IS :: LIST<ANY> THEN comp
-        ELSE split(toString(comp), ', ')
-    END AS skills_list
-    UNWIND skills_list AS skill
-    WITH trim(toString(skill)) AS clean_skill
-    WHERE clean_skill <> ''
-    RETURN DISTINCT clean_skill AS skill
-    ORDER BY skill
+    All unique skills from certification competences (arrays or comma-separated
+    strings) with their embeddings. These form the canonical skill vocabulary.
     """
-    results = execute_query(query)
-
-    skills = [r["skill"] for r in results if r["skill"]]
-
-    if skills:
-        embeddings = model.encode(skills, convert_to_tensor=True)
-    else:
-        embeddings = None
-
-    _skills_cache = skills
-    _skills_embeddings = embeddings
-
-    return skills, embeddings
+    catalog = get_catalog()
+    return catalog.skills, catalog.skill_embeddings
 
 
 def refresh_skills_cache():
-    """Force refresh of skills cache (call after Neo4j data changes)."""
-    global _skills_cache, _skills_embeddings
-    _skills_cache = None
-    _skills_embeddings = None
-    return load_canonical_skills()
+    """Refresh the shared catalog snapshot (call after Neo4j data changes)."""
+    catalog = refresh_catalog()
+    return catalog.skills, catalog.skill_embeddings
 
 
 # ================================
 # Extract skills from text using LLM
 # ================================
-def extract_skills_with_llm(text: str) -> list[str]:
+# Bump SKILL_PROMPT_VERSION whenever the prompt or the parsing below changes:
+# it is part of the LLM cache key
+SKILL_LLM_MODEL = "llama-3.1-8b-instant"
+SKILL_PROMPT_VERSION = "skills-v1"
+
+
+def chunk_text(text: str, size: int = LLM_CHUNK_CHARS, overlap: int = LLM_CHUNK_OVERLAP) -> list[str]:
     """
-    Use LLM to extract skills/technologies/competencies from text.
-    SCOPE: Cloud, Data, and AI domains only.
-    Works with CVs, job descriptions, or user queries.
+    Split text into chunks of at most `size` chars covering all of it.
+    Chunks end on a line break or space when possible and the next one
+    starts `overlap` chars earlier, so a skill cut at a border is whole in
+    one of them.
     """
+    text = text.strip()
+    if len(text) <= size:
+        return [text] if text else []
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + size)
+        if end < len(text):
+            # Prefer a line break, then a space, in the second half of the chunk
+            cut = text.rfind("\n", start + size // 2, end)
+            if cut == -1:
+                cut = text.rfind(" ", start + size // 2, end)
+            if cut != -1:
+                end = cut
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        next_start = max(end - overlap, start + 1)
+        # Do not start in the middle of a word
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space != -1 else next_start
+    return [chunk for chunk in chunks if chunk]
+
+
+# Process-wide LLM concurrency: chunks of every request share one pool, and
+# the slots also cap single-chunk calls made from request threads
+_llm_pool = ThreadPoolExecutor(max_workers=max(1, LLM_MAX_CONCURRENCY), thread_name_prefix="llm-extract")
+_llm_slots = threading.BoundedSemaphore(max(1, LLM_MAX_CONCURRENCY))
+
+
+def _extract_chunk_with_llm(chunk: str) -> list[str] | None:
+    """Skills of one chunk (None when the call failed). Cached, see llm_cache.py."""
+    cache = get_llm_cache()
+    cached = cache.get(SKILL_LLM_MODEL, SKILL_PROMPT_VERSION, chunk)
+    if cached is not None:
+        return list(cached)
+
     client = get_groq_client()
 
     prompt = f"""Extract ONLY the specific technical skills/technologies mentioned in this text.
 Do NOT add generic terms like "Cloud", "Data", or "AI" unless they are part of a specific technology name.
 
-TEXT: {text[:3000]}
+TEXT: {chunk}
 
 RULES:
 - Extract specific technologies: AWS, Azure, Python, SQL, Spark, etc.
@@ -105,68 +124,141 @@ Example: AWS, Python, SQL, Spark
 SKILLS:"""
 
     try:
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {"role": "system", "content": "You extract skills from text. Respond ONLY with a comma-separated list of skills. No explanations, no sentences, just skills separated by commas."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.0,
-            max_tokens=200
-        )
+        with _llm_slots:
+            response = client.chat.completions.create(
+                model=SKILL_LLM_MODEL,
+                messages=[
+                    {"role": "system", "content": "You extract skills from text. Respond ONLY with a comma-separated list of skills. No explanations, no sentences, just skills separated by commas."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.0,
+                max_tokens=200
+            )
 
         raw = response.choices[0].message.content.strip()
 
-        # If response is too long or contains sentences, it's not a proper list
-        if len(raw) > 500 or "Based on" in raw or "Here" in raw or "following" in raw:
-            # Fallback: try to extract skills using regex
-            import re
-            # Look for known skill patterns
-            known_skills = ["AWS", "Azure", "GCP", "Python", "SQL", "Spark", "Hadoop",
-                          "TensorFlow", "PyTorch", "Keras", "Scikit-learn", "Pandas",
-                          "Docker", "Kubernetes", "Airflow", "Kafka", "BigQuery",
-                          "Redshift", "Snowflake", "Power BI", "Tableau", "R",
-                          "Machine Learning", "Deep Learning", "NLP", "MLOps"]
-            found = [s for s in known_skills if s.lower() in raw.lower()]
-            return found if found else []
-
-        if raw.upper() == "NONE" or not raw:
-            return []
-
-        # Parse comma-separated skills, clean up
-        skills = []
-        # Generic terms to filter out (NOT specific technologies)
-        generic_terms = {"cloud", "data", "ai", "ia", "ml", "none", "n/a", "certification", "certifications"}
-
-        for s in raw.split(","):
-            skill = s.strip().strip("-").strip("•").strip()
-            if not skill:
-                continue
-            # Skip short lowercase terms (R and C valid only if uppercase)
-            if len(skill) <= 2 and skill.lower() == skill:
-                continue
-            if len(skill) > 50:
-                continue
-            if " is " in skill.lower() or " are " in skill.lower():
-                continue
-            if skill.lower() in generic_terms:
+    except Exception as e:
+        print(f"[skill_extractor] LLM extraction failed: {e}")
+        return None
+
+    skills = parse_llm_skills(raw)
+    cache.put(SKILL_LLM_MODEL, SKILL_PROMPT_VERSION, chunk, skills)
+    return skills
+
+
+def extract_skills_with_llm_scored(text: str) -> dict[str, float]:
+    """
+    LLM skills of the whole text with a frequency-based confidence.
+
+    Long texts are split into overlapping chunks (chunk_text) extracted in
+    parallel, at most LLM_MAX_CONCURRENCY calls at a time across all requests.
+    Past an optional LLM_MAX_CHUNKS cost ceiling the remaining chunks get the
+    keyword extractor instead: no part of the text is skipped. A skill found
+    in k of the n chunks that answered gets 0.5 + 0.5 * k / n: one chunk is
+    enough to keep it, repeated mentions raise it (1.0 for a single chunk).
+    Skills are returned most confident first, in first-seen spelling.
+    """
+    chunks = chunk_text(text)
+    if not chunks:
+        return {}
+
+    tail = []
+    if LLM_MAX_CHUNKS > 0 and len(chunks) > LLM_MAX_CHUNKS:
+        chunks, tail = chunks[:LLM_MAX_CHUNKS], chunks[LLM_MAX_CHUNKS:]
+
+    if len(chunks) == 1:
+        results = [_extract_chunk_with_llm(chunks[0])]
+    else:
+        start = time.time()
+        results = list(_llm_pool.map(_extract_chunk_with_llm, chunks))
+        print(f"[skill_extractor] LLM extraction: {len(chunks)} chunks in {time.time() - start:.2f}s")
+
+    # Chunks past the cost ceiling: keyword extraction (local, free)
+    if tail:
+        results += [extract_skills_from_text(chunk) for chunk in tail]
+        print(f"[skill_extractor] LLM_MAX_CHUNKS={LLM_MAX_CHUNKS}: {len(tail)} more chunks by keywords")
+
+    answered = [skills for skills in results if skills is not None]
+    if not answered:
+        return {}
+
+    counts = {}  # lowercase -> [chunks mentioning it, first-seen spelling]
+    for skills in answered:
+        seen = set()
+        for skill in skills:
+            key = skill.lower()
+            if key in seen:
                 continue
-            skills.append(skill)
+            seen.add(key)
+            entry = counts.setdefault(key, [0, skill])
+            entry[0] += 1
 
-        return skills[:20]  # Limit to 20 skills
+    n = len(answered)
+    ranked = sorted(counts.values(), key=lambda entry: -entry[0])  # stable: first seen wins ties
+    return {skill: round(0.5 + 0.5 * count / n, 3) for count, skill in ranked}
 
-    except Exception as e:
-        print(f"[skill_extractor] LLM extraction failed: {e}")
+
+def extract_skills_with_llm(text: str) -> list[str]:
+    """
+    Use LLM to extract skills/technologies/competencies from text.
+    SCOPE: Cloud, Data, and AI domains only.
+    Works with CVs, job descriptions, or user queries - of any length (long
+    texts are chunked, see extract_skills_with_llm_scored).
+    Results are cached (memory + SQLite, see llm_cache.py); failures are not.
+    """
+    return list(extract_skills_with_llm_scored(text))
+
+
+def parse_llm_skills(raw: str) -> list[str]:
+    """Skill list from the raw LLM answer (comma-separated, with fallbacks)."""
+    # If response is too long or contains sentences, it's not a proper list
+    if len(raw) > 500 or "Based on" in raw or "Here" in raw or "following" in raw:
+        # Fallback: try to extract skills using regex
+        # Look for known skill patterns
+        known_skills = ["AWS", "Azure", "GCP", "Python", "SQL", "Spark", "Hadoop",
+                      "TensorFlow", "PyTorch", "Keras", "Scikit-learn", "Pandas",
+                      "Docker", "Kubernetes", "Airflow", "Kafka", "BigQuery",
+                      "Redshift", "Snowflake", "Power BI", "Tableau", "R",
+                      "Machine Learning", "Deep Learning", "NLP", "MLOps"]
+        found = [s for s in known_skills if s.lower() in raw.lower()]
+        return found if found else []
+
+    if raw.upper() == "NONE" or not raw:
         return []
 
+    # Parse comma-separated skills, clean up
+    skills = []
+    # Generic terms to filter out (NOT specific technologies)
+    generic_terms = {"cloud", "data", "ai", "ia", "ml", "none", "n/a", "certification", "certifications"}
+
+    for s in raw.split(","):
+        skill = s.strip().strip("-").strip("•").strip()
+        if not skill:
+            continue
+        # Skip short lowercase terms (R and C valid only if uppercase)
+        if len(skill) <= 2 and skill.lower() == skill:
+            continue
+        if len(skill) > 50:
+            continue
+        if " is " in skill.lower() or " are " in skill.lower():
+            continue
+        if skill.lower() in generic_terms:
+            continue
+        skills.append(skill)
+
+    return skills[:20]  # Limit to 20 skills
+
 
 # ================================
 # Map extracted skills to canonical skills
 # ================================
-def map_to_canonical_skills(extracted_skills: list[str], threshold: float = 0.6) -> dict[str, float]:
+def map_to_canonical_skills(extracted_skills: list[str], threshold: float = 0.6,
+                            weights: dict[str, float] = None) -> dict[str, float]:
     """
     Map extracted skills to canonical skills using semantic similarity.
     Returns a dict of {canonical_skill: confidence_score}.
+    `weights` (extracted skill -> confidence) scale the similarity of a
+    match once it passed the threshold.
     """
     canonical_skills, skill_embeddings = load_canonical_skills()
 
@@ -176,17 +268,21 @@ def map_to_canonical_skills(extracted_skills: list[str], threshold: float = 0.6)
     if not extracted_skills:
         return {}
 
-    skill_vector = {}
+    # One forward pass for every extracted skill not already cached
+    skill_embeds = encode_cached(extracted_skills)
 
-    for skill in extracted_skills:
-        skill_embed = model.encode(skill, convert_to_tensor=True)
-        similarities = util.cos_sim(skill_embed, skill_embeddings)[0]
+    # Cosine similarity matrix (embeddings are normalized): extracted x canonical
+    similarities = skill_embeds @ skill_embeddings.T
 
-        # Find best match
-        best_idx = similarities.argmax().item()
-        best_score = similarities[best_idx].item()
+    # Find best match for each extracted skill
+    best_indices = similarities.argmax(axis=1)
+    best_scores = similarities[np.arange(len(extracted_skills)), best_indices]
 
+    skill_vector = {}
+    for skill, best_idx, best_score in zip(extracted_skills, best_indices.tolist(), best_scores.tolist()):
         if best_score >= threshold:
+            if weights:
+                best_score *= weights.get(skill, 1.0)
             canonical = canonical_skills[best_idx]
             # Keep highest score if skill maps to same canonical
             if canonical not in skill_vector or skill_vector[canonical] < best_score:
@@ -195,6 +291,86 @@ def map_to_canonical_skills(extracted_skills: list[str], threshold: float = 0.6)
     return skill_vector
 
 
+# ================================
+# Extract skills locally: n-gram candidates matched by embedding
+# ================================
+# Candidates never span punctuation or line breaks
+_SEGMENT_SPLIT_RE = re.compile(r"[,;:!?()\[\]{}|/•\n\r\t]+|\.(?:\s|$)")
+_WORD_RE = re.compile(r"\w[\w+#.\-]*[\w+#]|\w")
+
+# No candidate starts with a stopword or an elided article (j', qu'...) nor
+# ends with one; "ai" (j'ai) may still end a skill ("vertex ai")
+_ELISIONS = {"j", "l", "d", "qu", "n", "s", "c", "m", "t"}
+_START_STOPWORDS = STOPWORDS | _ELISIONS
+_END_STOPWORDS = (STOPWORDS - {"ai"}) | _ELISIONS
+
+
+def skill_candidates(text: str, max_ngram: int = EMBEDDING_SKILL_MAX_NGRAM,
+                     limit: int = EMBEDDING_SKILL_MAX_CANDIDATES) -> list[str]:
+    """
+    1..max_ngram word n-grams of the text that neither start nor end with a
+    stopword, deduplicated (case-insensitive), most frequent first.
+    """
+    counts = {}  # lowercase -> [count, first position, surface form]
+    position = 0
+    for segment in _SEGMENT_SPLIT_RE.split(text):
+        words = _WORD_RE.findall(segment)
+        for i in range(len(words)):
+            for n in range(1, max_ngram + 1):
+                if i + n > len(words):
+                    break
+                gram = words[i:i + n]
+                first, last = gram[0].lower(), gram[-1].lower()
+                if first in _START_STOPWORDS or last in _END_STOPWORDS:
+                    continue
+                surface = " ".join(gram)
+                key = surface.lower()
+                if len(key) < 2 or key.isdigit() or key in SKILL_SKIP_TERMS:
+                    continue
+                entry = counts.get(key)
+                if entry is None:
+                    counts[key] = [1, position, surface]
+                else:
+                    entry[0] += 1
+                position += 1
+
+    ranked = sorted(counts.values(), key=lambda entry: (-entry[0], entry[1]))
+    return [surface for _, _, surface in ranked[:limit]]
+
+
+def extract_skills_with_embeddings(text: str, threshold: float = EMBEDDING_SKILL_THRESHOLD) -> tuple[list[str], dict[str, float]]:
+    """
+    Extract skills without any network call: candidate n-grams are embedded
+    in one batch and matched against the canonical skill embeddings.
+    Returns (extracted_skills, skill_vector) - the matched phrases, best
+    first, and {canonical_skill: score} as map_to_canonical_skills would.
+    """
+    canonical_skills, skill_embeddings = load_canonical_skills()
+    if not canonical_skills or skill_embeddings is None:
+        return [], {}
+
+    candidates = skill_candidates(text)
+    if not candidates:
+        return [], {}
+
+    similarities = encode_cached(candidates) @ skill_embeddings.T
+    best_indices = similarities.argmax(axis=1)
+    best_scores = similarities[np.arange(len(candidates)), best_indices]
+
+    skill_vector = {}
+    matched = {}  # canonical -> (score, phrase)
+    for candidate, best_idx, best_score in zip(candidates, best_indices.tolist(), best_scores.tolist()):
+        if best_score < threshold:
+            continue
+        canonical = canonical_skills[best_idx]
+        if canonical not in skill_vector or skill_vector[canonical] < best_score:
+            skill_vector[canonical] = best_score
+            matched[canonical] = (best_score, candidate)
+
+    extracted = [phrase for _, phrase in sorted(matched.values(), key=lambda m: -m[0])]
+    return extracted, skill_vector
+
+
 # ================================
 # Extract keywords for fallback matching
 # SCOPE: Cloud, Data, AI only
@@ -246,46 +422,44 @@ DOMAIN_KEYWORDS = {
 }
 
 
-def extract_keywords(text: str) -> list[str]:
+# Short keywords that need word boundary matching
+SHORT_DOMAIN_KEYWORDS = {"ai", "ia", "ml", "bi", "r"}
+
+# Strong indicators (in title/objective) get higher weight
+STRONG_CONTEXT_PATTERNS = {
+    "cloud": [r"cloud\s+computing", r"cloud\s+engineer", r"aws", r"azure", r"carriere.*cloud", r"debuter.*cloud"],
+    "data": [r"data\s+engineer", r"data\s+scientist", r"data\s+analyst", r"big\s+data", r"carriere.*data"],
+    "ai": [r"machine\s+learning", r"deep\s+learning", r"intelligence\s+artificielle", r"carriere.*ia", r"carriere.*ai"],
+}
+
+
+def extract_keywords(text: str, hits: KeywordHits = None) -> list[str]:
     """
     Extract PRIMARY domain from text based on keyword frequency.
     Returns domains sorted by relevance (most matches first).
     Only returns secondary domains if they have significant presence.
+    `hits`: scan_keywords(text), when the caller already scanned it.
     """
-    import re
-    text_lower = text.lower()
-
-    # Short keywords that need word boundary matching
-    short_keywords = {"ai", "ia", "ml", "bi", "r"}
+    hits = hits or scan_keywords(text)
 
     # Count keyword matches per domain
     domain_scores = {"cloud": 0, "data": 0, "ai": 0}
 
-    # Strong indicators (in title/objective) get higher weight
-    strong_context_patterns = {
-        "cloud": [r"cloud\s+computing", r"cloud\s+engineer", r"aws", r"azure", r"carriere.*cloud", r"debuter.*cloud"],
-        "data": [r"data\s+engineer", r"data\s+scientist", r"data\s+analyst", r"big\s+data", r"carriere.*data"],
-        "ai": [r"machine\s+learning", r"deep\s+learning", r"intelligence\s+artificielle", r"carriere.*ia", r"carriere.*ai"],
-    }
-
     # Check strong indicators first (worth 5 points each)
-    for domain, patterns in strong_context_patterns.items():
+    for domain, patterns in STRONG_CONTEXT_PATTERNS.items():
         for pattern in patterns:
-            if re.search(pattern, text_lower):
+            if hits.search(pattern):
                 domain_scores[domain] += 5
 
     # Count regular keyword matches (worth 1 point each)
     for domain, keywords in DOMAIN_KEYWORDS.items():
         for kw in keywords:
-            if kw in short_keywords:
-                pattern = r'\b' + re.escape(kw) + r'\b'
-                if re.search(pattern, text_lower):
+            if kw in SHORT_DOMAIN_KEYWORDS:
+                if hits.has(kw, bounded=True):
                     domain_scores[domain] += 1
             else:
                 # Count occurrences
-                count = text_lower.count(kw)
-                if count > 0:
-                    domain_scores[domain] += count
+                domain_scores[domain] += hits.count(kw)
 
     # Get primary domain (highest score)
     max_score = max(domain_scores.values())
@@ -309,31 +483,26 @@ def extract_keywords(text: str) -> list[str]:
     return result
 
 
-def extract_skills_from_text(text: str) -> list[str]:
+# Generic terms to skip in fallback extraction
+SKILL_SKIP_TERMS = {"cloud", "data", "ai", "r", "c"}
+
+
+def extract_skills_from_text(text: str, hits: KeywordHits = None) -> list[str]:
     """
     Extract tech skills from text using keyword matching.
     Uses word boundary matching to avoid false positives.
     """
-    import re
-    text_lower = text.lower()
+    hits = hits or scan_keywords(text)
     found_skills = []
 
-    # Generic terms to skip in fallback extraction
-    skip_terms = {"cloud", "data", "ai", "r", "c"}
-
     for skill in TECH_SKILLS:
         # Skip generic single-word terms that cause false positives
-        if skill in skip_terms:
+        if skill in SKILL_SKIP_TERMS:
             continue
-        # Use word boundary matching for short terms
-        if len(skill) <= 3:
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if re.search(pattern, text_lower):
-                found_skills.append(skill)
-        else:
-            # Longer terms can use simple substring match
-            if skill in text_lower:
-                found_skills.append(skill)
+        # Use word boundary matching for short terms,
+        # longer terms can use simple substring match
+        if hits.has(skill, bounded=len(skill) <= 3):
+            found_skills.append(skill)
 
     return found_skills
 
@@ -388,88 +557,172 @@ KNOWN_CERTIFICATIONS = [
 ]
 
 
-def detect_held_certifications(text: str) -> list[str]:
+# Patterns indicating a certification is already held
+HELD_CUE_PATTERNS = [
+    r"certifi[ée]",
+    r"obtenu",
+    r"diplôm[ée]",
+    r"certified",
+    r"certification[s]?\s*(?:actuelle|obtenue|:)",
+    r"certifications?\s*:\s*\n",
+    r"\(\d{4}\)",  # Year in parentheses like (2022)
+]
+
+# A mention counts as held when a cue lies within this many chars around it
+HELD_CUE_WINDOW = 200
+
+# Exam codes in catalog titles: "(AZ-305)", "(DP-203)", "SAA-C03". A code has a
+# digit: "(AWS)" or "(GCP)" is a vendor, not a mention of one certification
+_EXAM_CODE_RE = re.compile(r"\((?=[A-Z-]*\d)([A-Z0-9]{2,6}(?:-[A-Z0-9]{2,5})?)\)|\b([A-Z]{2,5}-[A-Z]?\d{2,4})\b")
+
+
+def certification_terms(certifications: list[dict]) -> dict[str, list[str]]:
+    """
+    Lowercase mention -> certification ids: catalog titles (with and without
+    their parenthesised part), ids (also with spaces) and exam codes.
+    """
+    terms = {}
+
+    def add(term, cert_id):
+        term = " ".join(term.lower().split())
+        if len(term) >= 3 and cert_id not in terms.setdefault(term, []):
+            terms[term].append(cert_id)
+
+    for cert in certifications:
+        cert_id = cert.get("id")
+        if not cert_id:
+            continue
+        add(cert_id, cert_id)
+        add(cert_id.replace("-", " "), cert_id)
+        titre = cert.get("titre") or ""
+        if titre:
+            add(titre, cert_id)
+            add(re.sub(r"\([^)]*\)", " ", titre), cert_id)
+            for code in _EXAM_CODE_RE.findall(titre):
+                add(code[0] or code[1], cert_id)
+    return terms
+
+
+def detect_held_certifications(text: str, hits: KeywordHits = None) -> list[str]:
     """
     Detect certifications already mentioned as obtained in the CV.
     Returns list of certification IDs to exclude from recommendations.
+
+    Mentions come from the keyword scan: catalog titles, ids and exam codes
+    (whole words) plus the KNOWN_CERTIFICATIONS aliases (substrings). The
+    "held" cues are located once; each mention then looks up its nearest cue.
     """
-    text_lower = text.lower()
-    held_certs = []
-
-    # Patterns indicating certification is already held
-    held_patterns = [
-        r"certifi[ée]",
-        r"obtenu",
-        r"diplôm[ée]",
-        r"certified",
-        r"certification[s]?\s*(?:actuelle|obtenue|:)",
-        r"certifications?\s*:\s*\n",
-        r"\(\d{4}\)",  # Year in parentheses like (2022)
-    ]
+    hits = hits or scan_keywords(text)
+    engine = get_keyword_engine()
 
-    # Check each known certification
-    for cert_name, cert_id in KNOWN_CERTIFICATIONS:
-        if cert_name in text_lower:
-            # Check if it appears in a context suggesting it's already held
-            # Find the position of the certification mention
-            pos = text_lower.find(cert_name)
-            # Look at surrounding context (200 chars before and after)
-            start = max(0, pos - 200)
-            end = min(len(text_lower), pos + len(cert_name) + 200)
-            context = text_lower[start:end]
-
-            # Check if any "held" pattern is in the context
-            for pattern in held_patterns:
-                if re.search(pattern, context):
-                    if cert_id not in held_certs:
-                        held_certs.append(cert_id)
-                    break
+    # Cue positions, by start
+    cues = sorted({(m[0], m[1]) for pattern in HELD_CUE_PATTERNS for m in hits.matches(pattern)})
+    if not cues:
+        return []
+    cue_starts = [start for start, _ in cues]
+
+    def near_cue(start, end):
+        """
+        A cue lying entirely within HELD_CUE_WINDOW chars around [start, end),
+        outside the mention itself ("Certified" in a title is not a cue).
+        """
+        window_end = end + HELD_CUE_WINDOW
+        i = bisect_left(cue_starts, start - HELD_CUE_WINDOW)
+        while i < len(cues) and cues[i][0] < window_end:
+            cue_start, cue_end = cues[i]
+            if cue_end <= window_end and (cue_end <= start or cue_start >= end):
+                return True
+            i += 1
+        return False
+
+    held = {}  # cert id -> first held mention
+    for term, cert_ids in engine.certification_terms.items():
+        if term not in hits.terms:
+            continue
+        bounded = term not in engine.certification_aliases
+        for hit in hits.hits(term):
+            if bounded and not hit.bounded:
+                continue
+            if near_cue(hit.start, hit.end):
+                for cert_id in cert_ids:
+                    held[cert_id] = min(held.get(cert_id, hit.start), hit.start)
+                break
+
+    return sorted(held, key=held.get)
+
+
+STRONG_BEGINNER_INDICATORS = [
+    "étudiant en", "étudiante en", "student in",
+    "recherche de stage", "recherche stage", "cherche stage",
+    "première expérience", "premier emploi",
+    "jeune diplômé", "nouveau diplômé", "fresh graduate",
+    "sans expérience", "pas d'expérience", "no experience",
+    "débutant en", "débuter en", "je débute",
+    "en dernière année", "dernière année de",
+    "en formation", "currently studying",
+    "stage de fin d'études", "internship"
+]
+
+# Explicit "X ans d'expérience" (no match starting inside a number)
+YEARS_PATTERNS = [
+    r'(?<!\d)(\d+)\s*(?:ans?|years?)\s*(?:d\'?expérience|d\'experience|experience|of experience)',
+    r'(?:expérience|experience)\s*(?:de\s*)?(\d+)\s*(?:ans?|years?)',
+    r'(?<!\d)(\d+)\+?\s*(?:ans?|years?)\s+(?:en tant que|as a|comme)',
+]
 
-    return held_certs
+WEAK_STUDENT_INDICATORS = [
+    "stage", "stagiaire", "intern",
+    "licence", "master", "bachelor", "bts", "dut",
+    "alternance", "apprenti",
+]
 
+# A REAL job (not internship) despite student indicators
+REAL_JOB_PATTERNS = [
+    r"\b(?:cdi|cdd)\b",
+    r"\bcontrat\s+(?:permanent|indéterminé)",
+    r"\bfull[\s-]?time\s+(?:position|role)",
+    r"\bsenior\s+\w+",
+    r"\b(?:5|6|7|8|9|\d{2})\s*ans?\s*d'expérience",
+]
+
+# Only real job titles, NOT certification names
+JOB_TITLE_PATTERNS = [
+    r"\bingénieur\s+(?:data|cloud|logiciel)",
+    r"\bdevelop(?:per|eur)\b",
+    r"\bdata\s+(?:engineer|analyst|scientist)\b",
+    r"\bcloud\s+engineer\b",
+    r"\bconsultant\s+(?:senior|data|cloud)",
+    r"\bchef\s+de\s+projet\b",
+    r"\btech\s+lead\b",
+    r"\bdevops\b",
+    r"\bsre\b",
+]
 
-def detect_experience_years(text: str) -> int:
+
+def detect_experience_years(text: str, hits: KeywordHits = None) -> int:
     """
     Detect total years of PROFESSIONAL experience from CV text.
     Excludes education/formation periods.
     Returns estimated years of experience.
     """
-    text_lower = text.lower()
+    hits = hits or scan_keywords(text)
+    text_lower = hits.text
 
     # ============================================================
     # PRIORITY 1: Check for EXPLICIT beginner/student indicators
     # If found, return 0 IMMEDIATELY (no date parsing)
     # ============================================================
-    strong_beginner_indicators = [
-        "étudiant en", "étudiante en", "student in",
-        "recherche de stage", "recherche stage", "cherche stage",
-        "première expérience", "premier emploi",
-        "jeune diplômé", "nouveau diplômé", "fresh graduate",
-        "sans expérience", "pas d'expérience", "no experience",
-        "débutant en", "débuter en", "je débute",
-        "en dernière année", "dernière année de",
-        "en formation", "currently studying",
-        "stage de fin d'études", "internship"
-    ]
-
-    for indicator in strong_beginner_indicators:
-        if indicator in text_lower:
-            print(f"[detect_experience] Strong beginner indicator found: '{indicator}' -> 0 ans")
-            return 0
+    indicator = hits.first_of(STRONG_BEGINNER_INDICATORS)
+    if indicator:
+        print(f"[detect_experience] Strong beginner indicator found: '{indicator}' -> 0 ans")
+        return 0
 
     # ============================================================
     # PRIORITY 2: Look for EXPLICIT "X ans d'expérience" patterns
     # ============================================================
-    years_patterns = [
-        r'(\d+)\s*(?:ans?|years?)\s*(?:d\'?expérience|d\'experience|experience|of experience)',
-        r'(?:expérience|experience)\s*(?:de\s*)?(\d+)\s*(?:ans?|years?)',
-        r'(\d+)\+?\s*(?:ans?|years?)\s+(?:en tant que|as a|comme)',
-    ]
-
     explicit_years = 0
-    for pattern in years_patterns:
-        matches = re.findall(pattern, text_lower)
-        for match in matches:
+    for pattern in YEARS_PATTERNS:
+        for _, _, (match,) in hits.matches(pattern):
             try:
                 years = int(match)
                 if 0 < years < 40:
@@ -484,25 +737,12 @@ def detect_experience_years(text: str) -> int:
     # ============================================================
     # PRIORITY 3: Check for weaker student indicators
     # ============================================================
-    weak_student_indicators = [
-        "stage", "stagiaire", "intern",
-        "licence", "master", "bachelor", "bts", "dut",
-        "alternance", "apprenti",
-    ]
-
-    is_likely_student = any(ind in text_lower for ind in weak_student_indicators)
+    is_likely_student = hits.first_of(WEAK_STUDENT_INDICATORS) is not None
 
     # If student indicators found and no explicit years mentioned, return 0
     if is_likely_student:
         # Check if there's a REAL job title (not internship)
-        real_job_patterns = [
-            r"\b(?:cdi|cdd)\b",
-            r"\bcontrat\s+(?:permanent|indéterminé)",
-            r"\bfull[\s-]?time\s+(?:position|role)",
-            r"\bsenior\s+\w+",
-            r"\b(?:5|6|7|8|9|\d{2})\s*ans?\s*d'expérience",
-        ]
-        has_real_job = any(re.search(p, text_lower) for p in real_job_patterns)
+        has_real_job = any(hits.search(p) for p in REAL_JOB_PATTERNS)
 
         if not has_real_job:
             print(f"[detect_experience] Student indicators found, no real job -> 0 ans")
@@ -511,26 +751,13 @@ def detect_experience_years(text: str) -> int:
     # ============================================================
     # PRIORITY 4: Date range parsing (ONLY for non-students)
     # ============================================================
-    # Only real job titles, NOT certification names
-    job_titles = [
-        r"\bingénieur\s+(?:data|cloud|logiciel)",
-        r"\bdevelop(?:per|eur)\b",
-        r"\bdata\s+(?:engineer|analyst|scientist)\b",
-        r"\bcloud\s+engineer\b",
-        r"\bconsultant\s+(?:senior|data|cloud)",
-        r"\bchef\s+de\s+projet\b",
-        r"\btech\s+lead\b",
-        r"\bdevops\b",
-        r"\bsre\b",
-    ]
-
     date_pattern = r'(\d{4})\s*[-–]\s*((?:\d{4})|present|présent|aujourd\'?hui?|actuel)'
     total_years = 0
 
-    for job_pattern in job_titles:
-        match = re.search(job_pattern, text_lower)
+    for job_pattern in JOB_TITLE_PATTERNS:
+        match = hits.search(job_pattern)
         if match:
-            pos = match.start()
+            pos = match[0]
             # Look for date ranges within 150 chars
             context_start = max(0, pos - 150)
             context_end = min(len(text_lower), pos + 150)
@@ -558,12 +785,125 @@ def detect_experience_years(text: str) -> int:
     return total_years
 
 
+# Beginner indicators for the level hint (override experience years)
+BEGINNER_KEYWORDS = [
+    "étudiant", "student", "stagiaire", "stage", "intern",
+    "débutant", "beginner", "entry level", "junior",
+    "apprendre", "découvrir", "première expérience",
+    "jeune diplômé", "nouveau dans", "reconversion",
+    "cherche stage", "recherche stage", "en formation",
+    "dernière année", "première certification", "débuter"
+]
+
+# EXPLICIT senior job titles (NOT certification names)
+# "architect" alone is NOT a senior indicator (it's often a certification name like "Solutions Architect")
+SENIOR_PATTERNS = [
+    r"\bsenior\s+(?:engineer|developer|data|cloud)",
+    r"\blead\s+(?:engineer|developer|data|architect)",
+    r"\bprincipal\s+(?:engineer|architect)",
+    r"\bchef\s+de\s+projet",
+    r"\btech\s+lead\b",
+    r"\b(?:10|15|20)\s*ans?\s*d'expérience",
+    r"\bexpert\s+(?:en|cloud|data|aws|azure)",
+]
+
+
+# ================================
+# Keyword engine: every list above, one scan per text
+# ================================
+_keyword_engine = None
+_keyword_engine_lock = threading.Lock()
+
+
+def get_keyword_engine() -> KeywordEngine:
+    """
+    Engine compiled from the detector keyword lists and patterns plus the
+    certification mentions of the published catalog (built once per catalog
+    version under a lock: at warmup, then by the refresh listener below;
+    aliases only while no catalog is loaded).
+    """
+    catalog = current_catalog()
+    version = catalog.version if catalog.loaded else None
+    engine = _keyword_engine
+    if engine is None or engine.catalog_version != version:
+        with _keyword_engine_lock:
+            engine = _keyword_engine
+            if engine is None or engine.catalog_version != version:
+                engine = _build_keyword_engine(catalog, version)
+    return engine
+
+
+def _build_keyword_engine(catalog, version) -> KeywordEngine:
+    """Compile and publish the engine for a catalog (caller holds _keyword_engine_lock)."""
+    global _keyword_engine
+    cert_terms = certification_terms(catalog.certifications if catalog.loaded else [])
+    aliases = set()
+    for name, cert_id in KNOWN_CERTIFICATIONS:
+        aliases.add(name)
+        if cert_id not in cert_terms.setdefault(name, []):
+            cert_terms[name].append(cert_id)
+
+    keywords = (
+        TECH_SKILLS
+        + [kw for kws in DOMAIN_KEYWORDS.values() for kw in kws]
+        + list(cert_terms)
+        + STRONG_BEGINNER_INDICATORS + WEAK_STUDENT_INDICATORS + BEGINNER_KEYWORDS
+    )
+    patterns = (
+        [p for ps in STRONG_CONTEXT_PATTERNS.values() for p in ps]
+        + YEARS_PATTERNS + REAL_JOB_PATTERNS + JOB_TITLE_PATTERNS + SENIOR_PATTERNS
+        + HELD_CUE_PATTERNS
+    )
+    engine = KeywordEngine(keywords, patterns)
+    engine.catalog_version = version
+    engine.certification_terms = cert_terms
+    engine.certification_aliases = aliases
+    _keyword_engine = engine
+    return engine
+
+
+def _rebuild_keyword_engine(snapshot=None):
+    """Refresh listener: compile the engine for the new catalog before requests ask for it."""
+    get_keyword_engine()
+
+
+add_refresh_listener(_rebuild_keyword_engine)
+
+
+def scan_keywords(text: str) -> KeywordHits:
+    """Keyword and pattern hits of the lowercased text (positions refer to text.lower())."""
+    return get_keyword_engine().scan(text.lower())
+
+
 # ================================
 # Main extraction function
 # ================================
-def extract_skill_vector(text: str, use_llm: bool = True) -> dict:
+# Skill extraction engines:
+#   llm       : Groq call (cached), keyword fallback
+#   embedding : local n-gram candidates matched by embedding, keyword fallback
+#   keyword   : TECH_SKILLS list only
+#   hybrid    : LLM skills + embedding matches merged, keyword fallback
+EXTRACTION_MODES = ("llm", "embedding", "keyword", "hybrid")
+
+
+def extraction_mode(use_llm) -> str:
+    """Mode from the use_llm argument: True -> "llm", False -> "keyword", or a mode name."""
+    if use_llm is True:
+        return "llm"
+    if use_llm is False or use_llm is None:
+        return "keyword"
+    mode = str(use_llm).lower()
+    if mode not in EXTRACTION_MODES:
+        print(f"[skill_extractor] Warning: unknown extraction mode '{use_llm}', using keyword")
+        return "keyword"
+    return mode
+
+
+def extract_skill_vector(text: str, use_llm: bool | str = True) -> dict:
     """
     Convert user text/CV into a skill vector.
+    `use_llm` selects the extraction engine: True / "llm", "embedding",
+    False / "keyword" or "hybrid" (see EXTRACTION_MODES).
 
     Returns:
         {
@@ -587,44 +927,48 @@ def extract_skill_vector(text: str, use_llm: bool = True) -> dict:
     if not text or not text.strip():
         return result
 
+    # One scan of the text feeds every keyword detector below
+    hits = scan_keywords(text)
+
     # Detect certifications already held
-    result["held_certifications"] = detect_held_certifications(text)
+    result["held_certifications"] = detect_held_certifications(text, hits)
 
     # Detect years of experience
-    result["experience_years"] = detect_experience_years(text)
-
-    # 1. Extract skills using LLM (with keyword fallback)
-    extracted = []
-    if use_llm:
-        extracted = extract_skills_with_llm(text)
-
-    # Fallback to keyword extraction if LLM fails or returns empty
+    result["experience_years"] = detect_experience_years(text, hits)
+
+    # 1. Extract skills (LLM and/or embedding matches, keyword fallback)
+    mode = extraction_mode(use_llm)
+    extracted, skill_vector, confidences = [], {}, None
+    if mode in ("llm", "hybrid"):
+        confidences = extract_skills_with_llm_scored(text)
+        extracted = list(confidences)
+    to_map = list(extracted)  # embedding matches are canonical already
+    if mode in ("embedding", "hybrid"):
+        embedded, skill_vector = extract_skills_with_embeddings(text)
+        seen = {skill.lower() for skill in extracted}
+        extracted = extracted + [skill for skill in embedded if skill.lower() not in seen]
+
+    # Fallback to keyword extraction if the engines fail or return empty
     if not extracted:
-        extracted = extract_skills_from_text(text)
+        extracted = to_map = extract_skills_from_text(text, hits)
 
     result["extracted_skills"] = extracted
 
-    # 2. Map to canonical skills
-    if extracted:
-        result["skill_vector"] = map_to_canonical_skills(extracted)
+    # 2. Map to canonical skills (keeping the best score per canonical skill)
+    if to_map:
+        for canonical, score in map_to_canonical_skills(to_map, weights=confidences).items():
+            if score > skill_vector.get(canonical, 0.0):
+                skill_vector[canonical] = score
+    result["skill_vector"] = skill_vector
 
     # 3. Detect domains from keywords
-    result["domains"] = extract_keywords(text)
+    result["domains"] = extract_keywords(text, hits)
 
     # 4. Detect experience level - use the experience_years already calculated
     experience_years = result["experience_years"]
-    text_lower = text.lower()
 
     # Check for beginner indicators FIRST (highest priority)
-    beginner_keywords = [
-        "étudiant", "student", "stagiaire", "stage", "intern",
-        "débutant", "beginner", "entry level", "junior",
-        "apprendre", "découvrir", "première expérience",
-        "jeune diplômé", "nouveau dans", "reconversion",
-        "cherche stage", "recherche stage", "en formation",
-        "dernière année", "première certification", "débuter"
-    ]
-    is_beginner = any(kw in text_lower for kw in beginner_keywords)
+    is_beginner = hits.first_of(BEGINNER_KEYWORDS) is not None
 
     # Set level based on experience years
     if is_beginner:
@@ -639,23 +983,11 @@ def extract_skill_vector(text: str, use_llm: bool = True) -> dict:
         # 0-1 years = débutant
         result["level_hint"] = "débutant"
 
-    # Override only for EXPLICIT senior job titles (NOT certification names)
-    # "architect" alone is NOT a senior indicator (it's often a certification name like "Solutions Architect")
-    senior_patterns = [
-        r"\bsenior\s+(?:engineer|developer|data|cloud)",
-        r"\blead\s+(?:engineer|developer|data|architect)",
-        r"\bprincipal\s+(?:engineer|architect)",
-        r"\bchef\s+de\s+projet",
-        r"\btech\s+lead\b",
-        r"\b(?:10|15|20)\s*ans?\s*d'expérience",
-        r"\bexpert\s+(?:en|cloud|data|aws|azure)",
-    ]
-
+    # Override only for EXPLICIT senior job titles (SENIOR_PATTERNS)
     # Only override to avancé if NOT a beginner and has senior patterns
     if not is_beginner:
-        import re
-        for pattern in senior_patterns:
-            if re.search(pattern, text_lower):
+        for pattern in SENIOR_PATTERNS:
+            if hits.search(pattern):
                 result["level_hint"] = "avancé"
                 print(f"[skill_extractor] Senior pattern '{pattern}' detected -> niveau: avancé")
                 break
@@ -0,0 +1,201 @@
+# ================================
+# SKILL INDEX
+# In-memory inverted index: skill -> certifications
+# ================================
+#
+# Replaces the Cypher double loop of query_certifications_by_skills
+# (every user skill x every cert skill x every certification, with a
+# bidirectional CONTAINS). Semantics are kept exactly:
+#   user skill u matches cert skill v  <=>  lower(v) CONTAINS lower(u)
+#                                        OR lower(u) CONTAINS lower(v)
+# - "v contains u": trigram postings narrow the vocabulary, then `u in v`
+# - "u contains v": every substring of u is looked up in the vocabulary
+# Both are resolved once per distinct user skill (memoized), then turned
+# into certification rows through the postings lists.
+
+import math
+
+import numpy as np
+
+from app.services.lru_cache import LRUCache
+from app.services.filter_index import FilterIndex
+
+# Catalog fields returned with each match (same as the Cypher RETURN clause)
+RESULT_FIELDS = ["id", "titre", "domaine", "niveau", "objectif", "duree", "prix", "url", "langues", "temps_par_semaine"]
+
+
+def cert_skill_list(competences) -> list[str]:
+    """Competences as the Cypher query sees them: list items or ', '-split string, trimmed."""
+    if competences is None:
+        return []
+    if isinstance(competences, (list, tuple)):
+        return [str(s).strip() for s in competences]
+    return [s.strip() for s in str(competences).split(", ")]
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _cypher_round(value: float) -> float:
+    """round(x * 100) / 100 as Cypher does it (half up, not banker's rounding)."""
+    return math.floor(value * 100 + 0.5) / 100
+
+
+class SkillIndex:
+    """Skill -> certification postings built from the catalog cache."""
+
+    def __init__(self, certifications: list[dict]):
+        self.certifications = certifications
+        self.cert_skills = [cert_skill_list(c.get("competences")) for c in certifications]
+        self.total_skills = np.array([len(skills) for skills in self.cert_skills], dtype=np.int64)
+
+        # Vocabulary of lowercase cert skills and their postings (certification rows)
+        self.vocab = {}
+        postings = []
+        for row, skills in enumerate(self.cert_skills):
+            for skill in skills:
+                key = skill.lower()
+                vid = self.vocab.get(key)
+                if vid is None:
+                    vid = len(postings)
+                    self.vocab[key] = vid
+                    postings.append(set())
+                postings[vid].add(row)
+        self.vocab_terms = list(self.vocab.keys())
+        self.postings = [np.array(sorted(rows), dtype=np.int64) for rows in postings]
+
+        self.trigram_index = {}
+        for term, vid in self.vocab.items():
+            for tri in _trigrams(term):
+                self.trigram_index.setdefault(tri, set()).add(vid)
+
+        # Precomputed filter masks (domaine, niveau, price buckets, langues)
+        self.ids = [c.get("id") for c in certifications]
+        self.filters = FilterIndex(certifications)
+        self.prices = self.filters.prices
+
+        self._matches = LRUCache(maxsize=4096, name="skill_index_matches")
+
+    # ------------------------------------------------------------
+    # Skill -> certification rows
+    # ------------------------------------------------------------
+    def _matching_vocab(self, user_skill: str) -> set[int]:
+        u = user_skill.lower()
+        matched = set()
+
+        # v CONTAINS u
+        if len(u) >= 3:
+            tris = _trigrams(u)
+            candidates = None
+            for tri in tris:
+                vids = self.trigram_index.get(tri)
+                if not vids:
+                    candidates = set()
+                    break
+                candidates = set(vids) if candidates is None else candidates & vids
+            for vid in candidates or ():
+                if u in self.vocab_terms[vid]:
+                    matched.add(vid)
+        else:
+            # 0-2 characters: too short for trigrams, scan the vocabulary
+            matched.update(vid for vid, term in enumerate(self.vocab_terms) if u in term)
+
+        # u CONTAINS v: every substring of u (including "") that is a vocabulary term
+        for start in range(len(u) + 1):
+            for end in range(start, len(u) + 1):
+                vid = self.vocab.get(u[start:end])
+                if vid is not None:
+                    matched.add(vid)
+
+        return matched
+
+    def rows_for_skill(self, user_skill: str) -> np.ndarray:
+        """Certification rows having at least one cert skill matching `user_skill`."""
+        rows = self._matches.get(user_skill.lower())
+        if rows is None:
+            vids = self._matching_vocab(user_skill)
+            if vids:
+                rows = np.unique(np.concatenate([self.postings[vid] for vid in vids]))
+            else:
+                rows = np.zeros(0, dtype=np.int64)
+            self._matches.put(user_skill.lower(), rows)
+        return rows
+
+    # ------------------------------------------------------------
+    # Filters
+    # ------------------------------------------------------------
+    def filter_mask(self, domains=None, level=None, budget=None, candidate_ids=None,
+                    languages=None, exclude_ids=None) -> np.ndarray:
+        """Boolean mask with the same null semantics as the Cypher WHERE clause."""
+        return self.filters.mask(domains, level, budget, languages, candidate_ids, exclude_ids)
+
+    # ------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------
+    def query(
+        self,
+        skill_vector: dict[str, float],
+        domains: list[str] = None,
+        level: str = None,
+        budget: float = None,
+        limit: int = 100,
+        candidate_ids: list[str] = None,
+        allow_no_match: bool = None,
+        languages: list[str] = None,
+        exclude_ids: list[str] = None
+    ) -> list[dict]:
+        """
+        Same rows, fields and ordering as the Cypher skill-matching query.
+        `allow_no_match` keeps certifications without any matching skill
+        (default: only when fewer than 2 skills are given, like the Cypher query).
+        """
+        user_skills = list(skill_vector.keys())
+        if allow_no_match is None:
+            allow_no_match = len(user_skills) < 2
+
+        n = len(self.certifications)
+        if n == 0:
+            return []
+
+        # Filters first: a combination nothing passes returns before any skill matching
+        mask = self.filter_mask(domains, level, budget, candidate_ids, languages, exclude_ids)
+        if not mask.any():
+            return []
+
+        # Sparse incidence (user skill x certification) summed over user skills
+        skill_rows = [self.rows_for_skill(skill) for skill in user_skills]
+        match_count = np.zeros(n, dtype=np.int64)
+        for rows in skill_rows:
+            match_count[rows] += 1
+
+        if not allow_no_match:
+            mask &= match_count > 0
+
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0:
+            return []
+
+        # Relevance only for the rows passing the filters
+        counts = match_count[rows]
+        relevance = np.minimum(counts / np.maximum(self.total_skills[rows], 1) * 100.0, 100.0)
+
+        # ORDER BY relevance_score DESC, match_count DESC, prix ASC (nulls last)
+        rounded = np.array([_cypher_round(x) for x in relevance])
+        prices = np.where(np.isnan(self.prices[rows]), np.inf, self.prices[rows])
+        order = np.lexsort((prices, -match_count[rows], -rounded))[:limit]
+
+        skill_sets = [set(r.tolist()) for r in skill_rows]
+        results = []
+        for i in order:
+            row = int(rows[i])
+            cert = self.certifications[row]
+            result = {field: cert.get(field) for field in RESULT_FIELDS}
+            result["competences"] = self.cert_skills[row]
+            result["matched_skills"] = [u for u, s in zip(user_skills, skill_sets) if row in s]
+            result["skill_matches"] = int(match_count[row])
+            result["total_skills"] = int(self.total_skills[row])
+            result["relevance_score"] = float(rounded[i])
+            results.append(result)
+
+        return results
@@ -0,0 +1,149 @@
+# ================================
+# VECTOR INDEX
+# In-process approximate nearest neighbours over normalized float32 vectors
+# ================================
+#
+# IVF (inverted file) index: vectors are clustered with spherical k-means,
+# a query only scans the `nprobe` clusters closest to it. Small catalogs
+# (below exact_threshold) are scanned exhaustively - one matrix product is
+# already sub-millisecond there and recall stays at 1.0.
+
+import time
+
+import numpy as np
+
+
+class VectorIndex:
+    """Top-k cosine search over a fixed set of (id, vector) rows."""
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        ids: list[str],
+        n_lists: int = None,
+        nprobe: int = 8,
+        exact_threshold: int = 2000,
+        kmeans_iterations: int = 10,
+        centroids: np.ndarray = None
+    ):
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.ids = list(ids)
+        self.nprobe = nprobe
+        self.exact = len(self.ids) <= exact_threshold
+
+        self.centroids = None
+        self.lists = []
+
+        if not self.exact:
+            if centroids is not None:
+                # Catalog delta: reuse the trained centroids, only re-assign rows
+                self._assign(np.asarray(centroids, dtype=np.float32))
+            else:
+                n_lists = n_lists or max(1, int(np.sqrt(len(self.ids))))
+                self._train(n_lists, kmeans_iterations)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _train(self, n_lists: int, iterations: int):
+        """Spherical k-means, then the posting lists."""
+        rng = np.random.default_rng(0)
+        data = self.embeddings
+        centroids = data[rng.choice(len(data), size=n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignment = (data @ centroids.T).argmax(axis=1)
+            for c in range(n_lists):
+                members = data[assignment == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+
+        self._assign(centroids)
+
+    def _assign(self, centroids: np.ndarray):
+        """One posting list (row indices) per centroid."""
+        assignment = (self.embeddings @ centroids.T).argmax(axis=1)
+        self.centroids = centroids
+        self.lists = [np.flatnonzero(assignment == c) for c in range(len(centroids))]
+
+    def _candidate_rows(self, query: np.ndarray) -> np.ndarray:
+        if self.exact:
+            return np.arange(len(self.ids))
+        nprobe = min(self.nprobe, len(self.lists))
+        closest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([self.lists[c] for c in closest])
+
+    def search(self, query: np.ndarray, k: int, exact: bool = False) -> tuple[list[str], np.ndarray]:
+        """
+        Return the ids and cosine scores of the k nearest rows, best first.
+        `exact=True` forces a full scan (used as ground truth for recall).
+        """
+        if not self.ids or k <= 0:
+            return [], np.zeros(0, dtype=np.float32)
+
+        rows = np.arange(len(self.ids)) if exact else self._candidate_rows(query)
+        scores = self.embeddings[rows] @ query
+
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [self.ids[rows[i]] for i in top], scores[top]
+
+    def evaluate(self, queries: np.ndarray, k: int = 10) -> dict:
+        """
+        recall@k against exhaustive search, with latency per query.
+
+        Returns:
+            {"recall_at_k": 0.97, "k": 10, "mode": "ivf", "size": 50000,
+             "avg_latency_ms": 0.8, "p95_latency_ms": 1.3, "exact_avg_latency_ms": 9.5}
+        """
+        recalls, latencies, exact_latencies = [], [], []
+
+        for query in queries:
+            start = time.perf_counter()
+            approx_ids, _ = self.search(query, k)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            exact_ids, _ = self.search(query, k, exact=True)
+            exact_latencies.append((time.perf_counter() - start) * 1000)
+
+            if exact_ids:
+                recalls.append(len(set(approx_ids) & set(exact_ids)) / len(exact_ids))
+
+        return {
+            "recall_at_k": round(float(np.mean(recalls)), 4) if recalls else 1.0,
+            "k": k,
+            "mode": "exact" if self.exact else "ivf",
+            "size": len(self.ids),
+            "avg_latency_ms": round(float(np.mean(latencies)), 3) if latencies else 0.0,
+            "p95_latency_ms": round(float(np.percentile(latencies, 95)), 3) if latencies else 0.0,
+            "exact_avg_latency_ms": round(float(np.mean(exact_latencies)), 3) if exact_latencies else 0.0
+        }
+
+
+# ============================================================
+# CLI RUNNER - synthetic benchmark at catalog scale
+# ============================================================
+
+if __name__ == "__main__":
+    import sys
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    dim = 768
+
+    rng = np.random.default_rng(42)
+    # Clustered data looks more like real embeddings than uniform noise
+    centers = rng.normal(size=(200, dim))
+    data = centers[rng.integers(0, 200, size)] + 0.5 * rng.normal(size=(size, dim))
+    data = (data / np.linalg.norm(data, axis=1, keepdims=True)).astype(np.float32)
+
+    start = time.perf_counter()
+    index = VectorIndex(data, [f"cert-{i}" for i in range(size)])
+    print(f"Built index on {size} vectors in {time.perf_counter() - start:.2f}s")
+
+    queries = data[rng.choice(size, 100, replace=False)] + 0.1 * rng.normal(size=(100, dim)).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    print(index.evaluate(queries, k=10))
@@ -0,0 +1,152 @@
+# ================================
+# WARMUP SERVICE
+# Loads models and catalog caches in the background after startup
+# ================================
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import WARMUP_RETRY_MAX_SECONDS, WARMUP_RETRY_SECONDS
+
+
+def _load_encoder():
+    from app.services.model_registry import get_encoder
+    get_encoder()
+
+
+def _load_reranker():
+    from app.services.model_registry import get_reranker
+    get_reranker()
+
+
+def _load_catalog():
+    from app.services.catalog import get_catalog
+    from app.services.skill_extractor import get_keyword_engine
+    get_catalog()
+    get_keyword_engine()  # certification mentions of this catalog; refreshes rebuild it via a listener
+
+
+def _prepare_retrieval():
+    # Waits for the catalog load (catalog lock), then e.g. creates and fills the Neo4j vector index
+    from app.services.retrieval_backend import start_retrieval_backend
+    start_retrieval_backend()
+
+
+def _encoder_loaded() -> bool:
+    from app.services.model_registry import is_loaded
+    return is_loaded("encoder")
+
+
+def _reranker_loaded() -> bool:
+    from app.services.model_registry import is_loaded
+    return is_loaded("reranker")
+
+
+def _catalog_loaded() -> bool:
+    from app.services.catalog import current_catalog
+    return current_catalog().loaded
+
+
+def _retrieval_prepared() -> bool:
+    from app.services.catalog import current_catalog
+    from app.services.retrieval_backend import get_retrieval_backend
+    return get_retrieval_backend().prepared(current_catalog())
+
+
+# Tasks run in parallel; the catalog loader waits on the shared encoder
+# through the registry lock instead of loading its own copy.
+# name -> (loader, probe telling whether it is loaded, e.g. lazily by a request)
+WARMUP_TASKS = {
+    "encoder": (_load_encoder, _encoder_loaded),
+    "reranker": (_load_reranker, _reranker_loaded),
+    "catalog": (_load_catalog, _catalog_loaded),  # certifications, skill vocabulary, embeddings and indexes
+    "retrieval": (_prepare_retrieval, _retrieval_prepared),  # RETRIEVAL_BACKEND state (Neo4j vector index)
+}
+
+_state = {
+    "started_at": None,
+    "finished_at": None,
+    "tasks": {
+        name: {"status": "pending", "seconds": None, "error": None, "attempts": 0}
+        for name in WARMUP_TASKS
+    }
+}
+_thread = None
+
+
+def _run_task(name: str, task, loaded):
+    """Run a task until it succeeds, retrying with exponential backoff (Neo4j / model hub hiccups at boot)."""
+    info = _state["tasks"][name]
+    start = time.time()
+    delay = WARMUP_RETRY_SECONDS
+    while True:
+        info["status"] = "running"
+        info["attempts"] += 1
+        try:
+            task()
+            info["status"] = "done"
+            info["error"] = None
+            print(f"[warmup] {name} ready in {time.time() - start:.2f}s")
+            break
+        except Exception as e:
+            info["error"] = str(e)
+            if loaded():
+                # Loaded meanwhile by a request
+                info["status"] = "done"
+                break
+            info["status"] = "retrying"
+            print(f"[warmup] Warning: {name} failed (attempt {info['attempts']}): {e} - retrying in {delay:.0f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+    info["seconds"] = round(time.time() - start, 2)
+
+
+def _run_all():
+    with ThreadPoolExecutor(max_workers=len(WARMUP_TASKS), thread_name_prefix="warmup") as pool:
+        for name, (task, loaded) in WARMUP_TASKS.items():
+            pool.submit(_run_task, name, task, loaded)
+    _state["finished_at"] = time.time()
+    print(f"[warmup] Finished in {_state['finished_at'] - _state['started_at']:.2f}s")
+
+
+def start_warmup():
+    """Start loading models and caches in a daemon thread (idempotent)."""
+    global _thread
+    if _thread is not None:
+        return
+    _state["started_at"] = time.time()
+    _thread = threading.Thread(target=_run_all, name="warmup", daemon=True)
+    _thread.start()
+
+
+def get_warmup_status() -> dict:
+    """
+    Warmup progress for the readiness probe.
+
+    Returns:
+        {
+            "ready": False,
+            "progress": "2/4",
+            "elapsed_seconds": 3.4,
+            "tasks": {"encoder": {"status": "done", "seconds": 3.1, "error": None, "attempts": 1}, ...}
+        }
+    """
+    tasks = {name: dict(info) for name, info in _state["tasks"].items()}
+    for name, info in tasks.items():
+        # Readiness follows what is actually loaded, not only the warmup thread
+        if info["status"] != "done" and WARMUP_TASKS[name][1]():
+            info["status"] = "done"
+    done = sum(1 for info in tasks.values() if info["status"] == "done")
+
+    elapsed = None
+    if _state["started_at"] is not None:
+        end = _state["finished_at"] or time.time()
+        elapsed = round(end - _state["started_at"], 2)
+
+    return {
+        "ready": done == len(tasks),
+        "progress": f"{done}/{len(tasks)}",
+        "elapsed_seconds": elapsed,
+        "tasks": tasks
+    }
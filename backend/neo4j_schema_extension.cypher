@@ -38,7 +38,14 @@ SET d.description = 'Artificial Intelligence & Machine Learning',
 CREATE CONSTRAINT skill_name_unique IF NOT EXISTS
 FOR (s:Skill) REQUIRE s.name IS UNIQUE;
 
-// Extract skills from certifications (handles both array and string formats)
+// Indexes on the lowercase name (IN seeks + CONTAINS seeks for skill matching)
+CREATE INDEX skill_name_lower_index IF NOT EXISTS
+FOR (s:Skill) ON (s.name_lower);
+
+CREATE TEXT INDEX skill_name_lower_text IF NOT EXISTS
+FOR (s:Skill) ON (s.name_lower);
+
+// Normalize competences once (handles both array and string formats)
 MATCH (c:Certification)
 WHERE c.competences IS NOT NULL
 WITH c,
@@ -46,28 +53,33 @@ WITH c,
          WHEN c.competences IS :: LIST<ANY> THEN c.competences
          ELSE split(toString(c.competences), ', ')
      END AS skills_list
-UNWIND skills_list AS skill_name
-WITH trim(toString(skill_name)) AS clean_skill
-WHERE clean_skill <> '' AND size(clean_skill) > 1
+WITH c, [s IN skills_list WHERE trim(toString(s)) <> '' | trim(toString(s))] AS clean_list
+SET c.competences_list = clean_list,
+    c.competences_count = size(clean_list),
+    c.competences_normalized_at = datetime();
+
+// Extract skills from the normalized lists
+MATCH (c:Certification)
+WHERE c.competences_list IS NOT NULL
+UNWIND c.competences_list AS clean_skill
 MERGE (s:Skill {name: clean_skill})
-ON CREATE SET s.created_at = datetime();
+ON CREATE SET s.created_at = datetime()
+SET s.name_lower = toLower(clean_skill);
 
 
 // ============================================================
 // PART 3: LINK CERTIFICATIONS TO SKILLS (TEACHES)
 // ============================================================
 
+// Drop TEACHES relationships of skills no longer in the competences
+MATCH (c:Certification)-[r:TEACHES]->(s:Skill)
+WHERE c.competences_list IS NULL OR NOT s.name IN c.competences_list
+DELETE r;
+
 // Create TEACHES relationships between Certification and Skill
 MATCH (c:Certification)
-WHERE c.competences IS NOT NULL
-WITH c,
-     CASE
-         WHEN c.competences IS :: LIST<ANY> THEN c.competences
-         ELSE split(toString(c.competences), ', ')
-     END AS skills_list
-UNWIND skills_list AS skill_name
-WITH c, trim(toString(skill_name)) AS clean_skill
-WHERE clean_skill <> '' AND size(clean_skill) > 1
+WHERE c.competences_list IS NOT NULL
+UNWIND c.competences_list AS clean_skill
 MATCH (s:Skill {name: clean_skill})
 MERGE (c)-[r:TEACHES]->(s)
 ON CREATE SET r.created_at = datetime();
@@ -0,0 +1,8 @@
+# Unit tests: no Neo4j, no model download. Run from backend/: python -m pytest -q
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the LLM cache off disk during tests
+os.environ.setdefault("LLM_CACHE_PATH", "")
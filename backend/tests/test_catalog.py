@@ -0,0 +1,37 @@
+import numpy as np
+
+from app.services import catalog
+
+
+def _snapshot_with(certifications, watermark):
+    return catalog.CatalogSnapshot(
+        version=1,
+        certifications=certifications,
+        texts=[catalog.build_certification_text(c) for c in certifications],
+        watermark=watermark
+    )
+
+
+def test_delta_refresh_rereads_a_window_behind_the_watermark(monkeypatch):
+    cert = {"id": "a", "titre": "A", "competences": ["Python"], "domaine": "Data", "niveau": "Débutant"}
+    monkeypatch.setattr(catalog, "_snapshot", _snapshot_with([cert], watermark=1_000_000))
+    monkeypatch.setattr(catalog, "execute_query", lambda query, params=None: [{"id": "a"}])
+
+    seen = {}
+
+    def fetch(where="", params=None):
+        seen.update(params)
+        # A write stamped before the watermark that committed after the last read
+        late = dict(cert, titre="A (updated)")
+        return [late], 999_000
+
+    monkeypatch.setattr(catalog, "_fetch_certifications", fetch)
+    monkeypatch.setattr(catalog, "encode_with_store", lambda texts: np.ones((len(texts), 4), dtype=np.float32) / 2)
+    monkeypatch.setattr(catalog, "CATALOG_REFRESH_LAG_SECONDS", 300)
+
+    result = catalog._refresh_delta()
+
+    assert seen["since"] == 1_000_000 - 300_000
+    assert result == {"changed": 1, "removed": 0}
+    assert catalog._snapshot.certifications[0]["titre"] == "A (updated)"
+    assert catalog._snapshot.watermark == 1_000_000
@@ -0,0 +1,32 @@
+import json
+import os
+
+import pytest
+
+from app.services import skill_extractor
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "embedding_skills.json")
+
+with open(FIXTURE, encoding="utf-8") as f:
+    DATA = json.load(f)
+
+
+@pytest.fixture(scope="module")
+def skill_embeddings():
+    # Real encoder only: a stub says nothing about EMBEDDING_SKILL_THRESHOLD
+    pytest.importorskip("sentence_transformers")
+    from app.services.embedding_cache import encode_cached
+    try:
+        return encode_cached(DATA["skills"])
+    except Exception as e:
+        pytest.skip(f"encoder unavailable: {e}")
+
+
+@pytest.mark.parametrize("case", DATA["cases"], ids=lambda case: case["text"][:30])
+def test_embedding_extraction_threshold_on_labelled_texts(case, skill_embeddings, monkeypatch):
+    monkeypatch.setattr(skill_extractor, "load_canonical_skills", lambda: (DATA["skills"], skill_embeddings))
+
+    _, skill_vector = skill_extractor.extract_skills_with_embeddings(case["text"])
+
+    assert set(case["expected"]) <= set(skill_vector), skill_vector
+    assert not set(case["forbidden"]) & set(skill_vector), skill_vector
@@ -0,0 +1,116 @@
+import hashlib
+import multiprocessing
+import threading
+
+import numpy as np
+import pytest
+
+from app.services import embedding_store
+
+DIM = 8
+
+
+class _HashEncoder:
+    """Deterministic vectors derived from the text itself."""
+
+    def encode(self, texts, **kwargs):
+        rows = [np.frombuffer(hashlib.sha256(t.encode()).digest()[:DIM * 4], dtype=np.uint32) for t in texts]
+        vectors = np.stack(rows).astype(np.float64)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _expected(texts):
+    return _HashEncoder().encode(texts).astype(np.float32)
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_store, "EMBEDDING_STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(embedding_store, "get_encoder", lambda name: _HashEncoder())
+    monkeypatch.setattr(embedding_store, "_stores", {})
+    return tmp_path
+
+
+def _worker(store_path, prefix, rounds):
+    embedding_store.EMBEDDING_STORE_DIR = store_path
+    embedding_store.get_encoder = lambda name: _HashEncoder()
+    embedding_store._stores = {}
+    for r in range(rounds):
+        # Overlapping text sets between processes, plus rows of their own
+        texts = [f"shared {r} {i}" for i in range(5)] + [f"{prefix} {r} {i}" for i in range(7)]
+        embedding_store.encode_with_store(texts, "test-model")
+
+
+def test_rows_stay_with_their_hash_across_processes(store_dir):
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_worker, args=(str(store_dir), f"p{n}", 20)) for n in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+        assert w.exitcode == 0
+
+    store = embedding_store._open_store("test-model")
+    texts = [f"shared {r} {i}" for r in range(20) for i in range(5)]
+    texts += [f"p{n} {r} {i}" for n in range(4) for r in range(20) for i in range(7)]
+    assert len(store["rows"]) == len(texts) == store["count"]  # no row appended twice
+
+    vectors = np.asarray(store["records"]["vector"][[store["rows"][embedding_store.text_hash(t)] for t in texts]])
+    np.testing.assert_allclose(vectors, _expected(texts), rtol=1e-6)
+
+
+def test_appends_in_place_and_compacts(store_dir):
+    first = embedding_store.encode_with_store(["a", "b", "c"], "test-model")
+    path, _ = embedding_store._paths("test-model")
+    size = (store_dir / path.split("/")[-1]).stat().st_size
+
+    embedding_store.encode_with_store(["c", "d"], "test-model")
+    record = embedding_store._record_dtype(DIM).itemsize
+    assert (store_dir / path.split("/")[-1]).stat().st_size == size + record  # only "d" appended
+
+    assert embedding_store.compact_store(["a", "d"], "test-model") == 2
+    np.testing.assert_allclose(embedding_store.encode_with_store(["a", "d"], "test-model"), _expected(["a", "d"]), rtol=1e-6)
+    np.testing.assert_allclose(first, _expected(["a", "b", "c"]), rtol=1e-6)
+    assert len(embedding_store._open_store("test-model")["rows"]) == 2
+
+
+def test_partial_record_is_ignored(store_dir):
+    embedding_store.encode_with_store(["a", "b"], "test-model")
+    path, _ = embedding_store._paths("test-model")
+    with open(path, "ab") as f:
+        f.write(b"\x01" * 10)  # crash mid-append
+
+    embedding_store._stores.clear()
+    vectors = embedding_store.encode_with_store(["a", "b", "c"], "test-model")
+    np.testing.assert_allclose(vectors, _expected(["a", "b", "c"]), rtol=1e-6)
+    embedding_store._stores.clear()
+    assert embedding_store._open_store("test-model")["count"] == 3
+
+
+def test_lookups_do_not_wait_for_the_model(store_dir, monkeypatch):
+    embedding_store.encode_with_store(["a", "b"], "test-model")
+    encoding = threading.Event()
+    release = threading.Event()
+
+    class _SlowEncoder(_HashEncoder):
+        def encode(self, texts, **kwargs):
+            encoding.set()
+            release.wait(5)
+            return super().encode(texts, **kwargs)
+
+    monkeypatch.setattr(embedding_store, "get_encoder", lambda name: _SlowEncoder())
+    slow = threading.Thread(target=embedding_store.encode_with_store, args=(["new catalog text"], "test-model"))
+    slow.start()
+    assert encoding.wait(5)
+
+    # Known texts are served while the other thread is still encoding
+    lookup = threading.Thread(target=embedding_store.encode_with_store, args=(["a", "b"], "test-model"))
+    lookup.start()
+    lookup.join(2)
+    blocked = lookup.is_alive()
+    release.set()
+    slow.join(5)
+    lookup.join(5)
+
+    assert not blocked
+    assert len(embedding_store._open_store("test-model")["rows"]) == 3
@@ -0,0 +1,96 @@
+import numpy as np
+
+from app.services import graph_reasoning
+from app.services.catalog import CatalogSnapshot
+
+CERTS = [
+    {"id": "a", "titre": "Python Data", "niveau": "Débutant", "domaine": "Data", "competences": ["Python"],
+     "relevance_score": 80.0, "matched_skills": ["Python"]},
+    {"id": "b", "titre": "SQL Basics", "niveau": "Débutant", "domaine": "Data", "competences": ["SQL"],
+     "relevance_score": 40.0, "matched_skills": []},
+]
+
+
+class _Neo4jOnly:
+    name = "neo4j"
+
+    def available(self, catalog):
+        return True
+
+    def skill_search(self, skill_vector, domains=None, level=None, budget=None, limit=100,
+                     candidate_ids=None, languages=None, exclude_ids=None, catalog=None):
+        return [dict(cert) for cert in CERTS]
+
+
+def test_recommendations_fall_back_to_neo4j_when_the_catalog_cannot_load(monkeypatch):
+    calls = []
+
+    def get_catalog():
+        calls.append(1)
+        raise RuntimeError("embedding model unavailable")
+
+    monkeypatch.setattr(graph_reasoning, "get_catalog", get_catalog)
+    monkeypatch.setattr(graph_reasoning, "current_catalog", lambda: CatalogSnapshot(loaded=False))
+    monkeypatch.setattr(graph_reasoning, "get_retrieval_backend", lambda name=None: _Neo4jOnly())
+    monkeypatch.setattr(graph_reasoning, "extract_skill_vector", lambda text, use_llm=True: {
+        "skill_vector": {"Python": 1.0}, "domains": ["data"], "held_certifications": [], "experience_years": 0
+    })
+    monkeypatch.setattr(graph_reasoning, "encode_one", lambda text: np.ones(4, dtype=np.float32) / 2)
+    monkeypatch.setattr(graph_reasoning, "encode_cached", lambda texts: np.ones((len(texts), 4), dtype=np.float32) / 2)
+    monkeypatch.setattr(graph_reasoning, "batched_predict", lambda pairs: [float(len(pairs) - i) for i in range(len(pairs))])
+
+    for mode in ("graph", "vector", "hybrid"):
+        result = graph_reasoning.get_smart_recommendations("python data", top_k=2, retrieval_mode=mode)
+        assert [rec["id"] for rec in result["recommendations"]] == ["a", "b"]
+
+    # Tried once per request, never again behind the fallback
+    assert len(calls) == 3
+
+
+class _RecordingBackend(_Neo4jOnly):
+    def __init__(self):
+        self.calls = []
+
+    def lexical_search(self, query_text, k, catalog=None):
+        self.calls.append("lexical")
+        return ["b"], np.ones(1, dtype=np.float32)
+
+    def vector_search(self, query_vector, k, domains=None, level=None, budget=None,
+                      languages=None, exclude_ids=None, catalog=None):
+        self.calls.append("vector")
+        return ["a"], np.ones(1, dtype=np.float32)
+
+    def skill_search(self, skill_vector, domains=None, level=None, budget=None, limit=100,
+                     candidate_ids=None, allow_no_match=None, languages=None, exclude_ids=None, catalog=None):
+        self.calls.append(("skill", sorted(candidate_ids), allow_no_match))
+        return [dict(cert) for cert in CERTS if cert["id"] in candidate_ids]
+
+
+def test_hybrid_retrieval_goes_through_the_configured_backend(monkeypatch):
+    snapshot = CatalogSnapshot(
+        version=1,
+        certifications=[{k: v for k, v in cert.items() if k in ("id", "titre", "niveau", "domaine", "competences")}
+                        for cert in CERTS],
+        texts=["Python Data - Python", "SQL Basics - SQL"]
+    )
+    backend = _RecordingBackend()
+    monkeypatch.setattr(graph_reasoning, "get_retrieval_backend", lambda name=None: backend)
+    monkeypatch.setattr(graph_reasoning, "encode_one", lambda text: np.ones(4, dtype=np.float32) / 2)
+
+    results = graph_reasoning.query_certifications_hybrid("sql", {"SQL": 1.0}, limit=2, catalog=snapshot)
+
+    assert backend.calls == ["lexical", "vector", ("skill", ["a", "b"], True)]
+    assert {cert["id"] for cert in results} == {"a", "b"}
+    assert all("rrf_score" in cert for cert in results)
+
+
+def test_rerank_budget_only_counts_uncached_pairs(monkeypatch):
+    monkeypatch.setattr(graph_reasoning, "_rerank_cost", {"pair_ms": 10.0})
+    scores = [50.0 - i * 0.1 for i in range(10)]  # no decisive gap
+
+    # 30ms affords three model pairs, whatever the cache holds
+    assert graph_reasoning.plan_rerank(scores, 5, 30.0)["size"] == 3
+
+    cached = [True] * 6 + [False] * 4
+    plan = graph_reasoning.plan_rerank(scores, 5, 30.0, cached=cached)
+    assert plan["size"] == 9 and plan["cached_pairs"] == 6 and plan["estimated_ms"] == 30.0
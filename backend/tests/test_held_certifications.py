@@ -0,0 +1,60 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import skill_extractor
+from app.services.catalog import CatalogSnapshot
+
+CERTS = [
+    {"id": "aws-ml-specialty", "titre": "AWS Certified Machine Learning Specialty", "competences": ["Machine Learning"]},
+    {"id": "azure-architect", "titre": "Microsoft Azure Solutions Architect Expert (AZ-305)", "competences": ["Azure"]},
+    {"id": "aws-cloud-essentials", "titre": "Cloud Essentials (AWS)", "competences": ["Cloud"]},
+]
+
+
+@pytest.fixture(autouse=True)
+def catalog(monkeypatch):
+    snapshot = CatalogSnapshot(version=1, certifications=CERTS, texts=[c["titre"] for c in CERTS])
+    monkeypatch.setattr(skill_extractor, "current_catalog", lambda: snapshot)
+    monkeypatch.setattr(skill_extractor, "_keyword_engine", None)
+
+
+def test_cue_inside_the_title_does_not_count():
+    text = "Je veux préparer AWS Certified Machine Learning Specialty, quelle formation ?"
+    assert skill_extractor.detect_held_certifications(text) == []
+
+
+def test_cue_next_to_the_title_counts():
+    text = "J'ai obtenu AWS Certified Machine Learning Specialty l'an dernier."
+    assert skill_extractor.detect_held_certifications(text) == ["aws-ml-specialty"]
+
+
+def test_exam_codes_need_a_digit():
+    terms = skill_extractor.certification_terms(CERTS)
+    assert terms["az-305"] == ["azure-architect"]
+    assert "aws" not in terms
+    assert skill_extractor.detect_held_certifications("Certifié AWS (2022), je cherche une formation data") == []
+
+
+def test_keyword_engine_is_built_once_per_catalog_version(monkeypatch):
+    builds = []
+    build = skill_extractor._build_keyword_engine
+
+    def counting_build(catalog, version):
+        builds.append(version)
+        time.sleep(0.05)  # a slow compile: concurrent callers arrive meanwhile
+        return build(catalog, version)
+
+    monkeypatch.setattr(skill_extractor, "_build_keyword_engine", counting_build)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        engines = list(pool.map(lambda _: skill_extractor.get_keyword_engine(), range(8)))
+
+    assert builds == [1]
+    assert all(engine is engines[0] for engine in engines)
+
+    snapshot = CatalogSnapshot(version=2, certifications=CERTS, texts=[c["titre"] for c in CERTS])
+    monkeypatch.setattr(skill_extractor, "current_catalog", lambda: snapshot)
+    skill_extractor._rebuild_keyword_engine(snapshot)  # refresh listener
+    skill_extractor.get_keyword_engine()
+    assert builds == [1, 2]
@@ -0,0 +1,35 @@
+import numpy as np
+
+from app.services import inference_parity, model_registry
+
+
+class _FakeEncoder:
+    def encode(self, texts, **kwargs):
+        return np.eye(len(texts), 8, dtype=np.float32)
+
+
+class _FakeReranker:
+    def predict(self, pairs, **kwargs):
+        return np.arange(len(pairs), dtype=np.float32)
+
+
+def _fake_models(monkeypatch, active):
+    monkeypatch.setattr(inference_parity, "get_encoder", lambda backend=None: _FakeEncoder())
+    monkeypatch.setattr(inference_parity, "get_reranker", lambda backend=None: _FakeReranker())
+    monkeypatch.setattr(model_registry, "_active_backends", {
+        (model_registry.DEFAULT_ENCODER, "onnx-int8"): active,
+        (model_registry.DEFAULT_RERANKER, "onnx-int8"): active,
+    })
+
+
+def test_parity_fails_when_backend_fell_back_to_torch(monkeypatch):
+    _fake_models(monkeypatch, "torch")
+    report = inference_parity.check_parity("onnx-int8", queries=["a", "b"], documents=["x", "y", "z"])
+    assert report["active_backends"] == {"encoder": "torch", "reranker": "torch"}
+    assert not report["passed"]
+
+
+def test_parity_passes_on_requested_backend(monkeypatch):
+    _fake_models(monkeypatch, "onnx-int8")
+    report = inference_parity.check_parity("onnx-int8", queries=["a", "b"], documents=["x", "y", "z"])
+    assert report["passed"]
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import chat_rag
+from app.services import graph_reasoning, recommender
+from app.services.catalog import CatalogSnapshot, build_certification_text
+
+CERTS = [
+    {"id": "aws-en", "titre": "AWS Cloud Practitioner", "domaine": "Cloud", "niveau": "Débutant",
+     "competences": ["Cloud", "AWS"], "prix": 100, "langues": ["Anglais"]},
+    {"id": "aws-fr", "titre": "AWS Cloud Fondamentaux", "domaine": "Cloud", "niveau": "Débutant",
+     "competences": ["Cloud", "AWS"], "prix": 150, "langues": ["Anglais", "Français"]},
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    snapshot = CatalogSnapshot(
+        version=1,
+        certifications=[dict(cert) for cert in CERTS],
+        texts=[build_certification_text(cert) for cert in CERTS],
+        embeddings=np.eye(len(CERTS), 4, dtype=np.float32)
+    )
+    monkeypatch.setattr(graph_reasoning, "get_catalog", lambda: snapshot)
+    monkeypatch.setattr(graph_reasoning, "extract_skill_vector", lambda text, use_llm=True: {
+        "skill_vector": {"Cloud": 1.0, "AWS": 0.8}, "domains": ["cloud"], "held_certifications": [], "experience_years": 0
+    })
+    monkeypatch.setattr(graph_reasoning, "encode_one", lambda text: np.ones(4, dtype=np.float32) / 2)
+    monkeypatch.setattr(graph_reasoning, "batched_predict", lambda pairs: [0.0] * len(pairs))
+    monkeypatch.setattr(chat_rag, "ask_with_evidence", lambda **kw: "ok")
+    monkeypatch.setattr(chat_rag, "user_preferences", {})
+    monkeypatch.setattr(chat_rag, "conversation_memory", {})
+    return TestClient(app)
+
+
+def test_chat_rag_detects_the_training_language(client):
+    response = client.post("/chat-rag/", json={
+        "question": "Je cherche une certification cloud AWS en français", "user_id": "u1", "retrieval_mode": "graph"
+    })
+
+    assert response.status_code == 200
+    assert [rec["id"] for rec in response.json()["recommendations"]] == ["aws-fr"]
+    assert response.json()["user_preferences"]["langues"] == ["Français"]
+
+
+def test_chat_rag_request_languages(client):
+    response = client.post("/chat-rag/", json={
+        "question": "Je cherche une certification cloud AWS", "langues": ["français"], "retrieval_mode": "graph"
+    })
+
+    assert [rec["id"] for rec in response.json()["recommendations"]] == ["aws-fr"]
+
+
+def test_recommend_uses_the_stored_profile_languages(client, monkeypatch):
+    profile = {"niveau": "débutant", "objectif": "le cloud", "budget": 500,
+               "competences": ["AWS"], "langues": ["Français"]}
+    monkeypatch.setattr(recommender, "execute_query", lambda query, params=None: [{"p": profile}])
+
+    response = client.get("/recommend/recommend/u1")  # router prefix + include prefix
+
+    assert response.status_code == 200
+    assert [rec["id"] for rec in response.json()["recommandations"]] == ["aws-fr"]
+
+
+def test_unknown_retrieval_mode_is_rejected(client):
+    response = client.post("/chat-rag/", json={"question": "Je cherche une certification cloud", "retrieval_mode": "hybird"})
+    assert response.status_code == 422
+
+    assert client.get("/recommend/recommend/u1", params={"retrieval_mode": "vectr"}).status_code == 422
+    with pytest.raises(ValueError):
+        graph_reasoning.retrieve_certifications("cloud", {"Cloud": 1.0}, retrieval_mode="vectr")
@@ -0,0 +1,89 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from app.services import skill_extractor
+
+
+class _FakeGroq:
+    """Records calls and the highest number of calls in flight at once."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Python, SQL"))])
+
+
+def _long_text(tag: str, chunks: int) -> str:
+    # Unique words per request so the LLM cache never answers
+    return "\n".join(f"{tag} ligne {i} " + "x" * 90 for i in range(chunks * 30))
+
+
+def test_llm_concurrency_is_capped_across_requests(monkeypatch):
+    client = _FakeGroq(delay=0.02)
+    monkeypatch.setattr(skill_extractor, "get_groq_client", lambda: client)
+    monkeypatch.setattr(skill_extractor, "_llm_slots", threading.BoundedSemaphore(3))
+
+    # Six requests at once, each with several chunks: never more than 3 calls in flight
+    with ThreadPoolExecutor(max_workers=6) as requests:
+        results = list(requests.map(
+            lambda i: skill_extractor.extract_skills_with_llm_scored(_long_text(f"req{i}", 3)), range(6)
+        ))
+
+    assert all(result == {"Python": 1.0, "SQL": 1.0} for result in results)
+    assert client.calls >= 6 * 3
+    assert client.peak <= 3
+
+
+class _EchoGroq(_FakeGroq):
+    """Answers with the skills actually present in the chunk."""
+
+    def create(self, **kwargs):
+        super().create(**kwargs)
+        prompt = kwargs["messages"][-1]["content"]
+        skills = [skill for skill in ("Python", "Databricks") if skill in prompt]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=", ".join(skills) or "NONE"))])
+
+
+def _cv_with_skill_at_the_end(tag: str) -> str:
+    return "Python\n" + _long_text(tag, 12) + "\nPipelines Databricks en production."
+
+
+def test_every_chunk_of_a_long_text_is_extracted(monkeypatch):
+    client = _EchoGroq()
+    monkeypatch.setattr(skill_extractor, "get_groq_client", lambda: client)
+
+    text = _cv_with_skill_at_the_end("cv-all")
+    chunks = skill_extractor.chunk_text(text)
+    assert len(chunks) > 8 and "Databricks" not in "".join(chunks[:-1])
+
+    skills = skill_extractor.extract_skills_with_llm_scored(text)
+
+    assert client.calls == len(chunks)
+    assert "Databricks" in skills and "Python" in skills
+
+
+def test_chunks_past_the_cost_ceiling_get_keyword_extraction(monkeypatch):
+    client = _EchoGroq()
+    monkeypatch.setattr(skill_extractor, "get_groq_client", lambda: client)
+    monkeypatch.setattr(skill_extractor, "LLM_MAX_CHUNKS", 4)
+
+    skills = skill_extractor.extract_skills_with_llm_scored(_cv_with_skill_at_the_end("cv-capped"))
+
+    assert client.calls == 4
+    assert "Python" in skills
+    assert "databricks" in {skill.lower() for skill in skills}  # last chunk, keyword extractor
@@ -0,0 +1,70 @@
+from app.services import catalog, graph_schema, retrieval_backend
+
+
+def _fake_graph(monkeypatch, normalized):
+    queries = []
+
+    def execute_query(query, params=None):
+        queries.append(query)
+        if "AS ready" in query:
+            # Every certification normalized since its last edit
+            assert graph_schema.STALE_COMPETENCES in query
+            return [{"ready": normalized["done"] and not normalized.get("edited")}]
+        return [{"name": "python"}]
+
+    monkeypatch.setattr(retrieval_backend, "execute_query", execute_query)
+    retrieval_backend.reset_normalized_schema_check()
+    return queries
+
+
+def test_profile_skills_do_not_enable_normalized_queries(monkeypatch):
+    _fake_graph(monkeypatch, {"done": False})
+    assert not retrieval_backend.has_normalized_competences()
+
+
+def test_false_result_is_rechecked(monkeypatch):
+    normalized = {"done": False}
+    queries = _fake_graph(monkeypatch, normalized)
+    assert not retrieval_backend.has_normalized_competences()
+
+    normalized["done"] = True  # graph_schema.initialize_schema ran meanwhile
+    assert not retrieval_backend.has_normalized_competences()  # cached
+    monkeypatch.setattr(retrieval_backend, "NORMALIZED_SCHEMA_RECHECK_SECONDS", 0)
+    assert retrieval_backend.has_normalized_competences()
+    assert len(queries) == 2
+
+
+def test_an_edited_certification_disables_normalized_queries(monkeypatch):
+    normalized = {"done": True}
+    _fake_graph(monkeypatch, normalized)
+    monkeypatch.setattr(retrieval_backend, "NORMALIZED_SCHEMA_RECHECK_SECONDS", 0)
+    assert retrieval_backend.has_normalized_competences()
+
+    normalized["edited"] = True  # e.g. kg/seed_certifications.cypher re-run
+    assert not retrieval_backend.has_normalized_competences()
+
+
+def test_catalog_refresh_renormalizes_changed_certifications(monkeypatch):
+    calls = []
+
+    def execute_query(query, params=None):
+        calls.append((" ".join(query.split()), params))
+        if "RETURN c.id AS id LIMIT 1" in query:
+            return [{"id": "aws-sysops-associate"}]  # graph normalized once
+        if graph_schema.STALE_COMPETENCES in query:
+            return [{"id": "aws-ml-specialty"}]
+        return [{"normalized": 1, "skills_created": 1, "relationships_created": 1, "removed": 1}]
+
+    monkeypatch.setattr(graph_schema, "execute_query", execute_query)
+    monkeypatch.setattr(retrieval_backend, "execute_query", execute_query)
+    monkeypatch.setattr(catalog, "_refresh_listeners", [retrieval_backend.renormalize_changed_certifications])
+    monkeypatch.setattr(catalog, "_load_catalog", lambda: None)
+    retrieval_backend._normalized_schema.update({"ready": False, "checked_at": 1e18})
+
+    catalog.refresh_catalog(full=True)
+
+    scoped = [(query, params) for query, params in calls if params and params.get("ids") == ["aws-ml-specialty"]]
+    assert any("SET c.competences_list" in query for query, _ in scoped)
+    assert any("DELETE r" in query and "NOT s.name IN c.competences_list" in query for query, _ in scoped)
+    assert any("MERGE (c)-[r:TEACHES]->(s)" in query for query, _ in scoped)
+    assert retrieval_backend._normalized_schema["ready"] is None  # re-checked on the next request
@@ -0,0 +1,59 @@
+import numpy as np
+
+from app.services import catalog, retrieval_backend
+
+
+def _snapshot(version):
+    certs = [{"id": "a", "titre": "A", "competences": ["Python"]}, {"id": "b", "titre": "B", "competences": ["SQL"]}]
+    return catalog.CatalogSnapshot(
+        version=version,
+        certifications=certs,
+        texts=[catalog.build_certification_text(c) for c in certs],
+        embeddings=np.eye(2, 4, dtype=np.float32)
+    )
+
+
+def test_neo4j_index_is_synced_by_warmup_and_refresh_not_by_requests(monkeypatch):
+    queries = []
+    monkeypatch.setattr(retrieval_backend, "execute_query", lambda query, params=None: queries.append(query) or [])
+    monkeypatch.setattr(catalog, "_refresh_listeners", [])
+    backend = retrieval_backend.Neo4jVectorBackend("test_index")
+    catalog.add_refresh_listener(backend.prepare)  # as start_retrieval_backend does for the configured backend
+
+    # Request before warmup: no index creation, no awaitIndexes, callers fall back
+    ids, _ = backend.vector_search(np.ones(4, dtype=np.float32), 5, catalog=_snapshot(1))
+    assert ids == [] and queries == []
+    assert not backend.prepared(_snapshot(1))
+
+    backend.prepare(_snapshot(1))  # warmup
+    assert any("CREATE VECTOR INDEX test_index" in q for q in queries)
+    assert any("db.awaitIndexes" in q for q in queries)
+    assert backend.prepared(_snapshot(1))
+
+    # A catalog refresh syncs the new version through the listener
+    queries.clear()
+    monkeypatch.setattr(catalog, "_load_catalog", lambda: monkeypatch.setattr(catalog, "_snapshot", _snapshot(2)))
+    catalog.refresh_catalog(full=True)
+    assert backend.prepared(catalog.current_catalog())
+    assert not any("CREATE VECTOR INDEX" in q for q in queries)
+
+    queries.clear()
+    backend.vector_search(np.ones(4, dtype=np.float32), 5, catalog=catalog.current_catalog())
+    assert len(queries) == 1 and "db.index.vector.queryNodes" in queries[0]
+
+
+def test_only_the_configured_backend_follows_refreshes(monkeypatch):
+    queries = []
+    monkeypatch.setattr(retrieval_backend, "execute_query", lambda query, params=None: queries.append(query) or [])
+    monkeypatch.setattr(catalog, "_refresh_listeners", [])
+    monkeypatch.setattr(catalog, "_snapshot", _snapshot(1))
+    monkeypatch.setattr(retrieval_backend, "RETRIEVAL_BACKEND", "memory")
+    monkeypatch.setattr(retrieval_backend, "_backends", {})
+
+    # Memory deployment: the Neo4j backend is only a fallback, a refresh never writes to Neo4j
+    assert retrieval_backend.start_retrieval_backend().name == "memory"
+    retrieval_backend.get_retrieval_backend("neo4j")
+    monkeypatch.setattr(catalog, "_load_catalog", lambda: monkeypatch.setattr(catalog, "_snapshot", _snapshot(2)))
+    catalog.refresh_catalog(full=True)
+
+    assert not any("VECTOR INDEX" in q or "embedding" in q for q in queries)
@@ -0,0 +1,12 @@
+from app.services.retrieval_backend import InMemoryBackend
+from app.services.retrieval_conformance import run_conformance, synthetic_catalog
+
+
+def test_memory_backend_matches_the_reference():
+    catalog = synthetic_catalog(300)
+    backend = InMemoryBackend()
+    backend.prepare(catalog)
+
+    result = run_conformance(backend, catalog, cases=30)
+
+    assert result["passed"], result["checks"]
@@ -0,0 +1,38 @@
+from app.services import warmup
+
+
+def _fresh_state(monkeypatch, tasks):
+    monkeypatch.setattr(warmup, "WARMUP_TASKS", tasks)
+    monkeypatch.setattr(warmup, "WARMUP_RETRY_SECONDS", 0.01)
+    monkeypatch.setattr(warmup, "_state", {
+        "started_at": 0.0,
+        "finished_at": None,
+        "tasks": {name: {"status": "pending", "seconds": None, "error": None, "attempts": 0} for name in tasks}
+    })
+
+
+def test_failed_task_is_retried_until_it_succeeds(monkeypatch):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("neo4j not up yet")
+
+    _fresh_state(monkeypatch, {"catalog": (flaky, lambda: False)})
+    warmup._run_all()
+
+    status = warmup.get_warmup_status()
+    assert len(calls) == 3
+    assert status["ready"]
+    assert status["tasks"]["catalog"]["attempts"] == 3
+
+
+def test_readiness_follows_lazy_loading(monkeypatch):
+    loaded = {"catalog": False}
+    _fresh_state(monkeypatch, {"catalog": (lambda: None, lambda: loaded["catalog"])})
+    warmup._state["tasks"]["catalog"]["status"] = "retrying"
+
+    assert not warmup.get_warmup_status()["ready"]
+    loaded["catalog"] = True  # a request loaded the catalog meanwhile
+    assert warmup.get_warmup_status()["ready"]
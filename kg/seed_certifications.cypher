@@ -20,7 +20,8 @@ SET c.titre = "AWS Solutions Architect Professional",
     c.budget = 300,
     c.url = "https://aws.amazon.com/certification/certified-solutions-architect-professional/",
     c.langues = ["Anglais", "Français"],
-    c.temps_par_semaine = 10;
+    c.temps_par_semaine = 10,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "aws-sysops-associate"})
 SET c.titre = "AWS SysOps Administrator Associate",
@@ -33,7 +34,8 @@ SET c.titre = "AWS SysOps Administrator Associate",
     c.budget = 150,
     c.url = "https://aws.amazon.com/certification/certified-sysops-admin-associate/",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 8;
+    c.temps_par_semaine = 8,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "azure-solutions-architect"})
 SET c.titre = "Microsoft Azure Solutions Architect Expert (AZ-305)",
@@ -46,7 +48,8 @@ SET c.titre = "Microsoft Azure Solutions Architect Expert (AZ-305)",
     c.budget = 330,
     c.url = "https://learn.microsoft.com/certifications/azure-solutions-architect/",
     c.langues = ["Anglais", "Français"],
-    c.temps_par_semaine = 10;
+    c.temps_par_semaine = 10,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "azure-developer"})
 SET c.titre = "Microsoft Azure Developer Associate (AZ-204)",
@@ -59,7 +62,8 @@ SET c.titre = "Microsoft Azure Developer Associate (AZ-204)",
     c.budget = 165,
     c.url = "https://learn.microsoft.com/certifications/azure-developer/",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 8;
+    c.temps_par_semaine = 8,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "gcp-professional-cloud-architect"})
 SET c.titre = "Google Professional Cloud Architect",
@@ -72,7 +76,8 @@ SET c.titre = "Google Professional Cloud Architect",
     c.budget = 200,
     c.url = "https://cloud.google.com/certification/cloud-architect",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 10;
+    c.temps_par_semaine = 10,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "cka-kubernetes"})
 SET c.titre = "Certified Kubernetes Administrator (CKA)",
@@ -85,7 +90,8 @@ SET c.titre = "Certified Kubernetes Administrator (CKA)",
     c.budget = 395,
     c.url = "https://www.cncf.io/certification/cka/",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 10;
+    c.temps_par_semaine = 10,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "ckad-kubernetes"})
 SET c.titre = "Certified Kubernetes Application Developer (CKAD)",
@@ -98,7 +104,8 @@ SET c.titre = "Certified Kubernetes Application Developer (CKAD)",
     c.budget = 395,
     c.url = "https://www.cncf.io/certification/ckad/",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 8;
+    c.temps_par_semaine = 8,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "terraform-associate"})
 SET c.titre = "HashiCorp Terraform Associate",
@@ -111,7 +118,8 @@ SET c.titre = "HashiCorp Terraform Associate",
     c.budget = 70,
     c.url = "https://www.hashicorp.com/certification/terraform-associate",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 6;
+    c.temps_par_semaine = 6,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "finops-practitioner"})
 SET c.titre = "FinOps Certified Practitioner",
@@ -124,7 +132,8 @@ SET c.titre = "FinOps Certified Practitioner",
     c.budget = 300,
     c.url = "https://www.finops.org/certification/",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 5;
+    c.temps_par_semaine = 5,
+    c.updated_at = datetime();
 
 
 // ============================================================
@@ -142,7 +151,8 @@ SET c.titre = "Databricks Certified Data Engineer Professional",
     c.budget = 200,
     c.url = "https://www.databricks.com/learn/certification/data-engineer-professional",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 10;
+    c.temps_par_semaine = 10,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "snowflake-data-engineer"})
 SET c.titre = "SnowPro Advanced: Data Engineer",
@@ -155,7 +165,8 @@ SET c.titre = "SnowPro Advanced: Data Engineer",
     c.budget = 375,
     c.url = "https://www.snowflake.com/certifications/",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 8;
+    c.temps_par_semaine = 8,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "gcp-data-engineer"})
 SET c.titre = "Google Professional Data Engineer",
@@ -168,7 +179,8 @@ SET c.titre = "Google Professional Data Engineer",
     c.budget = 200,
     c.url = "https://cloud.google.com/certification/data-engineer",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 10;
+    c.temps_par_semaine = 10,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "aws-data-analytics"})
 SET c.titre = "AWS Certified Data Analytics Specialty",
@@ -181,7 +193,8 @@ SET c.titre = "AWS Certified Data Analytics Specialty",
     c.budget = 300,
     c.url = "https://aws.amazon.com/certification/certified-data-analytics-specialty/",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 10;
+    c.temps_par_semaine = 10,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "dbt-analytics-engineering"})
 SET c.titre = "dbt Analytics Engineering Certification",
@@ -194,7 +207,8 @@ SET c.titre = "dbt Analytics Engineering Certification",
     c.budget = 200,
     c.url = "https://www.getdbt.com/certifications/",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 6;
+    c.temps_par_semaine = 6,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "airflow-fundamentals"})
 SET c.titre = "Apache Airflow Fundamentals",
@@ -207,7 +221,8 @@ SET c.titre = "Apache Airflow Fundamentals",
     c.budget = 150,
     c.url = "https://www.astronomer.io/certification/",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 5;
+    c.temps_par_semaine = 5,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "tableau-data-analyst"})
 SET c.titre = "Tableau Certified Data Analyst",
@@ -220,7 +235,8 @@ SET c.titre = "Tableau Certified Data Analyst",
     c.budget = 250,
     c.url = "https://www.tableau.com/learn/certification",
     c.langues = ["Anglais", "Français"],
-    c.temps_par_semaine = 6;
+    c.temps_par_semaine = 6,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "power-bi-analyst"})
 SET c.titre = "Microsoft Power BI Data Analyst (PL-300)",
@@ -233,7 +249,8 @@ SET c.titre = "Microsoft Power BI Data Analyst (PL-300)",
     c.budget = 165,
     c.url = "https://learn.microsoft.com/certifications/power-bi-data-analyst-associate/",
     c.langues = ["Anglais", "Français"],
-    c.temps_par_semaine = 6;
+    c.temps_par_semaine = 6,
+    c.updated_at = datetime();
 
 
 // ============================================================
@@ -251,7 +268,8 @@ SET c.titre = "Google Professional Machine Learning Engineer",
     c.budget = 200,
     c.url = "https://cloud.google.com/certification/machine-learning-engineer",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 12;
+    c.temps_par_semaine = 12,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "aws-ml-specialty"})
 SET c.titre = "AWS Certified Machine Learning Specialty",
@@ -264,7 +282,8 @@ SET c.titre = "AWS Certified Machine Learning Specialty",
     c.budget = 300,
     c.url = "https://aws.amazon.com/certification/certified-machine-learning-specialty/",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 12;
+    c.temps_par_semaine = 12,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "azure-data-scientist"})
 SET c.titre = "Microsoft Azure Data Scientist Associate (DP-100)",
@@ -277,7 +296,8 @@ SET c.titre = "Microsoft Azure Data Scientist Associate (DP-100)",
     c.budget = 165,
     c.url = "https://learn.microsoft.com/certifications/azure-data-scientist/",
     c.langues = ["Anglais", "Français"],
-    c.temps_par_semaine = 8;
+    c.temps_par_semaine = 8,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "tensorflow-developer"})
 SET c.titre = "TensorFlow Developer Certificate",
@@ -290,7 +310,8 @@ SET c.titre = "TensorFlow Developer Certificate",
     c.budget = 100,
     c.url = "https://www.tensorflow.org/certificate",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 8;
+    c.temps_par_semaine = 8,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "deeplearning-ai-specialization"})
 SET c.titre = "Deep Learning Specialization (Andrew Ng)",
@@ -303,7 +324,8 @@ SET c.titre = "Deep Learning Specialization (Andrew Ng)",
     c.budget = 49,
     c.url = "https://www.coursera.org/specializations/deep-learning",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 6;
+    c.temps_par_semaine = 6,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "huggingface-nlp"})
 SET c.titre = "Hugging Face NLP Course",
@@ -316,7 +338,8 @@ SET c.titre = "Hugging Face NLP Course",
     c.budget = 0,
     c.url = "https://huggingface.co/learn/nlp-course",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 5;
+    c.temps_par_semaine = 5,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "generative-ai-google"})
 SET c.titre = "Google Generative AI Learning Path",
@@ -329,7 +352,8 @@ SET c.titre = "Google Generative AI Learning Path",
     c.budget = 0,
     c.url = "https://cloud.google.com/learn/training/machinelearning-ai",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 4;
+    c.temps_par_semaine = 4,
+    c.updated_at = datetime();
 
 MERGE (c:Certification {id: "mlops-specialization"})
 SET c.titre = "Machine Learning Engineering for Production (MLOps)",
@@ -342,7 +366,8 @@ SET c.titre = "Machine Learning Engineering for Production (MLOps)",
     c.budget = 49,
     c.url = "https://www.coursera.org/specializations/machine-learning-engineering-for-production-mlops",
     c.langues = ["Anglais"],
-    c.temps_par_semaine = 8;
+    c.temps_par_semaine = 8,
+    c.updated_at = datetime();
 
 
 // ============================================================